@@ -0,0 +1,106 @@
+# bdf_font.py
+
+import numpy as np
+
+# ---------------------- BDF Font ----------------------
+
+class Glyph:
+    """
+    One rasterised character: a (height, width) bool bitmap, its BBX offsets
+    and the horizontal advance (DWIDTH).
+    """
+
+    def __init__(self, bitmap, x_offset, y_offset, advance):
+        self.bitmap = bitmap
+        self.x_offset = x_offset
+        self.y_offset = y_offset
+        self.advance = advance
+
+class BdfFont:
+    """
+    Minimal reader for the BDF bitmap fonts in res/fonts.
+    Positions follow rgbmatrix graphics.DrawText: x is the left edge and
+    y the baseline of the text.
+    """
+
+    def __init__(self):
+        self.glyphs = {}
+        self.height = 0
+        self.baseline = 0
+        self.default_char = None
+
+    def LoadFont(self, font_path):
+        """
+        Parses a BDF file. Raises an exception if the file is not a valid BDF font.
+        """
+        with open(font_path, "r", encoding="latin-1") as f:
+            lines = iter(f.read().splitlines())
+
+        encoding = None
+        advance = 0
+        bbx = (0, 0, 0, 0)
+        for line in lines:
+            fields = line.split()
+            if not fields:
+                continue
+            keyword = fields[0]
+            if keyword == "FONTBOUNDINGBOX":
+                self.height = int(fields[2])
+                self.baseline = self.height + int(fields[4])
+            elif keyword == "DEFAULT_CHAR":
+                self.default_char = int(fields[1])
+            elif keyword == "ENCODING":
+                encoding = int(fields[1])
+            elif keyword == "DWIDTH":
+                advance = int(fields[1])
+            elif keyword == "BBX":
+                bbx = tuple(int(value) for value in fields[1:5])
+            elif keyword == "BITMAP":
+                width, height, x_offset, y_offset = bbx
+                rows = bytes.fromhex("".join(next(lines).strip() for _ in range(height)))
+                row_bytes = (width + 7) // 8
+                packed = np.frombuffer(rows, dtype=np.uint8).reshape(height, row_bytes)
+                bitmap = np.unpackbits(packed, axis=1)[:, :width].astype(bool)
+                if encoding is not None and encoding >= 0:
+                    self.glyphs[encoding] = Glyph(bitmap, x_offset, y_offset, advance)
+
+        if not self.glyphs or self.height == 0:
+            raise ValueError(f"No glyphs found in font file: {font_path}")
+
+    def glyph(self, char):
+        """
+        Returns the glyph for a character, falling back to the font's default char.
+        """
+        glyph = self.glyphs.get(ord(char))
+        if glyph is None and self.default_char is not None:
+            glyph = self.glyphs.get(self.default_char)
+        return glyph
+
+    def CharacterWidth(self, codepoint):
+        glyph = self.glyphs.get(codepoint)
+        return glyph.advance if glyph is not None else -1
+
+    def text_width(self, text):
+        return sum(glyph.advance for glyph in map(self.glyph, text) if glyph is not None)
+
+    def render(self, text):
+        """
+        Rasterises text into a (height, width) bool mask; row `baseline` is the baseline.
+        """
+        mask = np.zeros((self.height, max(self.text_width(text), 1)), dtype=bool)
+        x = 0
+        for char in text:
+            glyph = self.glyph(char)
+            if glyph is None:
+                continue
+            glyph_height, glyph_width = glyph.bitmap.shape
+            top = self.baseline - glyph_height - glyph.y_offset
+            left = x + glyph.x_offset
+            # Clip glyphs that stick out of the font bounding box
+            y0, x0 = max(top, 0), max(left, 0)
+            y1 = min(top + glyph_height, mask.shape[0])
+            x1 = min(left + glyph_width, mask.shape[1])
+            if y1 > y0 and x1 > x0:
+                mask[y0:y1, x0:x1] |= glyph.bitmap[y0 - top:y1 - top, x0 - left:x1 - left]
+            x += glyph.advance
+        return mask
@@ -0,0 +1,733 @@
+# camera_service.py
+
+import multiprocessing
+import threading
+import time
+from multiprocessing import shared_memory
+
+import cv2
+import mediapipe as mp
+import numpy as np
+
+import gesture_latency
+import settings
+from gesture_engine import NUM_LANDMARKS, default_engine, landmarks_to_array
+from hand_roi import RoiTracker, write_landmarks
+from landmark_recording import Recording, ReplayCapture, read_header
+from motion_gate import MotionGate
+from swap_telemetry import Histogram
+
+# Initialize MediaPipe Hands
+mp_hands = mp.solutions.hands
+
+# ---------------------- Results ----------------------
+
+class HandResult:
+    """
+    One processed camera frame, as published to subscribers.
+    timestamp is time.monotonic() when the frame was read. points is the (21, 3)
+    landmark array of the first hand and gesture its classification, both None
+    without a hand. ok is False when the camera failed to deliver a frame.
+    hand_landmarks (the MediaPipe object) is None when inference runs in the
+    worker process; use points. inferred_at and classified_at are the
+    time.monotonic() stamps after hand detection and the gesture engine, for
+    latency tracking (None when the frame skipped inference).
+    """
+
+    __slots__ = ("frame_id", "timestamp", "ok", "hand_landmarks", "points", "gesture",
+                 "inferred_at", "classified_at")
+
+    def __init__(self, frame_id, timestamp, ok=True, hand_landmarks=None, points=None, gesture=None):
+        self.frame_id = frame_id
+        self.timestamp = timestamp
+        self.ok = ok
+        self.hand_landmarks = hand_landmarks
+        self.points = points
+        self.gesture = gesture
+        self.inferred_at = None
+        self.classified_at = None
+
+class Subscription:
+    """
+    A subscriber's view of the service: get() returns the newest result it has
+    not seen yet, so a slow subscriber skips results instead of falling behind.
+    """
+
+    def __init__(self, service):
+        self.service = service
+        self.condition = threading.Condition()
+        self.latest = None
+        self.last_seen = None
+
+    def _deliver(self, result):
+        with self.condition:
+            self.latest = result
+            self.condition.notify_all()
+
+    def get(self, timeout=None):
+        """
+        Waits for a result newer than the last one returned; None on timeout.
+        """
+        with self.condition:
+            fresh = lambda: self.latest is not None and self.latest.frame_id != self.last_seen
+            if not self.condition.wait_for(fresh, timeout):
+                return None
+            self.last_seen = self.latest.frame_id
+            # Wake a replay waiting for this result to be consumed
+            self.condition.notify_all()
+            return self.latest
+
+    def wait_consumed(self, timeout=None):
+        """
+        Waits until get() has returned the latest result. False on timeout.
+        """
+        with self.condition:
+            consumed = lambda: self.latest is None or self.latest.frame_id == self.last_seen
+            return self.condition.wait_for(consumed, timeout)
+
+    def close(self):
+        self.service.unsubscribe(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# ---------------------- Frame Grabber ----------------------
+
+class FrameGrabber:
+    """
+    Drains the camera on its own thread and keeps only the newest frame.
+
+    The driver queues frames while inference runs; reading them in order means
+    processing frames that are already hundreds of milliseconds old. The grabber
+    reads continuously (while `active` is set), so read() always returns the
+    freshest frame and everything in between is dropped.
+    With on_demand set (the sampler is idle), frames are only grabbed to keep the
+    driver's queue drained. Each read() then records when it asked, and only a
+    frame grabbed after that is decoded and returned, so an empty room costs a
+    few decodes per second instead of the camera's rate and still gets fresh frames.
+    """
+
+    def __init__(self, cap, active):
+        self.cap = cap
+        self.active = active
+        self.condition = threading.Condition()
+        self.frame = None
+        self.frame_id = 0
+        self.timestamp = None
+        self.ok = True
+        self.on_demand = False
+        # Time of the on-demand read() waiting for a frame (None: none waiting)
+        self.requested_at = None
+        self.stop_event = threading.Event()
+        self.thread = None
+
+        # Counters
+        self.frames_grabbed = 0
+        self.frames_decoded = 0
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, name="frame-grabber", daemon=True)
+        self.thread.start()
+        return self
+
+    def _run(self):
+        while not self.stop_event.is_set():
+            if not self.active.is_set():
+                self.active.wait(0.5)
+                continue
+            ret = self.cap.grab()
+            grabbed_at = time.monotonic()
+            self.frames_grabbed += 1
+            if ret and self.on_demand:
+                with self.condition:
+                    requested_at = self.requested_at
+                if requested_at is None or grabbed_at < requested_at:
+                    continue
+            frame = None
+            if ret:
+                ret, frame = self.cap.retrieve()
+                self.frames_decoded += 1
+            with self.condition:
+                self.frame_id += 1
+                self.timestamp = grabbed_at
+                self.ok = ret
+                self.frame = frame if ret else None
+                if self.requested_at is not None and grabbed_at >= self.requested_at:
+                    self.requested_at = None
+                self.condition.notify_all()
+            if not ret:
+                self.stop_event.wait(0.1)
+
+    def read(self, last_id, timeout=1.0):
+        """
+        Waits for a frame newer than last_id; in on_demand mode, for one grabbed
+        after this call (or a failed read).
+        Returns (frame_id, timestamp, ok, frame), or None on timeout.
+        """
+        with self.condition:
+            if self.on_demand:
+                requested_at = time.monotonic()
+                self.requested_at = requested_at
+                ready = lambda: self.frame_id != last_id and (self.timestamp >= requested_at or not self.ok)
+            else:
+                ready = lambda: self.frame_id != last_id
+            if not self.condition.wait_for(ready, timeout):
+                return None
+            return self.frame_id, self.timestamp, self.ok, self.frame
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+# ---------------------- Adaptive Sampling ----------------------
+
+class AdaptiveSampler:
+    """
+    Picks the interval between hand inferences.
+
+    The service runs at active_fps while a hand is in view and drops to idle_fps
+    once no hand has been seen for idle_after seconds; the first frame with a
+    hand switches straight back. With a cpu_budget (fraction of wall-clock time,
+    0 to disable), the interval is stretched so inference, averaged over recent
+    frames, stays within the budget.
+    """
+
+    def __init__(self, active_fps, idle_fps, idle_after, cpu_budget=0):
+        self.active_fps = active_fps
+        self.idle_fps = idle_fps
+        self.idle_after = idle_after
+        self.cpu_budget = cpu_budget
+
+        now = time.monotonic()
+        self.mode = "active"
+        self.mode_since = now
+        self.last_hand = now
+        self.cost = 0.0  # moving average of the inference time, seconds
+        self.mode_seconds = {"active": 0.0, "idle": 0.0}
+        self.budget_limited = 0
+
+    def _switch(self, mode, now):
+        if mode != self.mode:
+            self.mode_seconds[self.mode] += now - self.mode_since
+            self.mode = mode
+            self.mode_since = now
+
+    def update(self, hand_present, cost=None):
+        """
+        Records the outcome and cost (seconds) of one inference; cost None for a
+        frame that skipped inference.
+        """
+        now = time.monotonic()
+        if cost is not None:
+            self.cost = cost if not self.cost else 0.8 * self.cost + 0.2 * cost
+        if hand_present:
+            self.last_hand = now
+            self._switch("active", now)
+        elif now - self.last_hand >= self.idle_after:
+            self._switch("idle", now)
+
+    def interval(self):
+        """
+        Seconds from the start of one inference to the start of the next.
+        """
+        interval = 1.0 / (self.active_fps if self.mode == "active" else self.idle_fps)
+        if self.cpu_budget > 0 and self.cost / self.cpu_budget > interval:
+            self.budget_limited += 1
+            interval = self.cost / self.cpu_budget
+        return interval
+
+    def stats(self):
+        mode_seconds = dict(self.mode_seconds)
+        mode_seconds[self.mode] += time.monotonic() - self.mode_since
+        return {
+            "mode": self.mode,
+            "active_seconds": mode_seconds["active"],
+            "idle_seconds": mode_seconds["idle"],
+            "inference_ms": self.cost * 1e3,
+            "budget_limited": self.budget_limited,
+        }
+
+# ---------------------- Camera Service ----------------------
+
+class CameraService:
+    """
+    Owns the camera and the MediaPipe Hands graph for the whole process.
+
+    A single thread reads frames, runs hand detection and the gesture engine,
+    and publishes a HandResult to every subscriber. The device and the model are
+    opened once, on the first subscription, and stay open while scenes attach
+    and detach; with no subscribers the thread idles without reading frames.
+    With latest_frame (the default), a FrameGrabber feeds inference the newest
+    frame instead of the next one in the driver's queue. The age of each frame
+    from capture to the gesture decision is kept in a histogram; without the
+    grabber it is timed from cap.read() and misses the time spent in the queue.
+    The inference rate follows hand presence and the CPU budget (AdaptiveSampler);
+    while it is idle, the grabber decodes only the frames that are sampled.
+    Frames are downscaled and, while a hand is tracked, cropped around it before
+    inference (RoiTracker). Every roi_validate_every-th cropped frame is also run
+    through a separate full-frame detector to measure how often both agree.
+    While no hand is tracked, frames the MotionGate finds unchanged skip
+    inference and are published without a hand.
+
+    With use_process (camera_process), capture and inference run in a worker
+    process instead (see _worker_main), so their GIL time cannot stall the
+    display threads; this thread only relays the worker's results.
+    """
+
+    def __init__(self, device=None, fps=None, latest_frame=None, use_process=None):
+        self.device = device if device is not None else settings.get("camera_device")
+        self.fps = fps or settings.get("gesture_fps")
+        self.latest_frame = latest_frame if latest_frame is not None else settings.get("camera_latest_frame")
+        self.use_process = use_process if use_process is not None else settings.get("camera_process")
+        self.report_interval = settings.get("telemetry_dump_seconds")
+        self.sampler = AdaptiveSampler(self.fps, settings.get("gesture_idle_fps"),
+                                       settings.get("gesture_idle_after_seconds"),
+                                       settings.get("gesture_cpu_budget"))
+        self.roi = RoiTracker(settings.get("inference_width"), settings.get("roi_margin"),
+                              tracking=settings.get("roi_tracking"))
+        self.validate_every = settings.get("roi_validate_every")
+        self.motion = MotionGate(settings.get("motion_threshold"))
+        self.validator = None
+        self.validated = 0
+        self.validation_agreed = 0
+        self.subscribers = []
+        self.lock = threading.Lock()
+        self.has_subscribers = threading.Event()
+        self.stop_event = threading.Event()
+        self.thread = None
+
+        # Counters
+        self.frames_processed = 0
+        self.frames_skipped = 0
+        self.read_failures = 0
+        self.frame_age = Histogram(bin_ms=1.0, max_ms=1000.0)
+        self.slot_overruns = 0
+        self.grabber = None
+        # LandmarkRecorder receiving every result (and frame) when set; with use_process
+        # only results arrive, so it must not record frames
+        self.recorder = None
+
+    def subscribe(self):
+        """
+        Attaches a new subscriber, starting the service if needed. Returns a Subscription.
+        """
+        subscription = Subscription(self)
+        with self.lock:
+            self.subscribers.append(subscription)
+            self.has_subscribers.set()
+            if self.thread is None:
+                self.stop_event.clear()
+                target = self._run_process if self.use_process else self._run
+                self.thread = threading.Thread(target=target, name="camera-service", daemon=True)
+                self.thread.start()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            if subscription in self.subscribers:
+                self.subscribers.remove(subscription)
+            if not self.subscribers:
+                self.has_subscribers.clear()
+
+    def _publish(self, result):
+        with self.lock:
+            subscribers = list(self.subscribers)
+        for subscription in subscribers:
+            subscription._deliver(result)
+
+    def _wait_consumed(self, timeout=1.0):
+        """
+        Holds a replay running at full speed until every subscriber has taken the
+        last result, so none is overwritten unseen (up to timeout per subscriber).
+        """
+        with self.lock:
+            subscribers = list(self.subscribers)
+        for subscription in subscribers:
+            subscription.wait_consumed(timeout)
+
+    def _open_capture(self):
+        """
+        Opens the camera, or the frames of the replay_path recording when set.
+        """
+        replay_path = settings.get("replay_path")
+        if replay_path:
+            return ReplayCapture(replay_path, settings.get("replay_speed"))
+        return cv2.VideoCapture(self.device)
+
+    def _read(self, cap, grabber, last_id):
+        """
+        Returns (frame_id, timestamp, ok, frame) of the next frame to process, or None.
+        """
+        if grabber is not None:
+            return grabber.read(last_id)
+        ret, frame = cap.read()
+        return last_id + 1, time.monotonic(), ret, frame
+
+    def _run(self):
+        cap = self._open_capture()
+        # A replayed recording is read in order, paced by the recording (or as fast
+        # as subscribers keep up with replay_speed 0), never by the sampler
+        replay = isinstance(cap, ReplayCapture)
+        grabber = FrameGrabber(cap, self.has_subscribers).start() if self.latest_frame and not replay else None
+        self.grabber = grabber
+        confidence = settings.get("hand_detection_confidence")
+        with mp_hands.Hands(
+            static_image_mode=False,
+            max_num_hands=1,
+            min_detection_confidence=confidence,
+            min_tracking_confidence=confidence
+        ) as hands:
+            print("Camera Service Started.")
+            frame_id = 0
+            hand_tracked = False
+            next_report = time.monotonic() + self.report_interval
+
+            while not self.stop_event.is_set():
+                if not self.has_subscribers.is_set():
+                    self.has_subscribers.wait(0.5)
+                    continue
+
+                cycle_start = time.monotonic()
+                read = self._read(cap, grabber, frame_id)
+                if read is None:
+                    continue
+                if read[0] > frame_id + 1:
+                    self.frames_skipped += read[0] - frame_id - 1
+                frame_id, timestamp, ret, frame = read
+                if not ret:
+                    self.read_failures += 1
+                    self._publish(HandResult(frame_id, timestamp, ok=False))
+                    if replay:
+                        # End of the recording
+                        break
+                    self.stop_event.wait(1.0 / self.fps)
+                    continue
+
+                # Nothing moved in an empty scene: the hand detector would find nothing either
+                if self.motion.should_skip(frame, hand_tracked):
+                    result = HandResult(frame_id, timestamp)
+                    self.sampler.update(False)
+                else:
+                    inference_start = time.perf_counter()
+                    result = self._infer(hands, frame, frame_id, timestamp, confidence)
+                    self.sampler.update(result.gesture is not None, time.perf_counter() - inference_start)
+                    hand_tracked = result.points is not None
+                if grabber is not None:
+                    # Idle: decode only the frames inference asks for
+                    grabber.on_demand = self.sampler.mode == "idle"
+                self.frames_processed += 1
+                self.frame_age.add(time.monotonic() - timestamp)
+                if self.recorder is not None:
+                    self.recorder.write(result, frame)
+                self._publish(result)
+
+                if self.report_interval > 0 and time.monotonic() >= next_report:
+                    self.print_stats()
+                    next_report = time.monotonic() + self.report_interval
+
+                if replay:
+                    if not cap.speed:
+                        self._wait_consumed()
+                    continue
+                # Pace to the rate of the current mode
+                self.stop_event.wait(cycle_start + self.sampler.interval() - time.monotonic())
+
+        if self.validator is not None:
+            self.validator.close()
+            self.validator = None
+        if grabber is not None:
+            grabber.stop()
+        cap.release()
+        self.print_stats()
+        print("Camera Service Exited.")
+
+    def _run_process(self):
+        """
+        Starts the worker process and publishes what it sends back: one small
+        (frame_id, timestamp, ok, slot, gesture, inferred_at, classified_at) tuple
+        per frame over a pipe, with the landmarks of frames with a hand in
+        shared-memory slot `slot`.
+        """
+        context = multiprocessing.get_context("spawn")
+        memory = shared_memory.SharedMemory(create=True, size=WORKER_SLOTS * SLOT_SHAPE[0] * SLOT_SHAPE[1] * 8)
+        slots = np.ndarray((WORKER_SLOTS,) + SLOT_SHAPE, dtype=np.float64, buffer=memory.buf)
+        receiver, sender = context.Pipe(duplex=False)
+        active = context.Event()
+        stop = context.Event()
+        worker = context.Process(target=_worker_main, args=(sender, memory.name, active, stop),
+                                 name="camera-worker", daemon=True)
+        worker.start()
+        sender.close()
+        print("Camera Service Started (worker process).")
+        frame_id = 0
+        next_report = time.monotonic() + self.report_interval
+
+        while not self.stop_event.is_set():
+            # Only keep the worker capturing while someone is subscribed
+            if self.has_subscribers.is_set():
+                active.set()
+            else:
+                active.clear()
+                self.has_subscribers.wait(0.5)
+                continue
+
+            # poll() is also True at EOF, once the worker has exited
+            message = None
+            if receiver.poll(0.5):
+                try:
+                    message = receiver.recv()
+                except EOFError:
+                    pass
+            elif worker.is_alive():
+                continue
+            if message is None:
+                print("Error: Camera worker process exited.")
+                # A fresh id, so subscribers see the failure after the last result
+                self.read_failures += 1
+                self._publish(HandResult(frame_id + 1, time.monotonic(), ok=False))
+                break
+            frame_id, timestamp, ok, slot, gesture, inferred_at, classified_at = message
+
+            # The worker's stamps are on the same system-wide monotonic clock
+            result = HandResult(frame_id, timestamp, ok=ok, gesture=gesture)
+            result.inferred_at = inferred_at
+            result.classified_at = classified_at
+            if slot >= 0:
+                # The worker clears the frame id stamp before writing a slot and sets it
+                # after; a stamp other than ours on either side of the copy means the
+                # slot was reused before we got to it
+                stamp = slots[slot, NUM_LANDMARKS, 0]
+                points = slots[slot, :NUM_LANDMARKS].copy()
+                if stamp == frame_id and slots[slot, NUM_LANDMARKS, 0] == frame_id:
+                    result.points = points
+                else:
+                    self.slot_overruns += 1
+            if ok:
+                self.frames_processed += 1
+                self.frame_age.add(time.monotonic() - timestamp)
+            else:
+                self.read_failures += 1
+            if self.recorder is not None and ok:
+                self.recorder.write(result)
+            self._publish(result)
+
+            if self.report_interval > 0 and time.monotonic() >= next_report:
+                self.print_stats()
+                next_report = time.monotonic() + self.report_interval
+
+        stop.set()
+        worker.join(5.0)
+        if worker.is_alive():
+            worker.terminate()
+            worker.join()
+        receiver.close()
+        del slots
+        memory.close()
+        memory.unlink()
+        self.print_stats()
+        print("Camera Service Exited.")
+
+    def _infer(self, hands, frame, frame_id, timestamp, confidence):
+        """
+        Runs hand detection and the gesture engine on one frame. Returns its HandResult.
+        """
+        # Downscale (and crop to the tracked hand), then convert to RGB for MediaPipe
+        rgb_input, window = self.roi.prepare(frame)
+        cropped = window[2] < frame.shape[1] or window[3] < frame.shape[0]
+
+        # Process the frame to detect hands
+        results = hands.process(rgb_input)
+
+        result = HandResult(frame_id, timestamp)
+        result.inferred_at = time.monotonic()
+        if results.multi_hand_landmarks:
+            result.hand_landmarks = results.multi_hand_landmarks[0]
+            # Back to full-frame coordinates, so the gesture rules are unaffected by the crop
+            result.points = self.roi.map_back(
+                landmarks_to_array(result.hand_landmarks), window, frame.shape)
+            write_landmarks(result.hand_landmarks, result.points)
+            result.gesture = default_engine.classify(result.points)
+        result.classified_at = time.monotonic()
+        self.roi.update(result.points, frame.shape)
+        if cropped and self.validate_every and self.roi.roi_frames % self.validate_every == 0:
+            self._validate(frame, result.gesture, confidence)
+        return result
+
+    def _validate(self, frame, gesture, confidence):
+        """
+        Runs the full (downscaled) frame through a separate detector and counts
+        whether it reaches the same gesture as the cropped input did.
+        """
+        if self.validator is None:
+            self.validator = mp_hands.Hands(static_image_mode=True, max_num_hands=1,
+                                            min_detection_confidence=confidence)
+        rgb_input, _ = self.roi.prepare(frame, full_frame=True)
+        results = self.validator.process(rgb_input)
+        full_gesture = None
+        if results.multi_hand_landmarks:
+            full_gesture = default_engine.classify(landmarks_to_array(results.multi_hand_landmarks[0]))
+        self.validated += 1
+        if full_gesture == gesture:
+            self.validation_agreed += 1
+
+    def stats(self):
+        return {
+            "frames_processed": self.frames_processed,
+            "frames_skipped": self.frames_skipped,
+            "read_failures": self.read_failures,
+            "frame_age": self.frame_age.summary(),
+            "sampling": self.sampler.stats(),
+            "roi": dict(self.roi.stats(), validated=self.validated, validation_agreed=self.validation_agreed),
+            "motion": self.motion.stats(),
+            "gesture_latency": gesture_latency.stats(),
+            "worker_process": self.use_process,
+            "slot_overruns": self.slot_overruns,
+            "frames_grabbed": self.grabber.frames_grabbed if self.grabber is not None else None,
+            "frames_decoded": self.grabber.frames_decoded if self.grabber is not None else None,
+        }
+
+    def print_stats(self):
+        age = self.frame_age.summary()
+        print(f"Camera Service: {self.frames_processed} frames processed, {self.frames_skipped} stale frames "
+              f"skipped, {self.read_failures} read failures, capture-to-decision age mean "
+              f"{age['mean_ms']:.1f} ms p90 {age['p90_ms']:.1f} ms max {age['max_ms']:.1f} ms")
+        if gesture_latency.tracker.histograms["dispatch"].count:
+            print(gesture_latency.tracker.summary_line())
+        if self.use_process:
+            # Sampling, ROI and motion gate run in the worker, which prints its own stats
+            print(f"Camera Service worker: {self.slot_overruns} landmark slots overwritten before they were read")
+            return
+        sampling = self.sampler.stats()
+        print(f"Camera Service sampling: {sampling['mode']} now, {sampling['active_seconds']:.0f} s active / "
+              f"{sampling['idle_seconds']:.0f} s idle, inference {sampling['inference_ms']:.1f} ms, "
+              f"{sampling['budget_limited']} frames slowed by the CPU budget")
+        if self.grabber is not None:
+            print(f"Camera Service grabber: {self.grabber.frames_decoded} of {self.grabber.frames_grabbed} "
+                  f"grabbed frames decoded")
+        roi = self.roi.stats()
+        print(f"Camera Service ROI: {roi['roi_frames']} cropped / {roi['full_frames']} full frames, "
+              f"tracking lost {roi['tracking_lost']} times"
+              + (f", {self.validation_agreed}/{self.validated} cropped frames agree with full-frame "
+                 f"detection" if self.validated else ""))
+        motion = self.motion.stats()
+        if motion["frames_checked"]:
+            print(f"Camera Service motion gate: {motion['inferences_saved']} of {motion['frames_checked']} "
+                  f"frames skipped inference (no motion, no hand)")
+
+    def close(self):
+        """
+        Stops the service and releases the camera.
+        """
+        self.stop_event.set()
+        self.has_subscribers.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+# ---------------------- Worker Process ----------------------
+
+# Landmark slots shared with the worker; each holds the (21, 3) points plus a row
+# whose first value stamps the frame id (-1 while the slot is being written)
+WORKER_SLOTS = 8
+SLOT_SHAPE = (NUM_LANDMARKS + 1, 3)
+
+def _worker_main(sender, memory_name, active, stop):
+    """
+    Entry point of the worker process: runs an in-process CameraService while
+    `active` is set and forwards each result to the parent.
+    """
+    memory = shared_memory.SharedMemory(name=memory_name)
+    slots = np.ndarray((WORKER_SLOTS,) + SLOT_SHAPE, dtype=np.float64, buffer=memory.buf)
+    service = CameraService(use_process=False)
+    try:
+        while not stop.is_set():
+            if not active.wait(0.5):
+                continue
+            with service.subscribe() as subscription:
+                while active.is_set() and not stop.is_set():
+                    result = subscription.get(timeout=0.5)
+                    if result is None:
+                        continue
+                    slot = -1
+                    if result.points is not None:
+                        slot = result.frame_id % WORKER_SLOTS
+                        slots[slot, NUM_LANDMARKS, 0] = -1
+                        slots[slot, :NUM_LANDMARKS] = result.points
+                        slots[slot, NUM_LANDMARKS, 0] = result.frame_id
+                    sender.send((result.frame_id, result.timestamp, result.ok, slot, result.gesture,
+                                 result.inferred_at, result.classified_at))
+    except (BrokenPipeError, KeyboardInterrupt):
+        pass
+    finally:
+        service.close()
+        sender.close()
+        del slots
+        memory.close()
+
+# ---------------------- Replay ----------------------
+
+class ReplayService(CameraService):
+    """
+    Publishes the landmarks of a recording made without frames as if they came
+    from the camera, classified again by the current gesture engine. speed 1
+    keeps the recorded pace, 0 publishes each result as soon as every subscriber
+    has taken the previous one. At the end a failed result is published, which
+    ends the scenes' gesture threads.
+    """
+
+    def __init__(self, path, speed=None):
+        super().__init__(use_process=False)
+        self.path = path
+        self.speed = speed if speed is not None else settings.get("replay_speed")
+
+    def _run(self):
+        recording = Recording(self.path)
+        records = recording.records
+        print(f"Camera Service Started (replaying {len(recording)} frames of {self.path}).")
+        start = time.monotonic()
+        for index, record in enumerate(records):
+            if self.stop_event.is_set():
+                break
+            while not self.has_subscribers.is_set() and not self.stop_event.is_set():
+                self.has_subscribers.wait(0.5)
+            if self.speed > 0:
+                self.stop_event.wait(start + (record["timestamp"] - records["timestamp"][0]) / self.speed
+                                     - time.monotonic())
+            result = HandResult(index + 1, time.monotonic())
+            result.inferred_at = result.timestamp
+            if record["hand"]:
+                result.points = record["points"].astype(np.float64)
+                result.gesture = default_engine.classify(result.points)
+            result.classified_at = time.monotonic()
+            self.frames_processed += 1
+            self.frame_age.add(time.monotonic() - result.timestamp)
+            self._publish(result)
+            if not self.speed:
+                self._wait_consumed()
+        else:
+            self._publish(HandResult(len(records) + 1, time.monotonic(), ok=False))
+        self.print_stats()
+        print("Camera Service Exited.")
+
+_service = None
+_service_lock = threading.Lock()
+
+def get_service():
+    """
+    Returns the process-wide camera service, creating it on first use: a
+    ReplayService when replay_path is a recording without frames.
+    """
+    global _service
+    with _service_lock:
+        if _service is None:
+            replay_path = settings.get("replay_path")
+            if replay_path and read_header(replay_path)["frame_shape"] is None:
+                _service = ReplayService(replay_path)
+            else:
+                _service = CameraService()
+        return _service
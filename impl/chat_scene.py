@@ -3,11 +3,21 @@ import openai
 import speech_recognition as sr
 import os
 import sys
-from rgbmatrix import RGBMatrix, RGBMatrixOptions
-from PIL import Image, ImageDraw, ImageFont
-import time
+from matrix_backend import RGBMatrix, RGBMatrixOptions
+from PIL import Image
 import threading
 
+import numpy as np
+
+import frame_cache
+from frame_scheduler import FrameScheduler
+from frame_store import FrameStore
+from font_registry import get_glyph_cache
+from panel_layout import PanelLayout
+from render_loop import RenderLoop
+import swap_telemetry
+from gif_stream import GifFrameStream, decode_frames, should_stream
+
 # Suppress warnings
 sys.stderr = open(os.devnull, 'w')
 os.environ["PYTHONWARNINGS"] = "ignore"
@@ -15,43 +25,100 @@ os.environ["PYTHONWARNINGS"] = "ignore"
 # Set OpenAI API key 
 # openai.api_key = "API-KEY"
 
-# LED Matrix configuration
-options = RGBMatrixOptions()
-options.rows = 64
-options.cols = 64
-options.chain_length = 1
-options.parallel = 1
-options.brightness = 75 
-options.gpio_slowdown = 4
+# LED Matrix and the render loop that owns it, created on first use so importing
+# this module needs no panel
+matrix = None
+renderer = None
+
+# The chat content is one 64x64 panel; it shows on the top-left tile of the wall
+CHAT_SIZE = 64
+BLANK_FRAME = np.zeros((CHAT_SIZE, CHAT_SIZE, 3), dtype=np.uint8)
+# Logical-size frame the chat content is placed into when the wall is larger
+wall_frame = None
+
+def init_matrix():
+    """
+    Creates the shared RGB matrix and its render loop if they do not exist yet,
+    and returns the matrix.
+    """
+    global matrix, renderer
+    if matrix is None:
+        layout = PanelLayout.from_settings()
+        options = layout.apply_options(RGBMatrixOptions())
+        options.brightness = 75 
+        options.gpio_slowdown = 4
+
+        matrix = RGBMatrix(options=options)
+        renderer = RenderLoop(matrix, layout, name="chat_scene").start()
+    elif renderer is None:
+        renderer = RenderLoop(matrix, name="chat_scene").start()
+    return matrix
 
-matrix = RGBMatrix(options=options)
+def publish(pixels, stop_event=None, skipped=0):
+    """
+    Hands a 64x64 chat frame (PIL Image or array) to the render loop, which is the
+    only thread touching the matrix. The chat threads take turns, never publishing
+    at the same time. skipped is the number of frames dropped before this one.
+    Returns False if stopped while the queue was full.
+    """
+    global wall_frame
+    pixels = np.asarray(pixels)
+    layout = renderer.layout
+    if pixels.shape[:2] != (layout.height, layout.width):
+        if wall_frame is None or wall_frame.shape[:2] != (layout.height, layout.width):
+            wall_frame = np.zeros((layout.height, layout.width, 3), dtype=np.uint8)
+        wall_frame[:CHAT_SIZE, :CHAT_SIZE] = pixels
+        pixels = wall_frame
+    return renderer.push(pixels, stop_event, skipped)
+
+# Fonts; loaded once per process and shared through the font registry
+FONT_PATH = "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf"
+SCROLL_FONT_SIZE = 8
+STATIC_FONT_SIZE = 10
+
+def load_fonts():
+    """
+    Loads both chat fonts and rasterises the printable ASCII glyphs ahead of time,
+    so the first answer is drawn without touching FreeType.
+    """
+    for font_size in (SCROLL_FONT_SIZE, STATIC_FONT_SIZE):
+        get_glyph_cache(FONT_PATH, font_size).warm()
+
+# Brightness steps of the fade-out and their lookup tables: FADE_TABLES[step][value]
+FADE_LEVELS = list(range(255, -1, -16))
+FADE_TABLES = np.round(
+    np.outer(np.array(FADE_LEVELS) / 255, np.arange(256))).astype(np.uint8)
 
 def display_text_with_fade_and_move(text, fade_out=False, delay=0.05):
-    font_path = "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf"
-    font_size = 8
+    """
+    Scrolls text across the matrix, then optionally fades the last view out.
+    Each step only slices (and for the fade, table-maps) the visible 64x64 window,
+    so the cost per step does not depend on the length of the text. Steps are
+    published every `delay` seconds on fixed deadlines.
+    """
     try:
-        font = ImageFont.truetype(font_path, font_size)
+        glyphs = get_glyph_cache(FONT_PATH, SCROLL_FONT_SIZE)
     except IOError:
         sys.exit(1)
-    dummy_image = Image.new("RGB", (1, 1))
-    dummy_draw = ImageDraw.Draw(dummy_image)
-    text_width, text_height = dummy_draw.textsize(text, font=font)
+    text_width, text_height = glyphs.measure(text)
     image_width = text_width + 64
     image = Image.new("RGB", (image_width, 64), (0, 0, 0))
-    draw = ImageDraw.Draw(image)
     y_position = (64 - text_height) // 2
-    draw.text((64, y_position), text, font=font, fill=(255, 255, 255))
+    glyphs.draw(image, (64, y_position), text, fill=(255, 255, 255))
+
+    # Keep the rendered text as an array; the render loop copies each window out
+    strip = np.asarray(image)
+    scheduler = FrameScheduler(fallback_fps=1.0 / delay)
     for x in range(0, image_width - 64 + 1):
-        frame = image.crop((x, 0, x + 64, 64))
-        matrix.SetImage(frame)
-        time.sleep(delay)
+        scheduler.next_frame()
+        publish(strip[:, x:x + 64])
     if fade_out:
-        for brightness in range(255, -1, -16):
-            faded_image = image.point(lambda p: p * (brightness / 255))
-            frame = faded_image.crop((image_width - 64, 0, image_width, 64))
-            matrix.SetImage(frame.convert("RGB"))
-            time.sleep(delay)
-    matrix.Clear()
+        last_window = strip[:, image_width - 64:]
+        for fade_table in FADE_TABLES:
+            scheduler.next_frame()
+            publish(fade_table[last_window])
+    scheduler.next_frame()
+    publish(BLANK_FRAME)
 
 def listen_for_wake_word(wake_word="hello there"):
     recognizer = sr.Recognizer()
@@ -106,9 +173,15 @@ def get_openai_response(input_text):
         print(f"An error occurred while communicating with OpenAI: {e}")
         return None
 
-def display_gif(gif_path, stop_event, delay=0.1):
+def display_gif(gif_path, stop_event, delay=0.1, streaming=None):
     """
     Displays a GIF on the LED matrix continuously until stop_event is set.
+    Frames follow the GIF's own durations; delay is used for frames without one.
+    Preprocessed frames come from the frame cache (as prepared by
+    prepare_assets.py --mode stretch) when present, and are stored there after
+    a miss. Long GIFs that are slow to decode (gif_stream.should_stream) are
+    decoded on the fly through a GifFrameStream; pass streaming=True/False to
+    force either path.
     """
     try:
         gif = Image.open(gif_path)
@@ -117,61 +190,87 @@ def display_gif(gif_path, stop_event, delay=0.1):
         return
 
     try:
-        num_frames = gif.n_frames
+        gif.n_frames
     except AttributeError:
         print("Provided image is not a GIF.")
         return
 
-    # Preprocess the gif frames into canvases to improve playback performance
-    canvases = []
-    print("Preprocessing gif, this may take a moment depending on the size of the gif...")
-    for frame_index in range(num_frames):
-        try:
-            gif.seek(frame_index)
-            frame = gif.copy()
-            frame = frame.convert("RGB")
-            frame = frame.resize((64, 64), Image.ANTIALIAS)
+    if streaming is None:
+        streaming = should_stream(gif_path)
+    if streaming:
+        gif.close()
+        stream = GifFrameStream(gif_path, 64, 64, resize_mode="stretch").start()
+        scheduler = FrameScheduler(stream.durations, fallback_fps=1.0 / delay)
+        while not stop_event.is_set():
+            scheduler.next_frame(stop_event)
+            frame = stream.next_frame(skip=scheduler.last_skipped, timeout=delay)
+            if frame is not None and not publish(frame, stop_event, scheduler.last_skipped):
+                break
+        stream.close()
+        scheduler.print_stats("GIF")
+        publish(BLANK_FRAME)
+        return
+
+    cache_key = frame_cache.cache_key(gif_path, 64, 64, "stretch")
+    cached = frame_cache.load_frames(cache_key)
+    if cached is not None:
+        gif.close()
+        frame_store = FrameStore(*cached)
+        print("Loaded gif frames from cache, displaying gif")
+    else:
+        # Preprocess the gif frames into canvases to improve playback performance
+        canvases = []
+        durations = []
+        print("Preprocessing gif, this may take a moment depending on the size of the gif...")
+        for frame, duration in decode_frames(gif, 64, 64, "stretch"):
             canvases.append(frame)
-        except EOFError:
-            break  # End of sequence
+            durations.append(duration)
 
-    gif.close()
-    print("Completed Preprocessing, displaying gif")
+        gif.close()
+        if not canvases:
+            print("The GIF has no frames to display.")
+            return
+        frame_store = FrameStore.from_images(canvases, durations)
+        frame_cache.store_frames(cache_key, frame_store.frames, gif_path, durations)
+        print("Completed Preprocessing, displaying gif")
 
-    frame_index = 0
+    scheduler = FrameScheduler(frame_store.durations, fallback_fps=1.0 / delay)
     while not stop_event.is_set():
-        frame = canvases[frame_index]
-        matrix.SetImage(frame)
-        time.sleep(delay)
-        frame_index = (frame_index + 1) % num_frames
+        frame_index = scheduler.next_frame(stop_event)
+        if stop_event.is_set() or not publish(frame_store[frame_index], stop_event, scheduler.last_skipped):
+            break
+    scheduler.print_stats("GIF")
 
-    matrix.Clear()
+    publish(BLANK_FRAME)
 
 def display_static_text(text, background_color=(255, 255, 255), text_color=(0, 0, 0)):
-    font_path = "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf"
-    font_size = 10
-
     try:
-        font = ImageFont.truetype(font_path, font_size)
+        glyphs = get_glyph_cache(FONT_PATH, STATIC_FONT_SIZE)
     except IOError:
         print("Font file not found. Please install the specified font.")
         sys.exit(1)
 
     image = Image.new("RGB", (64, 64), background_color)
-    draw = ImageDraw.Draw(image)
 
     # Calculate text size to center it
-    text_width, text_height = draw.textsize(text, font=font)
+    text_width, text_height = glyphs.measure(text)
     x = (64 - text_width) // 2
     y = (64 - text_height) // 2
 
     # Draw the text onto the image
-    draw.text((x, y), text, font=font, fill=text_color)
+    glyphs.draw(image, (x, y), text, fill=text_color)
 
-    # Display the image on the LED matrix
-    matrix.SetImage(image)
+    # Display the image on the LED matrix; the render loop keeps showing it
+    publish(image)
 
 def chat_scene():
+    init_matrix()
+    swap_telemetry.start_dumper()
+    try:
+        load_fonts()
+    except IOError:
+        print("Font file not found. Please install the specified font.")
+        sys.exit(1)
     while True:
         display_stop_event = threading.Event()
         default_display_thread = threading.Thread(target=display_static_text, args=("CHAT",))
@@ -195,6 +294,7 @@ def chat_scene():
             default_display_thread.join()
 
 def test():
+    init_matrix()
     display_text_with_fade_and_move("okay!wwwwwwwwwwwwwwwwwwwwww", fade_out=True) 
 
 if __name__ == "__main__":
@@ -202,3 +302,6 @@ if __name__ == "__main__":
         chat_scene()
     except KeyboardInterrupt:
         print("\nAssistant terminated by user.")
+        if renderer is not None:
+            renderer.stop()
+            renderer.print_stats()
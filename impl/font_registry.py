@@ -0,0 +1,126 @@
+# font_registry.py
+
+import string
+import threading
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+# ---------------------- Font Registry ----------------------
+
+_fonts = {}
+_glyph_caches = {}
+_lock = threading.Lock()
+
+def get_font(font_path, font_size):
+    """
+    Returns the TrueType font for (font_path, font_size), loading it only once per process.
+    Raises IOError if the font file cannot be loaded.
+    """
+    key = (font_path, font_size)
+    with _lock:
+        font = _fonts.get(key)
+        if font is None:
+            font = ImageFont.truetype(font_path, font_size)
+            _fonts[key] = font
+        return font
+
+def get_glyph_cache(font_path, font_size):
+    """
+    Returns the shared GlyphCache for (font_path, font_size).
+    Raises IOError if the font file cannot be loaded.
+    """
+    key = (font_path, font_size)
+    with _lock:
+        glyph_cache = _glyph_caches.get(key)
+    if glyph_cache is None:
+        glyph_cache = GlyphCache(get_font(font_path, font_size))
+        with _lock:
+            glyph_cache = _glyph_caches.setdefault(key, glyph_cache)
+    return glyph_cache
+
+# ---------------------- Glyph Cache ----------------------
+
+class GlyphCache:
+    """
+    Pre-rasterised character bitmaps and advance widths for one font.
+    Text is laid out from the cached advances and rendered by blitting cached
+    glyph masks, so no string goes through FreeType twice.
+    """
+
+    def __init__(self, font):
+        self.font = font
+        self.glyphs = {}
+        self.lock = threading.Lock()
+
+    def glyph(self, char):
+        """
+        Returns (mask, left, top, advance) for a character; mask is an (h, w) uint8 array
+        positioned at (left, top) relative to the pen position.
+        """
+        glyph = self.glyphs.get(char)
+        if glyph is None:
+            left, top, right, bottom = self.font.getbbox(char)
+            mask_image = Image.new("L", (max(right - left, 0), max(bottom - top, 0)), 0)
+            if mask_image.width and mask_image.height:
+                ImageDraw.Draw(mask_image).text((-left, -top), char, font=self.font, fill=255)
+            glyph = (np.asarray(mask_image), left, top, self.font.getlength(char))
+            with self.lock:
+                self.glyphs[char] = glyph
+        return glyph
+
+    def warm(self, chars=string.printable):
+        """
+        Rasterises a set of characters ahead of time.
+        """
+        for char in chars:
+            self.glyph(char)
+
+    def layout(self, text):
+        """
+        Returns the pen x position of every character and the total advance.
+        """
+        positions = []
+        pen = 0.0
+        for char in text:
+            positions.append(int(round(pen)))
+            pen += self.glyph(char)[3]
+        return positions, int(round(pen))
+
+    def measure(self, text):
+        """
+        Returns (width, height) of the text, like the old ImageDraw.textsize().
+        """
+        _, width = self.layout(text)
+        height = 0
+        for char in text:
+            mask, _, top, _ = self.glyph(char)
+            height = max(height, top + mask.shape[0])
+        return width, height
+
+    def render(self, text):
+        """
+        Returns an "L" mask image of the text with the pen starting at (0, 0).
+        """
+        positions, width = self.layout(text)
+        _, height = self.measure(text)
+        canvas = np.zeros((max(height, 1), max(width, 1)), dtype=np.uint8)
+        for char, pen_x in zip(text, positions):
+            mask, left, top, _ = self.glyph(char)
+            glyph_height, glyph_width = mask.shape
+            x0, y0 = pen_x + left, top
+            # Clip against the canvas; overlapping glyphs keep the brighter pixel
+            cx0, cy0 = max(x0, 0), max(y0, 0)
+            cx1 = min(x0 + glyph_width, canvas.shape[1])
+            cy1 = min(y0 + glyph_height, canvas.shape[0])
+            if cx1 > cx0 and cy1 > cy0:
+                target = canvas[cy0:cy1, cx0:cx1]
+                np.maximum(target, mask[cy0 - y0:cy1 - y0, cx0 - x0:cx1 - x0], out=target)
+        return Image.fromarray(canvas, "L")
+
+    def draw(self, image, position, text, fill):
+        """
+        Draws text onto a PIL image at position (top-left pen origin), like ImageDraw.text().
+        """
+        mask = self.render(text)
+        image.paste(fill, (position[0], position[1], position[0] + mask.width, position[1] + mask.height), mask)
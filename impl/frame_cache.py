@@ -0,0 +1,196 @@
+# frame_cache.py
+
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+
+# ---------------------- Configuration ----------------------
+
+# Cache location, overridable so the Pi can keep it on a faster/larger disk
+CACHE_DIR = os.environ.get(
+    "SMART_LIGHT_FRAME_CACHE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "res", "cache", "frames"))
+
+# Upper bound for the total size of all cached frame files (bytes)
+MAX_CACHE_BYTES = int(os.environ.get("SMART_LIGHT_FRAME_CACHE_BYTES", 64 * 1024 * 1024))
+
+# Bump whenever the on-disk layout or the preprocessing output changes
+CACHE_FORMAT_VERSION = 2
+
+# ---------------------- Cache Keys ----------------------
+
+def file_digest(path, chunk_size=1 << 20):
+    """
+    Returns the SHA-256 hex digest of the file contents.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def cache_key(image_file, matrix_width, matrix_height, resize_mode):
+    """
+    Builds the cache key for a source file and the preprocessing parameters.
+    Any change to the file contents produces a new key.
+    """
+    digest = file_digest(image_file)
+    return f"{digest[:32]}-{matrix_width}x{matrix_height}-{resize_mode}-v{CACHE_FORMAT_VERSION}"
+
+def _entry_paths(key):
+    return (os.path.join(CACHE_DIR, key + ".rgb"),
+            os.path.join(CACHE_DIR, key + ".json"))
+
+def _remove_entry(key):
+    for path in _entry_paths(key):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+# ---------------------- Load / Store ----------------------
+
+def load_frames(key):
+    """
+    Maps the cached frames for the key into memory.
+    Returns a read-only (N, H, W, 3) uint8 array and the per-frame durations (ms),
+    or None on a cache miss.
+    """
+    data_path, meta_path = _entry_paths(key)
+    try:
+        with open(meta_path, "r") as f:
+            meta = json.load(f)
+        shape = (meta["frames"], meta["height"], meta["width"], 3)
+        expected_size = shape[0] * shape[1] * shape[2] * 3
+        if meta.get("version") != CACHE_FORMAT_VERSION or os.path.getsize(data_path) != expected_size:
+            raise ValueError("cache entry does not match its metadata")
+        frames = np.memmap(data_path, dtype=np.uint8, mode="r", shape=shape)
+    except FileNotFoundError:
+        return None
+    except (ValueError, KeyError, OSError) as e:
+        print(f"Discarding broken frame cache entry {key}: {e}")
+        _remove_entry(key)
+        return None
+    durations = meta.get("durations")
+
+    # Touch the metadata so eviction treats this entry as recently used
+    try:
+        os.utime(meta_path, None)
+    except OSError:
+        pass
+    return frames, durations
+
+def peek_entry(key):
+    """
+    Returns the metadata of a valid cache entry for the key, or None.
+    Unlike load_frames(), the frames are not mapped and the entry's last use is
+    left alone, so checks for prepared assets do not keep entries from eviction.
+    """
+    data_path, meta_path = _entry_paths(key)
+    try:
+        with open(meta_path, "r") as f:
+            meta = json.load(f)
+        expected_size = meta["frames"] * meta["height"] * meta["width"] * 3
+        if meta.get("version") != CACHE_FORMAT_VERSION or os.path.getsize(data_path) != expected_size:
+            return None
+    except (OSError, ValueError, KeyError):
+        return None
+    return meta
+
+def store_frames(key, frame_images, source_path, durations=None):
+    """
+    Writes preprocessed RGB frames (PIL Images or arrays of equal size) and their
+    display durations in ms to the cache.
+    Older entries for the same source file are dropped, then the cache is trimmed.
+    An entry larger than the whole cache (MAX_CACHE_BYTES) is not written.
+    """
+    if len(frame_images) == 0:
+        return
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    data_path, meta_path = _entry_paths(key)
+    frames = np.stack([np.asarray(frame, dtype=np.uint8) for frame in frame_images])
+    meta = {
+        "version": CACHE_FORMAT_VERSION,
+        "source": os.path.abspath(source_path),
+        "frames": frames.shape[0],
+        "height": frames.shape[1],
+        "width": frames.shape[2],
+        "durations": list(durations) if durations is not None else None,
+        "created": time.time(),
+    }
+    meta_text = json.dumps(meta)
+    entry_size = frames.nbytes + len(meta_text.encode())
+    if entry_size > MAX_CACHE_BYTES:
+        # It would only be evicted again right away
+        print(f"Not caching {os.path.basename(source_path)}: {entry_size} bytes of frames exceed the "
+              f"frame cache limit of {MAX_CACHE_BYTES} bytes (SMART_LIGHT_FRAME_CACHE_BYTES)")
+        return
+
+    # Write to temporary files first so a crash never leaves a half-written entry
+    try:
+        frames.tofile(data_path + ".tmp")
+        with open(meta_path + ".tmp", "w") as f:
+            f.write(meta_text)
+        os.replace(data_path + ".tmp", data_path)
+        os.replace(meta_path + ".tmp", meta_path)
+    except OSError as e:
+        print(f"Failed to write frame cache entry {key}: {e}")
+        return
+
+    _drop_stale_entries(key, meta["source"])
+    evict(MAX_CACHE_BYTES)
+
+# ---------------------- Maintenance ----------------------
+
+def _list_entries():
+    """
+    Returns (key, metadata, size_in_bytes, last_used) for every cache entry.
+    """
+    entries = []
+    if not os.path.isdir(CACHE_DIR):
+        return entries
+    for name in os.listdir(CACHE_DIR):
+        if not name.endswith(".json"):
+            continue
+        key = name[:-len(".json")]
+        data_path, meta_path = _entry_paths(key)
+        try:
+            with open(meta_path, "r") as f:
+                meta = json.load(f)
+            size = os.path.getsize(data_path) + os.path.getsize(meta_path)
+            last_used = os.path.getmtime(meta_path)
+        except (OSError, ValueError):
+            _remove_entry(key)
+            continue
+        entries.append((key, meta, size, last_used))
+    return entries
+
+def _drop_stale_entries(current_key, source_path):
+    """
+    Removes entries built from an older version of the same source file, or
+    written in an older cache format. Entries for other sizes or resize modes
+    of the current contents are kept.
+    """
+    digest = current_key.split("-", 1)[0]
+    version_suffix = f"-v{CACHE_FORMAT_VERSION}"
+    for key, meta, _, _ in _list_entries():
+        if meta.get("source") != source_path:
+            continue
+        if not key.startswith(digest) or not key.endswith(version_suffix):
+            _remove_entry(key)
+
+def evict(max_bytes=MAX_CACHE_BYTES):
+    """
+    Deletes least recently used entries until the cache fits in max_bytes.
+    """
+    entries = sorted(_list_entries(), key=lambda entry: entry[3])
+    total = sum(entry[2] for entry in entries)
+    for key, _, size, _ in entries:
+        if total <= max_bytes:
+            break
+        _remove_entry(key)
+        total -= size
+        print(f"Evicted frame cache entry {key}")
@@ -0,0 +1,117 @@
+# frame_scheduler.py
+
+import time
+
+# ---------------------- Frame Scheduler ----------------------
+
+class FrameScheduler:
+    """
+    Paces a render loop against absolute time.monotonic() deadlines.
+
+    Each frame is shown for its own duration (GIF "duration" metadata in ms), or
+    1 / fallback_fps when a frame has none. When the loop falls behind, frames whose
+    display window has already passed are dropped instead of slowing playback down.
+    With max_interval set, long frames are split into several ticks that repeat the
+    same frame, so overlays such as scrolling text keep moving smoothly.
+    """
+
+    def __init__(self, durations=None, num_frames=1, fallback_fps=20, max_interval=None,
+                 late_tolerance=0.005):
+        # durations may be filled in lazily (e.g. by a streaming decoder)
+        self.durations = durations if durations is not None else [None] * num_frames
+        self.fallback_interval = 1.0 / fallback_fps
+        self.max_interval = max_interval
+        self.late_tolerance = late_tolerance
+
+        self.index = 0
+        self.frame_end = None
+        self.next_deadline = None
+
+        # Counters
+        self.shown_frames = 0
+        self.late_frames = 0
+        self.dropped_frames = 0
+        self.last_skipped = 0
+
+    def frame_duration(self, index):
+        """
+        Returns how long frame `index` stays on screen, in seconds.
+        """
+        duration = self.durations[index] if index < len(self.durations) else None
+        return duration / 1000.0 if duration else self.fallback_interval
+
+    def reset(self):
+        """
+        Restarts timing from the current frame, e.g. after the loop was paused.
+        """
+        self.next_deadline = None
+
+    def restart(self, durations):
+        """
+        Starts playing a new animation from its first frame, keeping the counters.
+        """
+        self.durations = durations
+        self.index = 0
+        self.next_deadline = None
+
+    def _next_tick(self, tick_start, now):
+        if self.max_interval is None:
+            return self.frame_end
+        tick = tick_start + self.max_interval
+        if tick < now:
+            tick = now + self.max_interval
+        return min(self.frame_end, tick)
+
+    def next_frame(self, stop_event=None):
+        """
+        Sleeps until the next deadline and returns the index of the frame to show.
+        last_skipped holds the number of frames dropped to catch up on this call.
+        """
+        self.last_skipped = 0
+        now = time.monotonic()
+        if self.next_deadline is None:
+            self.frame_end = now + self.frame_duration(self.index)
+            self.next_deadline = self._next_tick(now, now)
+            self.shown_frames += 1
+            return self.index
+
+        deadline = self.next_deadline
+        delay = deadline - now
+        if delay > 0:
+            if stop_event is not None:
+                stop_event.wait(delay)
+            else:
+                time.sleep(delay)
+            now = time.monotonic()
+        if now - deadline > self.late_tolerance:
+            self.late_frames += 1
+
+        num_frames = len(self.durations)
+        if max(now, deadline) >= self.frame_end:
+            # Current frame is over: move on, dropping frames that are already past
+            self.index = (self.index + 1) % num_frames
+            self.frame_end += self.frame_duration(self.index)
+            while now >= self.frame_end:
+                if self.last_skipped >= num_frames:
+                    # Too far behind to catch up (e.g. a long stall): resynchronise
+                    self.frame_end = now + self.frame_duration(self.index)
+                    break
+                self.index = (self.index + 1) % num_frames
+                self.frame_end += self.frame_duration(self.index)
+                self.last_skipped += 1
+            self.dropped_frames += self.last_skipped
+            self.shown_frames += 1
+
+        self.next_deadline = self._next_tick(deadline, now)
+        return self.index
+
+    def stats(self):
+        return {
+            "shown_frames": self.shown_frames,
+            "late_frames": self.late_frames,
+            "dropped_frames": self.dropped_frames,
+        }
+
+    def print_stats(self, name="Display"):
+        print(f"{name} timing: {self.shown_frames} frames shown, "
+              f"{self.late_frames} late, {self.dropped_frames} dropped.")
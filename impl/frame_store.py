@@ -0,0 +1,123 @@
+# frame_store.py
+
+import sys
+import time
+
+import numpy as np
+from PIL import Image
+
+# ---------------------- Frame Store ----------------------
+
+class FrameStore:
+    """
+    Preprocessed animation frames kept in a single contiguous (N, H, W, 3) uint8 array.
+    Indexing returns zero-copy per-frame views, and blit() hands the canvas a
+    read-only PIL image that shares its pixels with the array (built once per frame).
+    durations holds each frame's display time in ms (None where unknown).
+    """
+
+    def __init__(self, frames, durations=None):
+        # np.asarray keeps memory-mapped cache files mapped instead of copying them
+        self.frames = np.asarray(frames, dtype=np.uint8)
+        if self.frames.ndim != 4 or self.frames.shape[3] != 3:
+            raise ValueError(f"Expected an (N, H, W, 3) frame array, got {self.frames.shape}")
+        self.num_frames, self.height, self.width = self.frames.shape[:3]
+        self.durations = list(durations) if durations is not None else [None] * self.num_frames
+        self.scratch = Image.new("RGB", (self.width, self.height))
+        self.views = None
+
+    @classmethod
+    def from_images(cls, images, durations=None):
+        """
+        Builds a store from equally sized RGB PIL Images (or arrays).
+        """
+        if not images:
+            raise ValueError("No frames to store")
+        first = np.asarray(images[0], dtype=np.uint8)
+        frames = np.empty((len(images),) + first.shape, dtype=np.uint8)
+        for index, image in enumerate(images):
+            frames[index] = np.asarray(image, dtype=np.uint8)
+        return cls(frames, durations)
+
+    def __len__(self):
+        return self.num_frames
+
+    def __getitem__(self, index):
+        return self.frames[index]
+
+    @property
+    def bytes_per_frame(self):
+        return self.width * self.height * 3
+
+    def preload(self):
+        """
+        Reads through all frames once so a memory-mapped store is paged in
+        before it is shown.
+        """
+        for index in range(self.num_frames):
+            self.frames[index].max()
+
+    def image(self, index):
+        """
+        Returns a standalone PIL copy of a frame.
+        """
+        return Image.fromarray(self.frames[index])
+
+    def view(self, index):
+        """
+        Returns a read-only PIL image backed by frame `index` of the array itself.
+        The images are built on first use and reused; nothing is copied.
+        """
+        if self.views is None:
+            size = (self.width, self.height)
+            self.views = [Image.frombuffer("RGB", size, np.ascontiguousarray(frame), "raw", "RGB", 0, 1)
+                          for frame in self.frames]
+        return self.views[index]
+
+    def load(self, index):
+        """
+        Copies frame `index` into the store's reusable PIL image and returns it,
+        for callers that draw on top of the frame.
+        The image is overwritten by the next load().
+        """
+        self.scratch.frombytes(np.ascontiguousarray(self.frames[index]))
+        return self.scratch
+
+    def blit(self, canvas, index, offset_x=0, offset_y=0):
+        """
+        Draws frame `index` onto a FrameCanvas (or the matrix itself) without copying it.
+        """
+        canvas.SetImage(self.view(index), offset_x, offset_y)
+
+    # ---------------------- Reporting ----------------------
+
+    def report(self, canvas=None, repeats=200):
+        """
+        Prints memory per frame and, given a canvas, the blit time per frame
+        compared to calling SetImage on a list of PIL Images.
+        Returns the numbers as a dict.
+        """
+        pil_bytes = self.width * self.height * 4 + sys.getsizeof(self.scratch)
+        stats = {
+            "frames": self.num_frames,
+            "bytes_per_frame": self.bytes_per_frame,
+            "pil_bytes_per_frame": pil_bytes,
+        }
+        print(f"Frame store: {self.num_frames} frames, {self.bytes_per_frame} bytes/frame "
+              f"(PIL list: ~{pil_bytes} bytes/frame)")
+
+        if canvas is not None:
+            images = [self.image(index) for index in range(self.num_frames)]
+            start = time.perf_counter()
+            for step in range(repeats):
+                self.blit(canvas, step % self.num_frames)
+            store_time = (time.perf_counter() - start) / repeats
+            start = time.perf_counter()
+            for step in range(repeats):
+                canvas.SetImage(images[step % self.num_frames])
+            pil_time = (time.perf_counter() - start) / repeats
+            stats["blit_us"] = store_time * 1e6
+            stats["pil_set_image_us"] = pil_time * 1e6
+            print(f"Blit time per frame: {store_time * 1e6:.1f} us "
+                  f"(PIL list SetImage: {pil_time * 1e6:.1f} us)")
+        return stats
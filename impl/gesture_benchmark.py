@@ -0,0 +1,129 @@
+# gesture_benchmark.py
+#
+# Measures gesture classification time per frame: the per-landmark attribute
+# lookups the scenes used to do against gesture_engine (one (21, 3) array
+# conversion plus NumPy rules, per frame and over a whole batch), and a
+# threshold sweep over the batch. Runs on synthetic hands, so it needs neither
+# a camera nor MediaPipe.
+#
+# Usage: python3 gesture_benchmark.py [--frames 20000] [--seed 0] [--thresholds 50]
+
+import argparse
+import enum
+import time
+import types
+
+import numpy as np
+
+import gesture_engine
+
+# ---------------------- Synthetic Hands ----------------------
+
+class HandLandmark(enum.IntEnum):
+    """
+    Stand-in for mp.solutions.hands.HandLandmark, so the old code pays the same enum lookups.
+    """
+    WRIST = gesture_engine.WRIST
+    THUMB_TIP = gesture_engine.THUMB_TIP
+    INDEX_FINGER_PIP = gesture_engine.INDEX_FINGER_PIP
+    INDEX_FINGER_TIP = gesture_engine.INDEX_FINGER_TIP
+    MIDDLE_FINGER_PIP = gesture_engine.MIDDLE_FINGER_PIP
+    MIDDLE_FINGER_TIP = gesture_engine.MIDDLE_FINGER_TIP
+    RING_FINGER_PIP = gesture_engine.RING_FINGER_PIP
+    RING_FINGER_TIP = gesture_engine.RING_FINGER_TIP
+    PINKY_PIP = gesture_engine.PINKY_PIP
+    PINKY_TIP = gesture_engine.PINKY_TIP
+
+mp_hands = types.SimpleNamespace(HandLandmark=HandLandmark)
+
+def synthetic_hands(count, seed=0):
+    """
+    Returns count objects shaped like MediaPipe hand landmarks, with random coordinates.
+    """
+    rng = np.random.default_rng(seed)
+    hands = []
+    for points in rng.random((count, gesture_engine.NUM_LANDMARKS, 3)):
+        hands.append(types.SimpleNamespace(landmark=[
+            types.SimpleNamespace(x=float(x), y=float(y), z=float(z)) for x, y, z in points]))
+    return hands
+
+def legacy_recognize_gesture(hand_landmarks):
+    """
+    The per-scene implementation gesture_engine replaces, kept for comparison.
+    """
+    wrist = hand_landmarks.landmark[mp_hands.HandLandmark.WRIST]
+    thumb_tip = hand_landmarks.landmark[mp_hands.HandLandmark.THUMB_TIP]
+    index_tip = hand_landmarks.landmark[mp_hands.HandLandmark.INDEX_FINGER_TIP]
+    index_pip = hand_landmarks.landmark[mp_hands.HandLandmark.INDEX_FINGER_PIP]
+    middle_tip = hand_landmarks.landmark[mp_hands.HandLandmark.MIDDLE_FINGER_TIP]
+    middle_pip = hand_landmarks.landmark[mp_hands.HandLandmark.MIDDLE_FINGER_PIP]
+    ring_tip = hand_landmarks.landmark[mp_hands.HandLandmark.RING_FINGER_TIP]
+    ring_pip = hand_landmarks.landmark[mp_hands.HandLandmark.RING_FINGER_PIP]
+    pinky_tip = hand_landmarks.landmark[mp_hands.HandLandmark.PINKY_TIP]
+    pinky_pip = hand_landmarks.landmark[mp_hands.HandLandmark.PINKY_PIP]
+    threshold = 0.05
+    if (index_tip.y < index_pip.y and
+        middle_tip.y < middle_pip.y and
+        ring_tip.y < ring_pip.y and
+        pinky_tip.y < pinky_pip.y):
+        return "Start"
+    thumb_to_wrist_y = thumb_tip.y - wrist.y
+    if thumb_to_wrist_y < -threshold:
+        return "Up"
+    elif thumb_to_wrist_y > threshold:
+        return "Down"
+    else:
+        return "Neutral"
+
+# ---------------------- Measurement ----------------------
+
+def time_per_frame(function, inputs):
+    """
+    Mean time of function over inputs, in microseconds, and the results.
+    """
+    start = time.perf_counter()
+    results = [function(item) for item in inputs]
+    return (time.perf_counter() - start) / len(inputs) * 1e6, results
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark gesture classification per frame.")
+    parser.add_argument("--frames", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--thresholds", type=int, default=50, help="threshold settings in the sweep")
+    args = parser.parse_args()
+
+    hands = synthetic_hands(args.frames, args.seed)
+    arrays = [gesture_engine.landmarks_to_array(hand) for hand in hands]
+
+    legacy_us, legacy_results = time_per_frame(legacy_recognize_gesture, hands)
+    engine_us, engine_results = time_per_frame(gesture_engine.recognize_gesture, hands)
+    convert_us, _ = time_per_frame(gesture_engine.landmarks_to_array, hands)
+    classify_us, _ = time_per_frame(gesture_engine.default_engine.classify, arrays)
+    batch = np.stack(arrays)
+    start = time.perf_counter()
+    batch_results = gesture_engine.default_engine.classify_batch(batch)
+    batch_us = (time.perf_counter() - start) / len(batch) * 1e6
+
+    # Every threshold in one pass, scored against the default threshold's results
+    thresholds = np.linspace(0.0, 0.2, args.thresholds)
+    truth = gesture_engine.default_engine.classify_codes(batch)
+    start = time.perf_counter()
+    matrices = gesture_engine.default_engine.sweep(batch, thresholds, truth)
+    sweep_s = time.perf_counter() - start
+    loop_s = len(thresholds) * len(batch) * classify_us / 1e6
+
+    mismatches = sum(a != b for a, b in zip(legacy_results, engine_results))
+    batch_mismatches = int(np.sum(batch_results != np.array(legacy_results)))
+    print(f"{args.frames} synthetic frames")
+    print(f"  Attribute lookups (old):    {legacy_us:.2f} us/frame")
+    print(f"  Gesture engine:             {engine_us:.2f} us/frame")
+    print("  Camera service (landmarks to an array for the ROI, then classify()):")
+    print(f"    landmarks -> (21, 3):     {convert_us:.2f} us/frame")
+    print(f"    classify() on the array:  {classify_us:.2f} us/frame")
+    print(f"  Batch of all frames:        {batch_us:.3f} us/frame")
+    print(f"  Results differing from the old code: {mismatches} (batch: {batch_mismatches})")
+    print(f"  Sweep of {len(thresholds)} thresholds with confusion matrices: {sweep_s * 1e3:.1f} ms "
+          f"(per-frame loop: ~{loop_s:.1f} s); {int(matrices.sum())} frame classifications")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+# gesture_latency.py
+
+import collections
+import threading
+import time
+
+from swap_telemetry import Histogram
+
+# ---------------------- Gesture Latency ----------------------
+
+# Stages from the user's hand to the effect, in order:
+#   smoothing   first frame showing the gesture -> capture of the frame that confirmed it
+#   inference   capture -> hands.process done (frame queue, motion gate, ROI, MediaPipe)
+#   classify    hands.process done -> gesture engine done
+#   dispatch    gesture engine done -> action applied (delivery, state machine, brightness / volume)
+#   display     action applied -> next SwapOnVSync (brightness only)
+#   end_to_end  first frame showing the gesture -> the effect shows (or is heard)
+STAGES = ("smoothing", "inference", "classify", "dispatch", "display", "end_to_end")
+
+class GestureLatency:
+    """
+    Per-stage latency of gesture actions, from the capture stamps each
+    HandResult carries. Scenes call action() right after applying a gesture;
+    visible actions (brightness) are completed by the render loop's next swap
+    (frame_swapped()), audible ones (volume, pause) at once.
+    """
+
+    def __init__(self):
+        self.histograms = {stage: Histogram(bin_ms=1.0, max_ms=2000.0) for stage in STAGES}
+        # (start, acted) of visible actions waiting for a swap; bounded in case nothing swaps
+        self.pending = collections.deque(maxlen=64)
+        self.lock = threading.Lock()
+
+    def action(self, result, onset=None, visible=True):
+        """
+        Records an action taken on result. onset is the capture time of the first
+        frame of the gesture (GestureStateMachine.onset), if known.
+        """
+        now = time.monotonic()
+        start = onset if onset is not None else result.timestamp
+        with self.lock:
+            if onset is not None:
+                self.histograms["smoothing"].add(result.timestamp - onset)
+            if result.inferred_at is not None:
+                self.histograms["inference"].add(result.inferred_at - result.timestamp)
+            if result.classified_at is not None:
+                self.histograms["classify"].add(result.classified_at - result.inferred_at)
+                self.histograms["dispatch"].add(now - result.classified_at)
+            if visible:
+                self.pending.append((start, now))
+            else:
+                self.histograms["end_to_end"].add(now - start)
+
+    def frame_swapped(self):
+        """
+        Completes the visible actions taken before this swap.
+        """
+        if not self.pending:
+            return
+        now = time.monotonic()
+        with self.lock:
+            for start, acted in self.pending:
+                self.histograms["display"].add(now - acted)
+                self.histograms["end_to_end"].add(now - start)
+            self.pending.clear()
+
+    def stats(self):
+        with self.lock:
+            return {stage: histogram.summary() for stage, histogram in self.histograms.items()}
+
+    def summary_line(self):
+        stats = self.stats()
+        stages = ", ".join(f"{stage} p50 {stats[stage]['p50_ms']:.0f} / p90 {stats[stage]['p90_ms']:.0f} ms"
+                           for stage in STAGES if stats[stage]["count"])
+        return f"Gesture latency ({stats['end_to_end']['count']} actions): {stages or 'no actions yet'}"
+
+# The process-wide tracker used by the scenes and the render loop
+tracker = GestureLatency()
+
+def action(result, onset=None, visible=True):
+    tracker.action(result, onset, visible)
+
+def frame_swapped():
+    tracker.frame_swapped()
+
+def stats():
+    return tracker.stats()
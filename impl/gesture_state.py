@@ -0,0 +1,102 @@
+# gesture_state.py
+
+import collections
+import time
+
+import settings
+
+# Labels that never trigger an action: no hand in view, or a hand doing nothing
+IDLE_GESTURES = (None, "Neutral")
+
+# ---------------------- Gesture State Machine ----------------------
+
+class GestureStateMachine:
+    """
+    Turns the per-frame gesture labels of the camera service into stable events.
+
+    The last `window` labels (None for frames without a hand) are kept in a ring
+    buffer. A gesture is confirmed once it holds at least min_votes of them, and
+    stays confirmed while it keeps release_votes (one fewer by default), so a
+    single noisy frame neither triggers nor drops a gesture. update() returns a
+    gesture when it becomes confirmed and, for gestures listed in `repeat`, again
+    every repeat[gesture] seconds while it is held. cooldown[gesture] is the
+    minimum time between two events of that gesture. Everything is timestamps,
+    so the caller's loop never sleeps. Pass the frame's capture time as `now` to
+    have `onset` give the capture time of the first frame of the gesture that
+    produced the last event.
+    """
+
+    def __init__(self, repeat=None, cooldown=None, window=None, min_votes=None, release_votes=None):
+        self.window = window or settings.get("gesture_window")
+        self.min_votes = min(min_votes or settings.get("gesture_min_votes"), self.window)
+        self.release_votes = release_votes or max(self.min_votes - 1, 1)
+        self.repeat = repeat or {}
+        self.cooldown = cooldown or {}
+        self.history = collections.deque(maxlen=self.window)
+        self.times = collections.deque(maxlen=self.window)
+        self.current = None
+        self.current_since = None
+        self.last_event = {}
+        self.onset = None
+
+        # Counters
+        self.frames = 0
+        self.changes = 0
+        self.events = 0
+        self.suppressed = 0
+
+    def update(self, gesture, now=None):
+        """
+        Adds the label of one frame. Returns the gesture to act on, or None.
+        """
+        now = now if now is not None else time.monotonic()
+        self.frames += 1
+        self.history.append(gesture)
+        self.times.append(now)
+        votes = collections.Counter(self.history)
+
+        state = self.current
+        if votes[state] < self.release_votes or state is None:
+            best, count = votes.most_common(1)[0]
+            state = best if count >= self.min_votes else None
+        if state != self.current:
+            self.changes += 1
+            self.current = state
+            self.current_since = now
+            # The gesture started with its first vote in the window
+            onset = next((t for label, t in zip(self.history, self.times) if label == state), now)
+            return self._fire(state, now, onset)
+        interval = self.repeat.get(state)
+        if interval is not None and now - max(self.last_event.get(state, 0.0), self.current_since) >= interval:
+            return self._fire(state, now, now)
+        return None
+
+    def _fire(self, gesture, now, onset):
+        if gesture in IDLE_GESTURES:
+            return None
+        last = self.last_event.get(gesture)
+        if last is not None and now - last < self.cooldown.get(gesture, 0.0):
+            self.suppressed += 1
+            return None
+        self.last_event[gesture] = now
+        self.onset = onset
+        self.events += 1
+        return gesture
+
+    def reset(self):
+        """
+        Forgets the recent labels and the confirmed gesture; cooldowns keep running.
+        """
+        self.history.clear()
+        self.times.clear()
+        self.current = None
+        self.current_since = None
+
+    def stats(self):
+        return {
+            "frames": self.frames,
+            "changes": self.changes,
+            "events": self.events,
+            "suppressed": self.suppressed,
+            "current": self.current,
+        }
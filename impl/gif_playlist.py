@@ -0,0 +1,150 @@
+# gif_playlist.py
+
+import bisect
+import os
+import threading
+import time
+
+from prepare_assets import find_gifs
+
+# ---------------------- GIF Playlist ----------------------
+
+class GifPlaylist:
+    """
+    Rotates through a list (or directory) of GIFs on a timer or on request.
+
+    While one animation plays, a background thread loads the next one with
+    `loader` (path -> FrameStore), so switching is only a swap of frame stores.
+    The render loop calls poll() once per tick and switches when it returns a store.
+    A directory is scanned again whenever its listing changes (checked before each
+    prefetch), so GIFs added or removed while running join or leave the rotation.
+    """
+
+    def __init__(self, sources, loader, rotate_seconds=None):
+        self.directory = None
+        self.directory_mtime = None
+        if isinstance(sources, str):
+            if os.path.isdir(sources):
+                self.directory = sources
+                self.directory_mtime = self._directory_mtime()
+                sources = find_gifs(sources)
+            else:
+                sources = [sources]
+        self.paths = list(sources)
+        if not self.paths:
+            raise ValueError("Playlist is empty")
+        self.loader = loader
+        self.rotate_seconds = rotate_seconds
+
+        self.index = 0
+        self.current = None
+        self.next_path = None
+        self.next_store = None
+        self.next_ready = threading.Event()
+        self.switch_requested = threading.Event()
+        self.prefetch_thread = None
+        self.last_switch = time.monotonic()
+        self.last_scan = self.last_switch
+
+    def __len__(self):
+        return len(self.paths)
+
+    def start(self):
+        """
+        Loads the first animation synchronously and starts prefetching the next.
+        Returns the first FrameStore.
+        """
+        self.current = self.loader(self.paths[self.index])
+        self.last_switch = time.monotonic()
+        self._start_prefetch()
+        return self.current
+
+    def _directory_mtime(self):
+        try:
+            return os.stat(self.directory).st_mtime_ns
+        except OSError:
+            return None
+
+    def rescan(self):
+        """
+        Reads the GIF directory again if its listing changed since the last scan.
+        The rotation continues after the current animation. Returns True if the
+        list of GIFs changed.
+        """
+        self.last_scan = time.monotonic()
+        if self.directory is None:
+            return False
+        mtime = self._directory_mtime()
+        if mtime == self.directory_mtime:
+            return False
+        self.directory_mtime = mtime
+        paths = find_gifs(self.directory)
+        if not paths or paths == self.paths:
+            # An emptied directory keeps the current rotation
+            return False
+        current = self.paths[self.index]
+        self.paths = paths
+        # Index of the current animation, or of the one sorted just before it if it was removed
+        self.index = (bisect.bisect_right(paths, current) - 1) % len(paths)
+        print(f"Playlist rescanned: {len(paths)} GIFs in {self.directory}")
+        return True
+
+    def _start_prefetch(self):
+        self.rescan()
+        if len(self.paths) < 2:
+            return
+        self.next_ready.clear()
+        self.prefetch_thread = threading.Thread(
+            target=self._prefetch, args=((self.index + 1) % len(self.paths),), daemon=True)
+        self.prefetch_thread.start()
+
+    def _prefetch(self, index):
+        # Skip entries that fail to load rather than stopping the rotation
+        for _ in range(len(self.paths) - 1):
+            path = self.paths[index]
+            try:
+                frame_store = self.loader(path)
+                frame_store.preload()
+            except (Exception, SystemExit) as e:
+                print(f"Skipping {path} in playlist: {e}")
+                index = (index + 1) % len(self.paths)
+                if index == self.index:
+                    return
+                continue
+            self.next_path = path
+            self.next_store = frame_store
+            self.next_ready.set()
+            print(f"Prefetched next animation: {path}")
+            return
+
+    def request_next(self):
+        """
+        Asks for a switch to the next animation (e.g. from a gesture).
+        """
+        self.switch_requested.set()
+
+    def poll(self):
+        """
+        Returns the next FrameStore if a switch is due and it is ready, else None.
+        """
+        due = self.switch_requested.is_set() or (
+            self.rotate_seconds and time.monotonic() - self.last_switch >= self.rotate_seconds)
+        if not due:
+            return None
+        if not self.next_ready.is_set():
+            # Nothing to switch to (a single GIF, or the others failed): look for new GIFs
+            idle = self.prefetch_thread is None or not self.prefetch_thread.is_alive()
+            if idle and time.monotonic() - self.last_scan >= 1.0 and self.rescan():
+                self._start_prefetch()
+            return None
+
+        # Located by path, in case a rescan changed the list since the prefetch
+        if self.next_path in self.paths:
+            self.index = self.paths.index(self.next_path)
+        self.current = self.next_store
+        self.next_store = None
+        self.switch_requested.clear()
+        self.last_switch = time.monotonic()
+        print(f"Switched to animation: {self.next_path}")
+        self._start_prefetch()
+        return self.current
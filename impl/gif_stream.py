@@ -0,0 +1,173 @@
+# gif_stream.py
+
+import threading
+
+from PIL import Image
+
+# GIFs are streamed instead of decoded up front (see should_stream) when they have more
+# than STREAM_MIN_FRAMES frames and decoding them all would take over STREAM_MIN_DECODE_SECONDS
+STREAM_MIN_FRAMES = 48
+STREAM_MIN_DECODE_SECONDS = 1.0
+# Source pixels decoded and resized per second; a conservative figure for the Pi
+# (a desktop core manages about 20 million)
+DECODE_PIXELS_PER_SECOND = 4e6
+
+# ---------------------- Frame Resizing ----------------------
+
+def fit_frame(frame, matrix_width, matrix_height):
+    """
+    Resizes a frame to fit the matrix while maintaining aspect ratio,
+    centered on a black background. Returns an RGB PIL Image.
+    """
+    # Copy the frame to avoid modifying the original GIF
+    frame = frame.copy()
+    frame.thumbnail((matrix_width, matrix_height), Image.LANCZOS)
+    canvas_image = Image.new("RGB", (matrix_width, matrix_height), (0, 0, 0))
+    frame_position = (
+        (matrix_width - frame.width) // 2,
+        (matrix_height - frame.height) // 2
+    )
+    canvas_image.paste(frame, frame_position)
+    return canvas_image.convert("RGB")
+
+def stretch_frame(frame, matrix_width, matrix_height):
+    """
+    Stretches a frame to cover the whole matrix. Returns an RGB PIL Image.
+    """
+    return frame.convert("RGB").resize((matrix_width, matrix_height), Image.LANCZOS)
+
+RESIZE_MODES = {
+    "fit": fit_frame,
+    "stretch": stretch_frame,
+}
+
+def decode_frames(gif, matrix_width, matrix_height, resize_mode="fit"):
+    """
+    Yields (frame_image, duration_ms) for every frame of an open GIF, resized
+    for the matrix. Frames that fail to decode are reported and skipped.
+    """
+    resize = RESIZE_MODES[resize_mode]
+    for frame_index in range(getattr(gif, "n_frames", 1)):
+        try:
+            gif.seek(frame_index)
+            yield resize(gif, matrix_width, matrix_height), gif.info.get("duration")
+        except EOFError:
+            break  # End of frames
+        except Exception as e:
+            print(f"Error processing frame {frame_index}: {e}")
+
+def estimate_decode(image_file):
+    """
+    Returns (number of frames, estimated seconds to decode and resize all of them),
+    or (0, 0.0) if the GIF cannot be read. The cost follows the source size.
+    """
+    try:
+        with Image.open(image_file) as gif:
+            num_frames = getattr(gif, "n_frames", 1)
+            width, height = gif.size
+    except IOError:
+        return 0, 0.0
+    return num_frames, num_frames * width * height / DECODE_PIXELS_PER_SECOND
+
+def should_stream(image_file):
+    """
+    Whether a GIF should be decoded on the fly instead of preprocessed: only when
+    it is long (more than STREAM_MIN_FRAMES frames) and decoding it up front would
+    hold back the first frame by more than STREAM_MIN_DECODE_SECONDS.
+    """
+    num_frames, decode_seconds = estimate_decode(image_file)
+    return num_frames > STREAM_MIN_FRAMES and decode_seconds > STREAM_MIN_DECODE_SECONDS
+
+# ---------------------- Streaming Decoder ----------------------
+
+class GifFrameStream:
+    """
+    Decodes and resizes GIF frames on a producer thread, just ahead of the renderer.
+    Frames go through a fixed ring of preallocated images, so memory stays constant
+    no matter how long the animation is. Playback loops by seeking back to frame 0.
+
+    Consumer side: next_frame() returns the next decoded image, which stays valid
+    until the following call. durations is filled in (ms) as frames are decoded.
+    """
+
+    def __init__(self, image_file, matrix_width, matrix_height, window=4, resize_mode="fit"):
+        self.gif = Image.open(image_file)
+        self.num_frames = getattr(self.gif, "n_frames", 1)
+        self.resize = RESIZE_MODES[resize_mode]
+        self.width = matrix_width
+        self.height = matrix_height
+        self.durations = [None] * self.num_frames
+
+        # Ring of reusable frame buffers and the indices guarding it
+        self.slots = [Image.new("RGB", (matrix_width, matrix_height)) for _ in range(window)]
+        self.free_slots = threading.Semaphore(window)
+        self.ready_slots = threading.Semaphore(0)
+        self.write_index = 0
+        self.read_index = 0
+        self.held_slots = 0
+
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self._producer, daemon=True)
+
+    def __len__(self):
+        return self.num_frames
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def _producer(self):
+        frame_index = 0
+        while not self.stop_event.is_set():
+            # Wait for the renderer to hand back a buffer
+            if not self.free_slots.acquire(timeout=0.1):
+                continue
+            try:
+                self.gif.seek(frame_index)
+                frame = self.resize(self.gif, self.width, self.height)
+            except EOFError:
+                # Fewer frames than advertised: loop from the start
+                frame_index = 0
+                self.free_slots.release()
+                continue
+            except Exception as e:
+                print(f"Error processing frame {frame_index}: {e}")
+                frame_index = (frame_index + 1) % self.num_frames
+                self.free_slots.release()
+                continue
+
+            self.durations[frame_index] = self.gif.info.get("duration")
+            self.slots[self.write_index].paste(frame)
+            self.write_index = (self.write_index + 1) % len(self.slots)
+            self.ready_slots.release()
+            frame_index = (frame_index + 1) % self.num_frames
+
+    def next_frame(self, skip=0, timeout=None):
+        """
+        Returns the next decoded frame, first dropping up to `skip` frames that are
+        already decoded; it only waits when none is. The previously returned frame is
+        handed back to the producer. Returns None if no frame arrived within timeout;
+        the previous frame stays valid.
+        """
+        acquired = 0
+        for _ in range(skip + 1):
+            if not self.ready_slots.acquire(blocking=False):
+                break
+            acquired += 1
+        if acquired == 0:
+            if not self.ready_slots.acquire(timeout=timeout):
+                return None
+            acquired = 1
+
+        # Keep only the newest frame; older ones go back to the producer in ring order
+        self.read_index = (self.read_index + acquired) % len(self.slots)
+        for _ in range(self.held_slots + acquired - 1):
+            self.free_slots.release()
+        self.held_slots = 1
+        return self.slots[self.read_index - 1]
+
+    def close(self):
+        self.stop_event.set()
+        if self.thread.is_alive():
+            self.thread.join()
+        self.gif.close()
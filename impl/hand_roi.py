@@ -0,0 +1,104 @@
+# hand_roi.py
+
+import cv2
+import numpy as np
+
+# ---------------------- Region of Interest ----------------------
+
+class RoiTracker:
+    """
+    Prepares camera frames for hand inference.
+
+    Without a tracked hand the whole frame is used; once a hand is found, the
+    next frame is cropped to the landmarks' bounding box grown by `margin` (a
+    fraction of the box size per side) and kept square so a moving hand stays
+    inside. Either way the input is downscaled to at most inference_width
+    pixels wide before the BGR -> RGB conversion, which then only touches the
+    smaller image. Landmarks found in the input are mapped back to normalized
+    full-frame coordinates, so gesture rules see the same values as before.
+    """
+
+    def __init__(self, inference_width=256, margin=0.5, min_size=64, tracking=True):
+        self.inference_width = inference_width
+        self.margin = margin
+        self.min_size = min_size
+        self.tracking = tracking
+        self.roi = None  # (x0, y0, x1, y1) in full-frame pixels
+
+        # Counters
+        self.roi_frames = 0
+        self.full_frames = 0
+        self.tracking_lost = 0
+
+    def prepare(self, frame, full_frame=False):
+        """
+        Returns (rgb_input, window) for a BGR frame; window is the (x, y, width, height)
+        of the frame region the input covers. full_frame ignores the tracked region
+        without counting the frame.
+        """
+        frame_height, frame_width = frame.shape[:2]
+        if self.roi is not None and not full_frame:
+            x0, y0, x1, y1 = self.roi
+            region = frame[y0:y1, x0:x1]
+            window = (x0, y0, x1 - x0, y1 - y0)
+            self.roi_frames += 1
+        else:
+            region = frame
+            window = (0, 0, frame_width, frame_height)
+            if not full_frame:
+                self.full_frames += 1
+
+        if self.inference_width and window[2] > self.inference_width:
+            scale = self.inference_width / window[2]
+            size = (self.inference_width, max(int(round(window[3] * scale)), 1))
+            region = cv2.resize(region, size, interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(region, cv2.COLOR_BGR2RGB), window
+
+    def map_back(self, points, window, frame_shape):
+        """
+        Maps (21, 3) landmarks normalized to the input window to normalized
+        full-frame coordinates, in place. z keeps the x scale, as in MediaPipe.
+        """
+        frame_height, frame_width = frame_shape[:2]
+        x, y, width, height = window
+        points[:, 0] = (points[:, 0] * width + x) / frame_width
+        points[:, 1] = (points[:, 1] * height + y) / frame_height
+        points[:, 2] *= width / frame_width
+        return points
+
+    def update(self, points, frame_shape):
+        """
+        Sets the region for the next frame from full-frame landmarks, or drops
+        back to the full frame when no hand was found.
+        """
+        if points is None or not self.tracking:
+            if self.roi is not None:
+                self.tracking_lost += 1
+            self.roi = None
+            return
+        frame_height, frame_width = frame_shape[:2]
+        xs = points[:, 0] * frame_width
+        ys = points[:, 1] * frame_height
+        center_x = (xs.min() + xs.max()) / 2
+        center_y = (ys.min() + ys.max()) / 2
+        size = max(xs.max() - xs.min(), ys.max() - ys.min()) * (1 + 2 * self.margin)
+        size = min(max(size, self.min_size), frame_width, frame_height)
+        x0 = int(np.clip(center_x - size / 2, 0, frame_width - size))
+        y0 = int(np.clip(center_y - size / 2, 0, frame_height - size))
+        self.roi = (x0, y0, x0 + int(size), y0 + int(size))
+
+    def stats(self):
+        return {
+            "roi_frames": self.roi_frames,
+            "full_frames": self.full_frames,
+            "tracking_lost": self.tracking_lost,
+        }
+
+def write_landmarks(hand_landmarks, points):
+    """
+    Copies a (21, 3) array back into MediaPipe hand landmarks.
+    """
+    for landmark, (x, y, z) in zip(hand_landmarks.landmark, points.tolist()):
+        landmark.x = x
+        landmark.y = y
+        landmark.z = z
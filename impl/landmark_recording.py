@@ -0,0 +1,342 @@
+# landmark_recording.py
+#
+# Records the hand landmarks the camera service produces to a compact binary
+# file, and replays recordings so gesture logic can be benchmarked without a
+# camera: throughput of the gesture engine, decision latency of the gesture
+# state machine and accuracy against the recorded (or given) labels.
+#
+# Usage: python3 landmark_recording.py record out.slm [--seconds 30] [--label Up] [--frames 96x72]
+#        python3 landmark_recording.py bench out.slm [--threshold 0.05] [--sweep 0.01 0.2 20]
+#
+# Setting replay_path makes the scenes run on a recording instead of the camera:
+# its frames go through the whole pipeline (ReplayCapture), or, for recordings
+# without frames, its landmarks go straight to the gesture engine
+# (camera_service.ReplayService). replay_speed 0 replays as fast as the
+# subscribers take the results.
+#
+# File layout: b"SLLM", a little-endian uint32 header length, a JSON header
+# ({"version", "frame_shape", "labels"}), then fixed-size records (see
+# record_dtype), so a recording loads with one np.fromfile.
+
+import argparse
+import json
+import struct
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from gesture_engine import NUM_LANDMARKS, confusion_summary, default_engine
+
+MAGIC = b"SLLM"
+VERSION = 1
+
+# ---------------------- File Format ----------------------
+
+def record_dtype(frame_shape=None):
+    """
+    One record: capture timestamp (time.monotonic()), whether a hand was found,
+    the gesture the live pipeline recognized, the ground-truth label (0: none
+    given), the landmarks (NaN without a hand) and optionally a downscaled BGR frame.
+    """
+    fields = [
+        ("timestamp", "<f8"),
+        ("hand", "u1"),
+        ("gesture", "u1"),
+        ("label", "u1"),
+        ("points", "<f4", (NUM_LANDMARKS, 3)),
+    ]
+    if frame_shape:
+        fields.append(("frame", "u1", (frame_shape[1], frame_shape[0], 3)))
+    return np.dtype(fields)
+
+class LandmarkRecorder:
+    """
+    Appends camera service results to a recording.
+    frame_shape (width, height) also stores every frame downscaled to that size.
+    Gestures are stored as codes into `labels` (0: no hand), by default the
+    rules of the default gesture engine.
+    """
+
+    def __init__(self, path, frame_shape=None, label=None, labels=None):
+        self.path = path
+        self.frame_shape = tuple(frame_shape) if frame_shape else None
+        self.labels = list(labels or [None, "Neutral"] + [name for name, _ in default_engine.rules])
+        if label is not None and label not in self.labels:
+            self.labels.append(label)
+        self.label = self.labels.index(label) if label is not None else 0
+        self.dtype = record_dtype(self.frame_shape)
+        self.record = np.zeros(1, dtype=self.dtype)
+        self.lock = threading.Lock()
+        self.count = 0
+
+        header = json.dumps({
+            "version": VERSION,
+            "frame_shape": self.frame_shape,
+            "labels": self.labels,
+        }).encode()
+        self.file = open(path, "wb")
+        self.file.write(MAGIC + struct.pack("<I", len(header)) + header)
+
+    def write(self, result, frame=None):
+        """
+        Appends one HandResult, with the BGR frame it came from if frames are recorded.
+        """
+        record = self.record[0]
+        record["timestamp"] = result.timestamp
+        record["hand"] = result.points is not None
+        record["gesture"] = self.labels.index(result.gesture) if result.gesture in self.labels else 0
+        record["label"] = self.label
+        record["points"] = result.points if result.points is not None else np.nan
+        if self.frame_shape:
+            if frame is not None:
+                record["frame"] = cv2.resize(frame, self.frame_shape, interpolation=cv2.INTER_AREA)
+            else:
+                record["frame"] = 0
+        with self.lock:
+            self.file.write(self.record.tobytes())
+            self.count += 1
+
+    def close(self):
+        with self.lock:
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def _read_header(f, path):
+    if f.read(4) != MAGIC:
+        raise ValueError(f"{path} is not a landmark recording")
+    (length,) = struct.unpack("<I", f.read(4))
+    header = json.loads(f.read(length))
+    if header["version"] != VERSION:
+        raise ValueError(f"Unsupported recording version {header['version']}")
+    return header
+
+def read_header(path):
+    """
+    The JSON header of a recording, without loading its records.
+    """
+    with open(path, "rb") as f:
+        return _read_header(f, path)
+
+class Recording:
+    """
+    A recording loaded into memory: `records` is the structured array, `labels`
+    maps the gesture / label codes back to names.
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            header = _read_header(f, path)
+            self.frame_shape = tuple(header["frame_shape"]) if header["frame_shape"] else None
+            self.labels = header["labels"]
+            self.records = np.fromfile(f, dtype=record_dtype(self.frame_shape))
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def points(self):
+        """
+        (T, 21, 3) landmarks as float64, NaN for frames without a hand.
+        """
+        return self.records["points"].astype(np.float64)
+
+    @property
+    def hands(self):
+        return self.records["hand"].astype(bool)
+
+    def names(self, codes):
+        """
+        Gesture names for an array of codes (None for code 0).
+        """
+        return np.array(self.labels, dtype=object)[codes]
+
+# ---------------------- Replay Capture ----------------------
+
+class ReplayCapture:
+    """
+    Stands in for cv2.VideoCapture with the frames of a recording made with
+    frame_shape. speed 1 replays at the recorded pace, 0 as fast as read() is
+    called. read() fails at the end, like a camera that went away.
+    """
+
+    def __init__(self, path, speed=0.0):
+        self.recording = Recording(path)
+        if self.recording.frame_shape is None:
+            raise ValueError(f"{path} holds no frames; replay its landmarks with ReplayService")
+        self.speed = speed
+        self.index = 0
+        self.start = None
+
+    def isOpened(self):
+        return True
+
+    def read(self):
+        if self.index >= len(self.recording):
+            return False, None
+        records = self.recording.records
+        if self.speed > 0:
+            if self.start is None:
+                self.start = time.monotonic()
+            due = self.start + (records["timestamp"][self.index] - records["timestamp"][0]) / self.speed
+            delay = due - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        frame = records["frame"][self.index].copy()
+        self.index += 1
+        return True, frame
+
+    def release(self):
+        self.index = len(self.recording)
+
+# ---------------------- Benchmark ----------------------
+
+def decision_latencies(times, labels, events):
+    """
+    For every run of identical labels, the time from its first frame to the first
+    event of that gesture during the run (NaN if none fired).
+    """
+    latencies = {}
+    start = 0
+    for index in range(1, len(labels) + 1):
+        if index < len(labels) and labels[index] == labels[start]:
+            continue
+        label = labels[start]
+        if label not in (None, "Neutral"):
+            fired = [i for i in range(start, index) if events[i] == label]
+            latency = times[fired[0]] - times[start] if fired else np.nan
+            latencies.setdefault(label, []).append(latency)
+        start = index
+    return latencies
+
+def print_confusion(matrix, labels):
+    width = max(len(label) for label in labels) + 2
+    print("  " + " " * width + "".join(f"{label:>{width}}" for label in labels) + "   (rows: truth)")
+    for label, row in zip(labels, matrix):
+        print(f"  {label:<{width}}" + "".join(f"{count:>{width}}" for count in row))
+
+def sweep(recording, engine, thresholds):
+    """
+    Classifies every frame with a hand at all thresholds in one pass and prints
+    the accuracy of each against the labels (or the recorded gestures), and the
+    confusion matrix of the best.
+    """
+    records = recording.records
+    hands = recording.hands
+    codes = records["label"] if records["label"].any() else records["gesture"]
+    names = recording.names(codes[hands])
+    # Frames labelled with gestures the engine does not know cannot be scored
+    known = np.isin(names, engine.labels)
+    truth = np.array([engine.labels.index(name) for name in names[known]], dtype=np.int64)
+    points = recording.points[hands][known]
+
+    start = time.perf_counter()
+    matrices = engine.sweep(points, thresholds, truth)
+    elapsed = time.perf_counter() - start
+    print(f"  Sweep: {len(thresholds)} thresholds x {len(points)} frames in {elapsed * 1e3:.1f} ms")
+    accuracy = np.trace(matrices, axis1=1, axis2=2) / max(len(points), 1)
+    for value, score in zip(thresholds, accuracy):
+        print(f"    threshold {value:.3f}: {score * 100:5.1f}%")
+    best = int(np.argmax(accuracy))
+    print(f"  Best threshold {thresholds[best]:.3f}:")
+    print_confusion(matrices[best], engine.labels)
+    for label, values in confusion_summary(matrices[best], engine.labels)["labels"].items():
+        if values["frames"]:
+            print(f"    {label}: precision {values['precision'] * 100:.1f}%, recall {values['recall'] * 100:.1f}%")
+
+def bench(path, threshold=None, thresholds=None):
+    from gesture_state import GestureStateMachine
+
+    recording = Recording(path)
+    # Same rules (and per-frame path) as the live pipeline, at the requested threshold
+    engine = default_engine.copy(threshold)
+    records = recording.records
+    hands = recording.hands
+    points = recording.points[hands]
+    times = records["timestamp"] - records["timestamp"][0]
+    print(f"{path}: {len(recording)} frames over {times[-1] if len(times) else 0:.1f} s, "
+          f"{int(hands.sum())} with a hand")
+    if not len(points):
+        return
+
+    # Throughput: per frame through the rules, and as one batch
+    start = time.perf_counter()
+    per_frame = [engine.classify(frame) for frame in points]
+    per_frame_s = time.perf_counter() - start
+    start = time.perf_counter()
+    batch = engine.classify_batch(points)
+    batch_s = time.perf_counter() - start
+    print(f"  Per frame: {len(points) / per_frame_s:,.0f} frames/s; batch: {len(points) / batch_s:,.0f} frames/s")
+
+    # Accuracy against the labels (or, without labels, against the live pipeline)
+    gestures = np.full(len(recording), None, dtype=object)
+    gestures[hands] = batch.tolist()
+    has_labels = bool(records["label"].any())
+    truth = recording.names(records["label"] if has_labels else records["gesture"])
+    agree = np.sum(gestures[hands] == truth[hands])
+    print(f"  Agreement with the {'labels' if has_labels else 'recorded gestures'}: "
+          f"{agree}/{int(hands.sum())} ({agree / hands.sum() * 100:.1f}%); per frame == batch: "
+          f"{per_frame == list(batch)}")
+
+    # Decision latency of the state machine, in recorded time
+    state = GestureStateMachine()
+    events = [state.update(gesture, now=t) for gesture, t in zip(gestures, times)]
+    for label, values in sorted(decision_latencies(times, list(truth), events).items()):
+        values = np.asarray(values)
+        fired = values[~np.isnan(values)]
+        mean = f"{fired.mean() * 1e3:.0f} ms" if len(fired) else "-"
+        print(f"  {label}: {len(fired)}/{len(values)} runs confirmed, mean decision latency {mean}")
+
+    if thresholds is not None:
+        sweep(recording, engine, thresholds)
+
+# ---------------------- Entry Point ----------------------
+
+def record(path, seconds, label=None, frame_shape=None):
+    import camera_service
+
+    service = camera_service.get_service()
+    if frame_shape and service.use_process:
+        # The worker process only sends landmarks back, never frames
+        raise SystemExit("Recording frames needs the in-thread camera service; turn camera_process off.")
+    with LandmarkRecorder(path, frame_shape, label) as recorder:
+        service.recorder = recorder
+        with service.subscribe() as subscription:
+            print(f"Recording to {path} for {seconds:.0f} s...")
+            end = time.monotonic() + seconds
+            while time.monotonic() < end:
+                subscription.get(timeout=1.0)
+        service.recorder = None
+    service.close()
+    print(f"Recorded {recorder.count} frames.")
+
+def main():
+    parser = argparse.ArgumentParser(description="Record and replay hand landmarks.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    record_parser = commands.add_parser("record", help="record from the camera service")
+    record_parser.add_argument("path")
+    record_parser.add_argument("--seconds", type=float, default=30)
+    record_parser.add_argument("--label", help="gesture performed throughout the recording")
+    record_parser.add_argument("--frames", help="also store frames downscaled to WIDTHxHEIGHT")
+    bench_parser = commands.add_parser("bench", help="benchmark the gesture pipeline on a recording")
+    bench_parser.add_argument("path")
+    bench_parser.add_argument("--threshold", type=float)
+    bench_parser.add_argument("--sweep", nargs=3, type=float, metavar=("FIRST", "LAST", "COUNT"),
+                              help="also score COUNT thresholds from FIRST to LAST")
+    args = parser.parse_args()
+
+    if args.command == "record":
+        frame_shape = tuple(int(v) for v in args.frames.lower().split("x")) if args.frames else None
+        record(args.path, args.seconds, args.label, frame_shape)
+    else:
+        thresholds = np.linspace(args.sweep[0], args.sweep[1], int(args.sweep[2])) if args.sweep else None
+        bench(args.path, args.threshold, thresholds)
+
+if __name__ == "__main__":
+    main()
@@ -10,7 +10,8 @@ def main():
 
     if choice == "1":
         from main_scene import main_scene
-        gif_path = "../res/gifs/city.gif"
+        # Rotate through every GIF in the directory, starting with the first
+        gif_path = "../res/gifs"
         main_scene(gif_path)
     elif choice == "2":
         from music_scene import music_scene
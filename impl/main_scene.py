@@ -1,141 +1,104 @@
 # main_scene.py
 
-import cv2
-import mediapipe as mp
 import time
 import sys
 import os
 import datetime
 import threading
 
-from rgbmatrix import RGBMatrix, RGBMatrixOptions, graphics
+from matrix_backend import RGBMatrix, RGBMatrixOptions
 from PIL import Image
 
-# ---------------------- Hand Gesture Recognition ----------------------
-
-# Initialize MediaPipe Hands
-mp_hands = mp.solutions.hands
+import camera_service
+import frame_cache
+from frame_scheduler import FrameScheduler
+from frame_store import FrameStore
+import gesture_latency
+from gesture_state import GestureStateMachine
+from gif_playlist import GifPlaylist
+from gif_stream import GifFrameStream, decode_frames, should_stream
+from panel_layout import PanelLayout
+from render_loop import RenderLoop
+import swap_telemetry
+from text_layer import TextStrip
 
-def recognize_gesture(hand_landmarks):
-    """
-    Recognize hand gestures based on finger positions:
-    - "Start": All four fingers (index, middle, ring, pinky) extended (tips above PIP joints)
-    - "Up": Thumb tip is significantly above the wrist
-    - "Down": Thumb tip is significantly below the wrist
-    - "Neutral": Any other hand position
-    """
-    # Retrieve landmarks
-    wrist = hand_landmarks.landmark[mp_hands.HandLandmark.WRIST]
-    thumb_tip = hand_landmarks.landmark[mp_hands.HandLandmark.THUMB_TIP]
-    index_tip = hand_landmarks.landmark[mp_hands.HandLandmark.INDEX_FINGER_TIP]
-    index_pip = hand_landmarks.landmark[mp_hands.HandLandmark.INDEX_FINGER_PIP]
-    middle_tip = hand_landmarks.landmark[mp_hands.HandLandmark.MIDDLE_FINGER_TIP]
-    middle_pip = hand_landmarks.landmark[mp_hands.HandLandmark.MIDDLE_FINGER_PIP]
-    ring_tip = hand_landmarks.landmark[mp_hands.HandLandmark.RING_FINGER_TIP]
-    ring_pip = hand_landmarks.landmark[mp_hands.HandLandmark.RING_FINGER_PIP]
-    pinky_tip = hand_landmarks.landmark[mp_hands.HandLandmark.PINKY_TIP]
-    pinky_pip = hand_landmarks.landmark[mp_hands.HandLandmark.PINKY_PIP]
-
-    # Define a threshold to account for minor movements/noise
-    threshold = 0.05
-
-    # Check for "Start" Gesture: All four fingers extended
-    if (index_tip.y < index_pip.y and
-        middle_tip.y < middle_pip.y and
-        ring_tip.y < ring_pip.y and
-        pinky_tip.y < pinky_pip.y):
-        return "Start"
-
-    # Check for "Up" and "Down" Gestures based on thumb position
-    thumb_to_wrist_y = thumb_tip.y - wrist.y
-
-    if thumb_to_wrist_y < -threshold:
-        return "Up"
-    elif thumb_to_wrist_y > threshold:
-        return "Down"
-    else:
-        return "Neutral"
+# ---------------------- Hand Gesture Recognition ----------------------
 
-def main_scene_gesture_recognition_thread(matrix, brightness_lock, brightness, active_flag, stop_event):
+def main_scene_gesture_recognition_thread(matrix, brightness_lock, brightness, active_flag, stop_event,
+                                          playlist=None):
     """
     Adjusts the brightness of the RGB matrix based on recognized gestures.
+    With a playlist, repeating the "Start" gesture once active skips to the next animation.
     """
-    cap = cv2.VideoCapture(0)
-    with mp_hands.Hands(
-        static_image_mode=False,
-        max_num_hands=1,  # Adjust as needed
-        min_detection_confidence=0.5,
-        min_tracking_confidence=0.5
-    ) as hands:
+    with camera_service.get_service().subscribe() as subscription:
         active = False  # Local state
-        last_gesture = "Neutral"
-        gesture_start_time = time.time()
-        last_brightness_change = time.time()
-        debounce_time = 0.3  # seconds
+        # Held "Up"/"Down" step the brightness every 0.3 s; "Start" switches at most once per 1.5 s
+        state = GestureStateMachine(repeat={"Up": 0.3, "Down": 0.3}, cooldown={"Start": 1.5})
 
         print("Gesture Recognition Thread Started.")
         print("Waiting for 'Start' gesture (Open Full Hand).")
 
         while not stop_event.is_set():
-            ret, frame = cap.read()
-            if not ret:
+            # Wait for the camera service's next result
+            result = subscription.get(timeout=1.0)
+            if result is None:
+                continue
+            if not result.ok:
                 print("Error: Failed to read frame from webcam.")
                 break
 
-            # Convert the frame to RGB as MediaPipe uses RGB images
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-
-            # Process the frame to detect hands
-            results = hands.process(rgb_frame)
-
-            # Check for hand landmarks
-            if results.multi_hand_landmarks:
-                # Process the first detected hand
-                hand_landmarks = results.multi_hand_landmarks[0]
-
-                # Recognize gesture
-                gesture = recognize_gesture(hand_landmarks)
-
-                # Current time
-                current_time = time.time()
-
-                # Handle gestures based on state
-                if gesture == "Start" and not active:
-                    active = True
-                    active_flag.set()
-                    print("Recognition started. You can now perform 'Up' and 'Down' gestures.")
-                    last_gesture = "Start"
-                    gesture_start_time = current_time
-
-                elif active and gesture in ["Up", "Down"]:
-                    if (gesture != last_gesture) or (current_time - last_brightness_change > debounce_time):
-                        print(f"Recognized Gesture: {gesture}")
-                        last_gesture = gesture
-                        gesture_start_time = current_time
-                        last_brightness_change = current_time
-
-                        # Adjust brightness based on gesture
-                        with brightness_lock:
-                            if gesture == "Up":
-                                brightness[0] = min(brightness[0] + 10, 100) 
-                            elif gesture == "Down":
-                                brightness[0] = max(brightness[0] - 10, 0)  
-                            # Update the RGB matrix brightness
-                            matrix.brightness = brightness[0]
-                            print(f"Brightness set to: {brightness[0]}")
-
-            time.sleep(0.1)
-
-    cap.release()
+            # Smoothed gesture of the first detected hand, None unless it should act now
+            gesture = state.update(result.gesture, now=result.timestamp)
+            if gesture is None:
+                continue
+
+            # Handle gestures based on state
+            if gesture == "Start" and not active:
+                active = True
+                active_flag.set()
+                print("Recognition started. You can now perform 'Up' and 'Down' gestures.")
+
+            elif gesture == "Start" and playlist is not None:
+                print("Recognized Gesture: Start - switching animation")
+                playlist.request_next()
+
+            elif active and gesture in ["Up", "Down"]:
+                print(f"Recognized Gesture: {gesture}")
+
+                # Adjust brightness based on gesture
+                with brightness_lock:
+                    if gesture == "Up":
+                        brightness[0] = min(brightness[0] + 10, 100)
+                    elif gesture == "Down":
+                        brightness[0] = max(brightness[0] - 10, 0)
+                    # Update the RGB matrix brightness
+                    matrix.brightness = brightness[0]
+                    print(f"Brightness set to: {brightness[0]}")
+                # Latency from the gesture to the panel, completed by the next frame swap
+                gesture_latency.action(result, state.onset)
+
     print("Gesture Recognition Thread Exited.")
 
 # ---------------------- LED Matrix Display ----------------------
 
-def preprocess_gif(image_file, matrix_width, matrix_height):
+def preprocess_gif(image_file, matrix_width, matrix_height, use_cache=True):
     """
     Preprocess the GIF frames to fit the RGB matrix while maintaining aspect ratio.
-    Returns a list of PIL Image frames.
+    Finished frames are kept in the on-disk frame cache, so a warm start maps them
+    in without decoding. Returns a FrameStore.
     """
+    cache_key = None
+    if use_cache:
+        try:
+            cache_key = frame_cache.cache_key(image_file, matrix_width, matrix_height, "fit")
+        except OSError:
+            sys.exit("Cannot open the provided image. Ensure it's a valid GIF file.")
+        cached = frame_cache.load_frames(cache_key)
+        if cached is not None:
+            print("Loaded GIF frames from cache.")
+            cached_frames, durations = cached
+            return FrameStore(cached_frames, durations)
+
     try:
         gif = Image.open(image_file)
     except IOError:
@@ -149,93 +112,122 @@ def preprocess_gif(image_file, matrix_width, matrix_height):
         sys.exit("The GIF has no frames to display.")
 
     frame_images = []
+    durations = []
     print("Preprocessing GIF frames...")
-    for frame_index in range(num_frames):
-        try:
-            gif.seek(frame_index)
-            # Copy the frame to avoid modifying the original GIF
-            frame = gif.copy()
-            # Resize the frame to fit the matrix while maintaining aspect ratio
-            frame.thumbnail((matrix_width, matrix_height), Image.LANCZOS)
-            # Create a blank canvas and paste the frame onto it centered
-            canvas_image = Image.new("RGB", (matrix_width, matrix_height), (0, 0, 0))
-            frame_position = (
-                (matrix_width - frame.width) // 2,
-                (matrix_height - frame.height) // 2
-            )
-            canvas_image.paste(frame, frame_position)
-            # Convert the canvas_image to RGB format
-            frame_image = canvas_image.convert("RGB")
-            # Append the frame image to the list
-            frame_images.append(frame_image)
-        except EOFError:
-            break  # End of frames
-        except Exception as e:
-            print(f"Error processing frame {frame_index}: {e}")
+    # Resize each frame to fit the matrix, centered on a black canvas
+    for frame_image, duration in decode_frames(gif, matrix_width, matrix_height, "fit"):
+        frame_images.append(frame_image)
+        durations.append(duration)
     gif.close()
     print("Preprocessing completed.")
-    return frame_images
+    if not frame_images:
+        sys.exit("The GIF has no frames to display.")
+    frame_store = FrameStore.from_images(frame_images, durations)
+    if cache_key is not None:
+        frame_cache.store_frames(cache_key, frame_store.frames, image_file, durations)
+    return frame_store
 
-def led_display_thread(matrix, frame_images, font, brightness_lock, brightness, active_flag, stop_event):
+def led_display_thread(matrix, frame_images, clock_text, brightness_lock, brightness, active_flag, stop_event,
+                       fallback_fps=20, playlist=None, renderer=None):
     """
     Thread function to handle LED matrix display.
     Displays GIF frames and scrolls the current time as text.
+    frame_images is either a FrameStore of preprocessed frames or a started GifFrameStream.
+    clock_text is a TextStrip; it is only re-rasterised when the time string changes.
+    Frames are shown for their GIF durations (fallback_fps if missing); the text
+    scrolls one pixel per tick of at most 1 / fallback_fps.
+    With a GifPlaylist, the loop switches to the playlist's next (prefetched) FrameStore
+    whenever it is due.
+    Finished frames are published to renderer (a started RenderLoop, which owns the
+    canvas and maps the logical image onto the panels); without one, a loop for the
+    matrix as one panel is run for the lifetime of this thread.
     """
-    num_frames = len(frame_images)
-    frame_index = 0
+    own_renderer = renderer is None
+    if own_renderer:
+        renderer = RenderLoop(matrix, name="main_scene").start()
+    layout = renderer.layout
+    streaming = isinstance(frame_images, GifFrameStream)
+    scheduler = FrameScheduler(frame_images.durations, fallback_fps=fallback_fps,
+                               max_interval=1.0 / fallback_fps)
+    shown_frames = 0
+    frame_image = None
+    work_image = Image.new("RGB", layout.size)
 
     # Initialize variables for scrolling text
-    textColor = graphics.Color(255, 255, 255)
-    pos = matrix.width  # Starting position of the text
+    pos = layout.width  # Starting position of the text
     y_position = 10     # Vertical position of the text
 
     print("LED Display Thread Started.")
 
-    frame_canvas = matrix.CreateFrameCanvas()
-
     while not stop_event.is_set():
-        frame_canvas.Clear()
+        # Switch animation when the playlist has the next one ready
+        if playlist is not None:
+            next_store = playlist.poll()
+            if next_store is not None:
+                frame_images = next_store
+                scheduler.restart(frame_images.durations)
+
+        # Wait for the next deadline; frames that are already overdue get dropped
+        frame_index = scheduler.next_frame(stop_event)
+        if stop_event.is_set():
+            break
 
         # Get the current frame image
-        frame_image = frame_images[frame_index]
-        # Set the image onto the frame canvas
-        frame_canvas.SetImage(frame_image)
-        # Get the current time as text
-        current_time_str = datetime.datetime.now().strftime("%H:%M:%S")
-        # Draw the text onto the frame canvas
-        try:
-            text_length = graphics.DrawText(frame_canvas, font, pos, y_position, textColor, current_time_str)
-        except Exception as e:
-            print(f"Error drawing text: {e}")
-            text_length = 0
+        if streaming:
+            if scheduler.shown_frames != shown_frames or frame_image is None:
+                next_image = frame_images.next_frame(skip=scheduler.last_skipped, timeout=0.1)
+                if next_image is not None:
+                    frame_image = next_image
+                    shown_frames = scheduler.shown_frames
+            if frame_image is None:
+                continue  # Decoder has not caught up yet
+            # Draw on a copy so the decoded frame stays clean for repeated ticks
+            work_image.paste(frame_image)
+        else:
+            work_image = frame_images.load(frame_index)
+        # Get the current time as text; the strip is rebuilt once a second
+        clock_text.set_text(datetime.datetime.now().strftime("%H:%M:%S"))
+        # Composite the visible part of the text onto the frame
+        text_length = clock_text.draw(work_image, pos, y_position)
+        # Hand the finished frame to the render loop
+        if not renderer.push(work_image, stop_event, scheduler.last_skipped):
+            break
         # Update text position for scrolling
         pos -= 1
         if (pos + text_length < 0):
-            pos = frame_canvas.width
-        # Swap the frame canvas onto the matrix
-        frame_canvas = matrix.SwapOnVSync(frame_canvas)
-        # Move to the next frame, looping back to the first frame if necessary
-        frame_index = (frame_index + 1) % num_frames
-        # Control the frame rate
-        time.sleep(0.05)
+            pos = layout.width
 
+    scheduler.print_stats("LED Display")
+    if own_renderer:
+        renderer.stop()
+        renderer.print_stats()
     print("LED Display Thread Exited.")
 
 # ---------------------- Main Scene ----------------------
 
-def main_scene(gif_path):
+def main_scene(gif_path, streaming=None, rotate_seconds=60):
+    """
+    Runs the main scene. gif_path is a GIF file, or a directory / list of GIFs
+    played as a playlist that rotates every rotate_seconds or on a repeated
+    "Start" gesture. With streaming=None, a single GIF is decoded on the fly only
+    when it is long and slow to decode (gif_stream.should_stream); pass
+    True/False to force the streaming or eager path.
+    """
     # ---------------------- Configuration ----------------------
 
     # Check for GIF argument
-    if not os.path.isfile(gif_path):
+    use_playlist = not isinstance(gif_path, str) or os.path.isdir(gif_path)
+    if use_playlist:
+        streaming = False
+    elif not os.path.isfile(gif_path):
         sys.exit(f"File not found: {gif_path}")
 
-    # Configuration for the RGB matrix
-    options = RGBMatrixOptions()
-    options.rows = 64
-    options.cols = 64
-    options.chain_length = 1
-    options.parallel = 1
+    # Configuration for the RGB matrix; the panel geometry comes from the settings
+    try:
+        layout = PanelLayout.from_settings()
+    except ValueError as e:
+        sys.exit(f"Invalid panel layout: {e}")
+    options = layout.apply_options(RGBMatrixOptions())
     options.hardware_mapping = 'adafruit-hat'
     options.brightness = 70   
     options.gpio_slowdown = 4  
@@ -246,16 +238,33 @@ def main_scene(gif_path):
     except Exception as e:
         sys.exit(f"Failed to initialize RGB Matrix: {e}")
 
-    # Preprocess the GIF frames
-    frame_images = preprocess_gif(gif_path, matrix.width, matrix.height)
-
-    # Initialize the font
-    font = graphics.Font()
+    # Preprocess the GIF frames, or stream them for long animations
+    playlist = None
+    if use_playlist:
+        try:
+            playlist = GifPlaylist(gif_path, lambda path: preprocess_gif(path, layout.width, layout.height),
+                                   rotate_seconds)
+        except ValueError:
+            sys.exit(f"No GIFs found in: {gif_path}")
+        frame_images = playlist.start()
+    else:
+        if streaming is None:
+            streaming = should_stream(gif_path)
+        if streaming:
+            try:
+                frame_images = GifFrameStream(gif_path, layout.width, layout.height).start()
+            except IOError:
+                sys.exit("Cannot open the provided image. Ensure it's a valid GIF file.")
+        else:
+            frame_images = preprocess_gif(gif_path, layout.width, layout.height)
+            frame_images.report()
+
+    # Initialize the font and the cached clock text
     font_path = "../res/fonts/7x13.bdf"
     if not os.path.isfile(font_path):
         sys.exit(f"Font file not found: {font_path}")
     try:
-        font.LoadFont(font_path)
+        clock_text = TextStrip(font_path, (255, 255, 255))
     except Exception as e:
         sys.exit(f"Failed to load font: {e}")
 
@@ -267,12 +276,15 @@ def main_scene(gif_path):
 
     # Start gesture recognition thread
     gesture_thread = threading.Thread(target=main_scene_gesture_recognition_thread, args=(
-        matrix, brightness_lock, brightness, active_flag, stop_event))
+        matrix, brightness_lock, brightness, active_flag, stop_event, playlist))
     gesture_thread.start()
 
-    # Start LED display thread
+    # Start the render loop and the LED display thread feeding it
+    renderer = RenderLoop(matrix, layout, name="main_scene").start()
+    swap_telemetry.start_dumper()
     led_thread = threading.Thread(target=led_display_thread, args=(
-        matrix, frame_images, font, brightness_lock, brightness, active_flag, stop_event))
+        matrix, frame_images, clock_text, brightness_lock, brightness, active_flag, stop_event),
+        kwargs={"playlist": playlist, "renderer": renderer})
     led_thread.start()
 
     print("Press CTRL-C to stop.")
@@ -285,10 +297,16 @@ def main_scene(gif_path):
         stop_event.set()
         gesture_thread.join()
         led_thread.join()
+        renderer.stop()
+        renderer.print_stats()
+        swap_telemetry.dump()
+        if streaming:
+            frame_images.close()
+        layout.close()
         sys.exit(0)
 
 # ---------------------- Entry Point ----------------------
 
 if __name__ == "__main__":
-    gif_path = "../res/gifs/city.gif"
+    gif_path = sys.argv[1] if len(sys.argv) > 1 else "../res/gifs/city.gif"
     main_scene(gif_path)
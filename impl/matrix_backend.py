@@ -0,0 +1,17 @@
+# matrix_backend.py
+
+import settings
+
+# ---------------------- Backend Selection ----------------------
+
+# Scenes import RGBMatrix, RGBMatrixOptions and graphics from here instead of
+# rgbmatrix, so the display code also runs headless on any Linux box.
+# Select with "matrix_backend" in smart_light.json or SMART_LIGHT_MATRIX_BACKEND.
+BACKEND = settings.get("matrix_backend")
+
+if BACKEND == "emulator":
+    from matrix_emulator import RGBMatrix, RGBMatrixOptions, graphics
+elif BACKEND == "hardware":
+    from rgbmatrix import RGBMatrix, RGBMatrixOptions, graphics
+else:
+    raise ImportError(f"Unknown matrix backend: {BACKEND} (expected 'hardware' or 'emulator')")
@@ -0,0 +1,180 @@
+# matrix_emulator.py
+
+import threading
+import time
+import types
+
+import numpy as np
+from PIL import Image
+
+import settings
+from bdf_font import BdfFont
+
+# ---------------------- Options ----------------------
+
+class RGBMatrixOptions:
+    """
+    Same fields as rgbmatrix.RGBMatrixOptions; only the geometry and brightness matter here.
+    """
+
+    def __init__(self):
+        self.rows = 32
+        self.cols = 32
+        self.chain_length = 1
+        self.parallel = 1
+        self.hardware_mapping = "regular"
+        self.brightness = 100
+        self.gpio_slowdown = 1
+        self.pwm_bits = 11
+        self.pixel_mapper_config = ""
+        self.limit_refresh_rate_hz = 0
+        self.drop_privileges = True
+
+# ---------------------- Canvas ----------------------
+
+class FrameCanvas:
+    """
+    In-memory framebuffer with the drawing calls of rgbmatrix.FrameCanvas.
+    pixels is an (height, width, 3) uint8 array.
+    """
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.pixels = np.zeros((height, width, 3), dtype=np.uint8)
+
+    def Clear(self):
+        self.pixels.fill(0)
+
+    def Fill(self, red, green, blue):
+        self.pixels[:, :] = (red, green, blue)
+
+    def SetPixel(self, x, y, red, green, blue):
+        if 0 <= x < self.width and 0 <= y < self.height:
+            self.pixels[y, x] = (red, green, blue)
+
+    def SetImage(self, image, offset_x=0, offset_y=0, unsafe=True):
+        if image.mode != "RGB":
+            raise Exception("Currently, only RGB mode is supported for SetImage(). Please create images "
+                            "with mode 'RGB' or convert first with image = image.convert('RGB').")
+        self._blend(np.asarray(image), offset_x, offset_y)
+
+    def _blend(self, source, offset_x, offset_y, color=None):
+        """
+        Copies a source array onto the framebuffer, clipped to the canvas.
+        With a color given, source is a bool mask and masked pixels get that color.
+        """
+        height, width = source.shape[:2]
+        x0, y0 = max(offset_x, 0), max(offset_y, 0)
+        x1 = min(offset_x + width, self.width)
+        y1 = min(offset_y + height, self.height)
+        if x1 <= x0 or y1 <= y0:
+            return
+        window = (slice(y0 - offset_y, y1 - offset_y), slice(x0 - offset_x, x1 - offset_x))
+        target = self.pixels[y0:y1, x0:x1]
+        if color is None:
+            target[...] = source[window]
+        else:
+            target[source[window]] = color
+
+    def snapshot(self):
+        """
+        Returns a PIL copy of the framebuffer.
+        """
+        return Image.fromarray(self.pixels.copy())
+
+# ---------------------- Matrix ----------------------
+
+class RGBMatrix(FrameCanvas):
+    """
+    Headless stand-in for rgbmatrix.RGBMatrix.
+
+    The matrix itself is the front buffer. SwapOnVSync() shows a frame canvas on
+    the next tick of a simulated vsync clock (emulator_refresh_hz). With
+    emulator_realtime disabled the clock is virtual and swaps never sleep,
+    which lets benchmarks run faster than the real panel.
+    """
+
+    def __init__(self, options=None):
+        options = options or RGBMatrixOptions()
+        super().__init__(options.cols * options.chain_length, options.rows * options.parallel)
+        self.options = options
+        self.brightness = options.brightness
+        self.refresh_hz = options.limit_refresh_rate_hz or settings.get("emulator_refresh_hz")
+        self.realtime = settings.get("emulator_realtime")
+
+        self.lock = threading.Lock()
+        self.start_time = time.monotonic()
+        self.virtual_time = self.start_time
+        self.vsync_count = 0
+        self.swap_count = 0
+        self.swap_listeners = []
+
+    def CreateFrameCanvas(self):
+        return FrameCanvas(self.width, self.height)
+
+    def now(self):
+        """
+        Current time on the emulator clock (time.monotonic() in realtime mode).
+        """
+        return time.monotonic() if self.realtime else self.virtual_time
+
+    def SwapOnVSync(self, canvas, framerate_fraction=1):
+        """
+        Waits for the next simulated vsync, shows canvas and returns the old front buffer.
+        """
+        period = 1.0 / self.refresh_hz
+        with self.lock:
+            now = self.now()
+            # The epsilon keeps a clock sitting exactly on a vsync (the virtual clock after
+            # a swap) from rounding down to the previous one and swapping on it again
+            ticks = int((now - self.start_time) / period + 1e-6) + max(int(framerate_fraction), 1)
+            vsync_time = self.start_time + ticks * period
+            if self.realtime:
+                delay = vsync_time - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+            else:
+                self.virtual_time = vsync_time
+            self.vsync_count = ticks
+            self.swap_count += 1
+
+            # Show the canvas; hand it back holding the previous front buffer
+            front = self.pixels
+            self.pixels = canvas.pixels
+            canvas.pixels = front
+
+        for listener in self.swap_listeners:
+            listener(self, vsync_time)
+        return canvas
+
+    def snapshot(self, apply_brightness=False):
+        """
+        Returns what the panel shows as a PIL Image, optionally dimmed by brightness.
+        """
+        pixels = self.pixels.copy()
+        if apply_brightness:
+            pixels = (pixels.astype(np.uint16) * self.brightness // 100).astype(np.uint8)
+        return Image.fromarray(pixels)
+
+# ---------------------- Graphics ----------------------
+
+class Color:
+    def __init__(self, red=0, green=0, blue=0):
+        self.red = red
+        self.green = green
+        self.blue = blue
+
+class Font(BdfFont):
+    pass
+
+def DrawText(canvas, font, x, y, color, text):
+    """
+    Draws text with its baseline at y and returns the advance in pixels,
+    like rgbmatrix graphics.DrawText.
+    """
+    mask = font.render(text)
+    canvas._blend(mask, x, y - font.baseline, color=(color.red, color.green, color.blue))
+    return font.text_width(text)
+
+graphics = types.SimpleNamespace(Color=Color, Font=Font, DrawText=DrawText)
@@ -0,0 +1,60 @@
+# motion_gate.py
+
+import cv2
+import numpy as np
+
+# ---------------------- Motion Gate ----------------------
+
+class MotionGate:
+    """
+    Decides whether a camera frame is worth running through hand inference.
+
+    Each frame is shrunk to a small grayscale thumbnail (a few hundred pixels,
+    far cheaper than the conversion and inference it guards) and compared with
+    the thumbnail of the last frame that went through inference. A pixel counts
+    as changed when it differs by more than pixel_delta gray levels; the frame
+    passes when more than `threshold` of the pixels changed. Because the
+    reference only moves on inference, slow changes add up until they pass.
+    threshold 0 lets every frame through.
+    """
+
+    def __init__(self, threshold=0.01, size=(32, 24), pixel_delta=16):
+        self.threshold = threshold
+        self.size = size
+        self.pixel_delta = pixel_delta
+        self.reference = None
+
+        # Counters
+        self.frames_checked = 0
+        self.inferences_saved = 0
+
+    def thumbnail(self, frame):
+        small = cv2.resize(frame, self.size, interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+
+    def should_skip(self, frame, hand_tracked):
+        """
+        True when inference can be skipped: no hand was tracked on the previous
+        frame and the scene has not changed since the last inference. Otherwise
+        the frame becomes the new reference.
+        """
+        if not self.threshold:
+            return False
+        self.frames_checked += 1
+        thumbnail = self.thumbnail(frame)
+        if not hand_tracked and self.reference is not None:
+            changed = np.count_nonzero(cv2.absdiff(thumbnail, self.reference) > self.pixel_delta)
+            if changed <= self.threshold * thumbnail.size:
+                self.inferences_saved += 1
+                return True
+        self.reference = thumbnail
+        return False
+
+    def reset(self):
+        self.reference = None
+
+    def stats(self):
+        return {
+            "frames_checked": self.frames_checked,
+            "inferences_saved": self.inferences_saved,
+        }
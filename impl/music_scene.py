@@ -1,5 +1,3 @@
-import cv2
-import mediapipe as mp
 import time
 import sys
 import os
@@ -10,128 +8,68 @@ import requests
 import pygame
 
 from pycloudmusic import Music163Api
-from rgbmatrix import RGBMatrix, RGBMatrixOptions, graphics
+from matrix_backend import RGBMatrix, RGBMatrixOptions
 from PIL import Image
 
-# Initialize MediaPipe Hands
-mp_hands = mp.solutions.hands
-
-# ---------------------- Hand Gesture Recognition ----------------------
-
-def recognize_gesture(hand_landmarks):
-    """
-    Recognize hand gestures based on finger positions:
-    - "Start": All four fingers (index, middle, ring, pinky) extended (tips above PIP joints)
-    - "Up": Thumb tip is significantly above the wrist
-    - "Down": Thumb tip is significantly below the wrist
-    - "Neutral": Any other hand position
-    """
-    # Retrieve landmarks
-    wrist = hand_landmarks.landmark[mp_hands.HandLandmark.WRIST]
-    thumb_tip = hand_landmarks.landmark[mp_hands.HandLandmark.THUMB_TIP]
-    index_tip = hand_landmarks.landmark[mp_hands.HandLandmark.INDEX_FINGER_TIP]
-    index_pip = hand_landmarks.landmark[mp_hands.HandLandmark.INDEX_FINGER_PIP]
-    middle_tip = hand_landmarks.landmark[mp_hands.HandLandmark.MIDDLE_FINGER_TIP]
-    middle_pip = hand_landmarks.landmark[mp_hands.HandLandmark.MIDDLE_FINGER_PIP]
-    ring_tip = hand_landmarks.landmark[mp_hands.HandLandmark.RING_FINGER_TIP]
-    ring_pip = hand_landmarks.landmark[mp_hands.HandLandmark.RING_FINGER_PIP]
-    pinky_tip = hand_landmarks.landmark[mp_hands.HandLandmark.PINKY_TIP]
-    pinky_pip = hand_landmarks.landmark[mp_hands.HandLandmark.PINKY_PIP]
-
-    # Debugging: Print key landmarks
-    print(f"Landmarks Debug - Wrist: {wrist.y:.2f}, Thumb: {thumb_tip.y:.2f}, "
-          f"Index: {index_tip.y:.2f}, Middle: {middle_tip.y:.2f}, Ring: {ring_tip.y:.2f}, Pinky: {pinky_tip.y:.2f}")
-
-    # Define a threshold to account for minor movements/noise
-    threshold = 0.05 
-
-    # Check for "Start" Gesture: All four fingers extended
-    if (index_tip.y < index_pip.y and
-        middle_tip.y < middle_pip.y and
-        ring_tip.y < ring_pip.y and
-        pinky_tip.y < pinky_pip.y):
-        print("Detected Gesture: Start (Open Hand)")
-        return "Start"
-
-    # Check for "Up" and "Down" Gestures based on thumb position
-    thumb_to_wrist_y = thumb_tip.y - wrist.y
-    if thumb_to_wrist_y < -threshold:
-        print("Detected Gesture: Up (Thumb Above Wrist)")
-        return "Up"
-    elif thumb_to_wrist_y > threshold:
-        print("Detected Gesture: Down (Thumb Below Wrist)")
-        return "Down"
-
-    # Default gesture
-    print("Detected Gesture: Neutral")
-    return "Neutral"
-
+import camera_service
+from frame_scheduler import FrameScheduler
+import gesture_latency
+from gesture_state import GestureStateMachine
+from panel_layout import PanelLayout
+from render_loop import RenderLoop
+import swap_telemetry
+from text_layer import TextStrip
 
 # ---------------------- Gesture Recognition Thread ----------------------
 def gesture_recognition_thread(volume, volume_lock, paused, paused_lock, stop_event):
-    cap = cv2.VideoCapture(0)
-    with mp_hands.Hands(
-        static_image_mode=False,
-        max_num_hands=1,  # Allow only one hand for simplicity
-        min_detection_confidence=0.6,
-        min_tracking_confidence=0.6
-    ) as hands:
+    with camera_service.get_service().subscribe() as subscription:
         print("Gesture Recognition Thread Started.")
-        last_pause_time = time.time()
-        debounce_time = 0.2  # For pause gesture
+        volume_step = 0.05
+        # Held "Up"/"Down" step the volume every 0.25 s; "Start" toggles at most once per 3 s
+        state = GestureStateMachine(repeat={"Up": 0.25, "Down": 0.25}, cooldown={"Start": 3.0})
 
         while not stop_event.is_set():
-            ret, frame = cap.read()
-            if not ret:
+            # Wait for the camera service's next result
+            result = subscription.get(timeout=1.0)
+            if result is None:
+                continue
+            if not result.ok:
                 print("Error: Failed to read frame from webcam.")
                 break
 
-            # Convert the frame to RGB as MediaPipe uses RGB images
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-
-            # Process the frame to detect hands
-            results = hands.process(rgb_frame)
-
-            # Check for hand landmarks
-            if results.multi_hand_landmarks:
-                # Process the first detected hand
-                hand_landmarks = results.multi_hand_landmarks[0]
-
-                # Recognize gesture
-                gesture = recognize_gesture(hand_landmarks)
-
-                # Debugging: Display recognized gesture
-                print(f"Recognized Gesture: {gesture}")
-
-                # Continuous volume adjustment for "Up" and "Down"
-                if gesture == "Up":
-                    with volume_lock:
-                        volume[0] = min(volume[0] + 0.01, 1.0)  # Gradual increase
-                        pygame.mixer.music.set_volume(volume[0])
-                        print(f"Volume increased to {volume[0] * 100:.0f}%")
-                elif gesture == "Down":
-                    with volume_lock:
-                        volume[0] = max(volume[0] - 0.01, 0.0)  # Gradual decrease
-                        pygame.mixer.music.set_volume(volume[0])
-                        print(f"Volume decreased to {volume[0] * 100:.0f}%")
-                elif gesture == "Start" and time.time() - last_pause_time > debounce_time:
-                    # Toggle pause/resume
-                    with paused_lock:
-                        if paused[0]:
-                            pygame.mixer.music.unpause()
-                            print("Music resumed.")
-                            time.sleep(3)
-                        else:
-                            pygame.mixer.music.pause()
-                            print("Music paused.")
-                            time.sleep(3)
-                        paused[0] = not paused[0]
-                    last_pause_time = time.time()
-
-            # Control the frame rate (faster for responsiveness)
-            time.sleep(0.05)  # ~20 FPS
-
-    cap.release()
+            # Smoothed gesture of the first detected hand, None unless it should act now
+            gesture = state.update(result.gesture, now=result.timestamp)
+            if gesture is None:
+                continue
+
+            # Debugging: Display recognized gesture
+            print(f"Recognized Gesture: {gesture}")
+
+            # Stepped volume adjustment while "Up" or "Down" is held
+            if gesture == "Up":
+                with volume_lock:
+                    volume[0] = min(volume[0] + volume_step, 1.0)
+                    pygame.mixer.music.set_volume(volume[0])
+                    print(f"Volume increased to {volume[0] * 100:.0f}%")
+            elif gesture == "Down":
+                with volume_lock:
+                    volume[0] = max(volume[0] - volume_step, 0.0)
+                    pygame.mixer.music.set_volume(volume[0])
+                    print(f"Volume decreased to {volume[0] * 100:.0f}%")
+            elif gesture == "Start":
+                # Toggle pause/resume
+                with paused_lock:
+                    if paused[0]:
+                        pygame.mixer.music.unpause()
+                        print("Music resumed.")
+                    else:
+                        pygame.mixer.music.pause()
+                        print("Music paused.")
+                    paused[0] = not paused[0]
+
+            # Latency from the gesture to the audible change
+            gesture_latency.action(result, state.onset, visible=False)
+
     print("Gesture Recognition Thread Exited.")
 
 # ---------------------- Fetch and Process Song Information ----------------------
@@ -190,53 +128,60 @@ def preprocess_image(image_data, matrix_width, matrix_height):
 
 # ---------------------- LED Matrix Display ----------------------
 
-def led_display_thread(matrix, background_image, song_name, font, active_flag, stop_event):
+def led_display_thread(matrix, background_image, song_text, active_flag, stop_event, fps=20, renderer=None):
     """
     Thread function to handle LED matrix display.
     Displays the background image and scrolls the song name as text.
+    song_text is a TextStrip holding the song name, rasterised once up front.
+    Ticks run on fixed monotonic deadlines; missed ticks are skipped over
+    while the text keeps its scrolling speed.
+    Finished frames are published to renderer (a started RenderLoop); background_image
+    has its logical size. Without one, a loop for the matrix as one panel is run for
+    the lifetime of this thread.
     """
+    own_renderer = renderer is None
+    if own_renderer:
+        renderer = RenderLoop(matrix, name="music_scene").start()
+    layout = renderer.layout
     # Initialize variables for scrolling text
-    textColor = graphics.Color(4, 4, 3)
-    pos = matrix.width  # Starting position of the text
-    y_position = matrix.height - 10  # Vertical position of the text
+    pos = layout.width  # Starting position of the text
+    y_position = layout.height - 10  # Vertical position of the text
 
     print("LED Display Thread Started.")
 
-    # Create the frame canvas once outside the loop
-    frame_canvas = matrix.CreateFrameCanvas()
+    # Create the composition image once outside the loop
+    work_image = background_image.copy()
+    scheduler = FrameScheduler(fallback_fps=fps)
 
     try:
         while not stop_event.is_set():  # Check if the thread is explicitly stopped
             if not active_flag.is_set():  # If paused, wait until active_flag is set
                 time.sleep(0.1)
+                scheduler.reset()
                 continue
 
-            # Clear the canvas for the new frame
-            frame_canvas.Clear()
+            # Wait for the next tick
+            scheduler.next_frame(stop_event)
 
-            # Set the background image onto the frame canvas
-            frame_canvas.SetImage(background_image)
+            # Restore the background and composite the visible part of the text
+            work_image.paste(background_image)
+            text_length = song_text.draw(work_image, pos, y_position)
 
-            # Draw the text onto the frame canvas
-            try:
-                text_length = graphics.DrawText(frame_canvas, font, pos, y_position, textColor, song_name)
-            except Exception as e:
-                print(f"Error drawing text: {e}")
-                text_length = 0
+            # Hand the composed image to the render loop
+            if not renderer.push(work_image, stop_event, scheduler.last_skipped):
+                break
 
-            # Update text position for scrolling
-            pos -= 1
+            # Update text position for scrolling, catching up on skipped ticks
+            pos -= 1 + scheduler.last_skipped
             if (pos + text_length < 0):
-                pos = frame_canvas.width
-
-            # Swap the frame canvas onto the matrix
-            frame_canvas = matrix.SwapOnVSync(frame_canvas)
-
-            # Control the frame rate
-            time.sleep(0.05)
+                pos = layout.width
     except Exception as e:
         print(f"LED Display Thread encountered an error: {e}")
 
+    scheduler.print_stats("LED Display")
+    if own_renderer:
+        renderer.stop()
+        renderer.print_stats()
     print("LED Display Thread Exited.")
 
 # ---------------------- Main Execution ----------------------
@@ -255,12 +200,12 @@ def music_scene(song_id):
     # Fetch the image data into memory
     image_data = fetch_image_data(pic_url)
 
-    # Configuration for the RGB matrix
-    options = RGBMatrixOptions()
-    options.rows = 64
-    options.cols = 64
-    options.chain_length = 1
-    options.parallel = 1
+    # Configuration for the RGB matrix; the panel geometry comes from the settings
+    try:
+        layout = PanelLayout.from_settings()
+    except ValueError as e:
+        sys.exit(f"Invalid panel layout: {e}")
+    options = layout.apply_options(RGBMatrixOptions())
     options.hardware_mapping = 'adafruit-hat' 
     options.brightness = 50               
     options.gpio_slowdown = 4        
@@ -272,17 +217,17 @@ def music_scene(song_id):
         sys.exit(f"Failed to initialize RGB Matrix: {e}")
 
     # Preprocess the image
-    background_image = preprocess_image(image_data, matrix.width, matrix.height)
+    background_image = preprocess_image(image_data, layout.width, layout.height)
 
-    # Initialize the font
-    font = graphics.Font()
+    # Initialize the font and rasterise the song name once
     font_path = "../res/fonts/7x13.bdf"  
     if not os.path.isfile(font_path):
         sys.exit(f"Font file not found: {font_path}")
     try:
-        font.LoadFont(font_path)
+        song_text = TextStrip(font_path, (4, 4, 3))
     except Exception as e:
         sys.exit(f"Failed to load font: {e}")
+    song_text.set_text(song_name)
 
     # ---------------------- Music Download and Playback ----------------------
 
@@ -319,9 +264,11 @@ def music_scene(song_id):
 
     active_flag.set()  # Set the active_flag initially to allow scrolling
 
-    # Start LED display thread
+    # Start the render loop and the LED display thread feeding it
+    renderer = RenderLoop(matrix, layout, name="music_scene").start()
+    swap_telemetry.start_dumper()
     led_thread = threading.Thread(target=led_display_thread, args=(
-        matrix, background_image, song_name, font, active_flag, stop_event))
+        matrix, background_image, song_text, active_flag, stop_event), kwargs={"renderer": renderer})
     led_thread.start()
 
     # Start gesture recognition thread
@@ -340,7 +287,11 @@ def music_scene(song_id):
     stop_event.set()
     led_thread.join()
     gesture_thread.join()
+    renderer.stop()
+    renderer.print_stats()
+    swap_telemetry.dump()
     pygame.mixer.music.stop()
+    layout.close()
     sys.exit(0)
 
 if __name__ == "__main__":
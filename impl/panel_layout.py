@@ -0,0 +1,154 @@
+# panel_layout.py
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+import settings
+
+# ---------------------- Panel Layout ----------------------
+
+def parse_grid(grid):
+    """
+    Parses a "COLSxROWS" grid string (e.g. "2x2") into (cols, rows); None if empty.
+    """
+    if not grid:
+        return None
+    if isinstance(grid, str):
+        cols, _, rows = grid.lower().partition("x")
+        return int(cols), int(rows)
+    cols, rows = grid
+    return int(cols), int(rows)
+
+class PanelLayout:
+    """
+    Maps one logical canvas onto the physical chain/parallel layout of the panels.
+
+    The panels form a grid of grid_cols x grid_rows tiles on the wall. rgbmatrix
+    sees them as chain_length panels side by side on each of `parallel` chains;
+    tile i (row-major on the wall, or as listed in panel_order) is driven by
+    chain position i % chain_length on chain i // chain_length.
+
+    Scenes render to a width x height logical image and hand it to set_image().
+    When the wall grid matches the chain layout the image goes to the canvas
+    unchanged; otherwise the tiles are copied into a reusable physical image,
+    spread over tile_workers threads for large walls.
+    """
+
+    def __init__(self, panel_rows=64, panel_cols=64, chain_length=1, parallel=1, grid=None,
+                 panel_order=None, tile_workers=1):
+        self.panel_rows = panel_rows
+        self.panel_cols = panel_cols
+        self.chain_length = chain_length
+        self.parallel = parallel
+        self.grid_cols, self.grid_rows = parse_grid(grid) or (chain_length, parallel)
+        num_panels = chain_length * parallel
+        if self.grid_cols * self.grid_rows != num_panels:
+            raise ValueError(f"Grid {self.grid_cols}x{self.grid_rows} does not match "
+                             f"{chain_length} chained x {parallel} parallel panels")
+        panel_order = list(panel_order) if panel_order else list(range(num_panels))
+        if sorted(panel_order) != list(range(num_panels)):
+            raise ValueError(f"panel_order must list every panel 0..{num_panels - 1} once")
+
+        self.width = panel_cols * self.grid_cols
+        self.height = panel_rows * self.grid_rows
+        self.physical_width = panel_cols * chain_length
+        self.physical_height = panel_rows * parallel
+
+        # (logical window, physical window) per tile
+        self.tiles = []
+        for tile, slot in enumerate(panel_order):
+            grid_x, grid_y = tile % self.grid_cols, tile // self.grid_cols
+            chain_x, chain_y = slot % chain_length, slot // chain_length
+            self.tiles.append((
+                (slice(grid_y * panel_rows, (grid_y + 1) * panel_rows),
+                 slice(grid_x * panel_cols, (grid_x + 1) * panel_cols)),
+                (slice(chain_y * panel_rows, (chain_y + 1) * panel_rows),
+                 slice(chain_x * panel_cols, (chain_x + 1) * panel_cols)),
+            ))
+        self.identity = all(
+            logical == physical for logical, physical in self.tiles)
+
+        self.logical_image = Image.new("RGB", (self.width, self.height))
+        self.physical = np.zeros((self.physical_height, self.physical_width, 3), dtype=np.uint8)
+        self.physical_image = Image.new("RGB", (self.physical_width, self.physical_height))
+        self.executor = None
+        if tile_workers > 1 and not self.identity and len(self.tiles) > 1:
+            self.executor = ThreadPoolExecutor(max_workers=tile_workers, thread_name_prefix="tile")
+
+    @classmethod
+    def from_settings(cls):
+        """
+        Builds the layout from the panel_* / chain_length / parallel settings.
+        """
+        return cls(settings.get("panel_rows"), settings.get("panel_cols"),
+                   settings.get("chain_length"), settings.get("parallel"),
+                   settings.get("panel_grid"), settings.get("panel_order"),
+                   settings.get("tile_workers"))
+
+    @classmethod
+    def for_matrix(cls, matrix):
+        """
+        A single-tile layout covering an existing matrix as it is.
+        """
+        return cls(matrix.height, matrix.width)
+
+    @property
+    def size(self):
+        return self.width, self.height
+
+    def apply_options(self, options):
+        """
+        Copies the physical geometry into an RGBMatrixOptions.
+        """
+        options.rows = self.panel_rows
+        options.cols = self.panel_cols
+        options.chain_length = self.chain_length
+        options.parallel = self.parallel
+        return options
+
+    def remap(self, pixels):
+        """
+        Copies a logical (height, width, 3) array into the physical layout and
+        returns the (reused) physical array.
+        """
+        if self.executor is not None:
+            # numpy releases the GIL for the copies, so big tiles copy in parallel
+            list(self.executor.map(lambda tile: self._copy_tile(pixels, tile), self.tiles))
+        else:
+            for tile in self.tiles:
+                self._copy_tile(pixels, tile)
+        return self.physical
+
+    def _copy_tile(self, pixels, tile):
+        logical, physical = tile
+        self.physical[physical] = pixels[logical]
+
+    def set_image(self, canvas, image):
+        """
+        Shows a logical-size RGB image on a FrameCanvas (or the matrix itself).
+        """
+        if self.identity:
+            canvas.SetImage(image)
+            return
+        self.set_array(canvas, np.asarray(image))
+
+    def set_array(self, canvas, pixels):
+        """
+        Shows a logical (height, width, 3) uint8 array on a canvas.
+        Returns the (reused) image passed to SetImage, which can be set again later.
+        """
+        if self.identity:
+            image = self.logical_image
+            image.frombytes(np.ascontiguousarray(pixels))
+        else:
+            image = self.physical_image
+            image.frombytes(self.remap(pixels))
+        canvas.SetImage(image)
+        return image
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False)
+            self.executor = None
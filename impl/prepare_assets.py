@@ -0,0 +1,168 @@
+# prepare_assets.py
+#
+# Prepares ready-to-display frame packs for every GIF in res/gifs, so the scenes
+# start from the frame cache instead of decoding. GIFs are processed in parallel
+# on a process pool running at low priority, so it can run next to the display.
+#
+# Usage: python3 prepare_assets.py [--gif-dir ../res/gifs] [--workers 4] [--force]
+#                                 [--compare-serial] [--watch 30]
+
+import argparse
+import glob
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image
+
+import frame_cache
+from gif_stream import decode_frames, RESIZE_MODES
+
+GIF_DIR = "../res/gifs"
+
+# ---------------------- Preparation ----------------------
+
+def find_gifs(gif_dir):
+    """
+    Returns every GIF in gif_dir, sorted by name.
+    """
+    paths = glob.glob(os.path.join(gif_dir, "*.gif")) + glob.glob(os.path.join(gif_dir, "*.GIF"))
+    return sorted(set(paths))
+
+def prepare_gif(task):
+    """
+    Decodes, resizes and pads one GIF and writes its frame pack to the cache.
+    task is (image_file, matrix_width, matrix_height, resize_mode, force).
+    Returns a dict describing the result.
+    """
+    image_file, matrix_width, matrix_height, resize_mode, force = task
+    start = time.perf_counter()
+    result = {"path": image_file, "frames": 0, "status": "prepared"}
+    try:
+        key = frame_cache.cache_key(image_file, matrix_width, matrix_height, resize_mode)
+        cached = None if force else frame_cache.peek_entry(key)
+        if cached is not None:
+            result["frames"] = cached["frames"]
+            result["status"] = "cached"
+        else:
+            frame_images = []
+            durations = []
+            with Image.open(image_file) as gif:
+                for frame_image, duration in decode_frames(gif, matrix_width, matrix_height, resize_mode):
+                    frame_images.append(frame_image)
+                    durations.append(duration)
+            frame_cache.store_frames(key, frame_images, image_file, durations)
+            result["frames"] = len(frame_images)
+    except Exception as e:
+        result["status"] = f"failed: {e}"
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+def is_prepared(image_file, matrix_width=64, matrix_height=64, resize_mode="fit"):
+    """
+    Returns True if an up-to-date frame pack for the GIF is in the cache.
+    The entry is only checked, not loaded or marked as used.
+    """
+    try:
+        key = frame_cache.cache_key(image_file, matrix_width, matrix_height, resize_mode)
+    except OSError:
+        return False
+    return frame_cache.peek_entry(key) is not None
+
+def file_signature(path):
+    """
+    (mtime, size) of a file, or None if it is gone; cheap to compare between scans.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+def _lower_priority():
+    """
+    Worker initializer: yield the CPU to the display and gesture threads.
+    """
+    try:
+        os.nice(10)
+    except (AttributeError, OSError):
+        pass
+
+def prepare_all(paths, matrix_width=64, matrix_height=64, resize_mode="fit", workers=None, force=False):
+    """
+    Prepares all GIFs, in parallel when workers != 1.
+    Returns (results, wall_clock_seconds).
+    """
+    tasks = [(path, matrix_width, matrix_height, resize_mode, force) for path in paths]
+    start = time.perf_counter()
+    if workers == 1 or len(tasks) <= 1:
+        results = [prepare_gif(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_lower_priority) as pool:
+            results = list(pool.map(prepare_gif, tasks))
+    return results, time.perf_counter() - start
+
+def print_results(results, wall_clock):
+    for result in results:
+        print(f"  {os.path.basename(result['path'])}: {result['frames']} frames, "
+              f"{result['status']} in {result['seconds']:.2f}s")
+    print(f"  Total: {wall_clock:.2f}s wall clock")
+
+# ---------------------- Entry Point ----------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="Prepare frame packs for all GIFs.")
+    parser.add_argument("--gif-dir", default=GIF_DIR)
+    parser.add_argument("--width", type=int, default=64)
+    parser.add_argument("--height", type=int, default=64)
+    parser.add_argument("--mode", default="fit", choices=list(RESIZE_MODES))
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--force", action="store_true", help="rebuild packs that are already cached")
+    parser.add_argument("--compare-serial", action="store_true",
+                        help="also time the serial path and report the speedup")
+    parser.add_argument("--watch", type=float, default=0,
+                        help="keep running and prepare new or changed GIFs every N seconds")
+    args = parser.parse_args()
+
+    paths = find_gifs(args.gif_dir)
+    if not paths:
+        print(f"No GIFs found in {args.gif_dir}")
+        return
+
+    if args.compare_serial:
+        print(f"Serial preprocessing of {len(paths)} GIFs...")
+        serial_results, serial_time = prepare_all(paths, args.width, args.height, args.mode, 1, True)
+        print_results(serial_results, serial_time)
+        print(f"Parallel preprocessing with {args.workers} workers...")
+        results, parallel_time = prepare_all(paths, args.width, args.height, args.mode, args.workers, True)
+        print_results(results, parallel_time)
+        print(f"Speedup: {serial_time / parallel_time:.2f}x")
+    else:
+        print(f"Preparing {len(paths)} GIFs with {args.workers} workers...")
+        results, wall_clock = prepare_all(paths, args.width, args.height, args.mode, args.workers, args.force)
+        print_results(results, wall_clock)
+
+    # Only GIFs whose mtime or size changed since the last scan are hashed again;
+    # failed ones are retried on every scan
+    signatures = {result["path"]: file_signature(result["path"]) for result in results
+                  if not result["status"].startswith("failed")}
+    while args.watch > 0:
+        # New or modified GIFs miss the cache (keys follow the file contents)
+        time.sleep(args.watch)
+        changed = []
+        for path in find_gifs(args.gif_dir):
+            signature = file_signature(path)
+            if signatures.get(path) != signature:
+                signatures[path] = signature
+                changed.append(path)
+        pending = [path for path in changed if not is_prepared(path, args.width, args.height, args.mode)]
+        if pending:
+            print(f"Preparing {len(pending)} new or changed GIFs...")
+            results, wall_clock = prepare_all(pending, args.width, args.height, args.mode, args.workers)
+            print_results(results, wall_clock)
+            for result in results:
+                if result["status"].startswith("failed"):
+                    signatures.pop(result["path"], None)
+
+if __name__ == "__main__":
+    main()
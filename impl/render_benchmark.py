@@ -0,0 +1,338 @@
+# render_benchmark.py
+#
+# Drives the main, music and chat display loops for a fixed number of frames
+# against the headless matrix emulator and writes fps, frame-interval
+# percentiles and per-stage timings to a JSON file.
+#
+# Usage: python3 render_benchmark.py [--frames 300] [--output render_bench.json]
+#                                   [--scenes main music chat] [--gesture-load-ms 30]
+#                                   [--gesture-mode thread|process] [--camera]
+#
+# --camera keeps the process-wide camera service running while the scenes
+# render, and --gesture-mode decides where its capture and hand inference run:
+# in a thread of this process or in the worker process (camera_process).
+# Compare the jitter_ms and interval percentiles of a thread and a process run
+# to see what the worker process buys. --gesture-load-ms instead simulates a
+# GIL-holding gesture thread without a camera.
+# With --camera the main scene's gesture thread runs too, and the per-stage
+# gesture-to-pixel latency goes to "gesture_latency"; set replay_path to drive
+# it from a landmark recording instead of a camera.
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from io import BytesIO
+
+# The benchmark always runs on the emulator; must be set before the scenes are imported
+os.environ["SMART_LIGHT_MATRIX_BACKEND"] = "emulator"
+
+import numpy as np
+
+import gesture_latency
+import matrix_emulator
+import swap_telemetry
+from frame_scheduler import FrameScheduler
+from frame_store import FrameStore
+from matrix_backend import RGBMatrix, RGBMatrixOptions
+from render_loop import RenderLoop
+from text_layer import TextStrip
+
+GIF_PATH = "../res/gifs/city.gif"
+CHAT_GIF_PATH = "../res/gifs/loop.gif"
+FONT_PATH = "../res/fonts/7x13.bdf"
+
+# ---------------------- Measurement ----------------------
+
+class StageTimer:
+    """
+    Wraps methods with timing code and collects the duration of every call per stage.
+    """
+
+    def __init__(self):
+        self.samples = {}
+        self.patched = []
+
+    def wrap(self, owner, name, stage):
+        original = getattr(owner, name)
+        samples = self.samples.setdefault(stage, [])
+
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                samples.append(time.perf_counter() - start)
+
+        setattr(owner, name, timed)
+        self.patched.append((owner, name, original))
+
+    def restore(self):
+        for owner, name, original in reversed(self.patched):
+            setattr(owner, name, original)
+        self.patched = []
+
+    def summary(self):
+        return {stage: summarize(samples) for stage, samples in self.samples.items() if samples}
+
+class FrameRecorder:
+    """
+    Records the time of every frame shown and sets stop_event after max_frames.
+    """
+
+    def __init__(self, max_frames, stop_event):
+        self.max_frames = max_frames
+        self.stop_event = stop_event
+        self.timestamps = []
+
+    def on_frame(self, *args):
+        self.timestamps.append(time.perf_counter())
+        if len(self.timestamps) >= self.max_frames:
+            self.stop_event.set()
+
+    def summary(self):
+        stats = {"frames": len(self.timestamps)}
+        if len(self.timestamps) > 1:
+            intervals = np.diff(self.timestamps)
+            stats["fps"] = (len(self.timestamps) - 1) / (self.timestamps[-1] - self.timestamps[0])
+            stats["interval_ms"] = summarize(intervals, scale=1e3)
+            stats["jitter_ms"] = float(np.std(intervals) * 1e3)
+        return stats
+
+def summarize(samples, scale=1e6):
+    """
+    Count, mean and percentiles of a list of durations (seconds), scaled (default: us).
+    """
+    values = np.asarray(samples, dtype=float) * scale
+    p50, p90, p99 = np.percentile(values, [50, 90, 99])
+    return {
+        "count": int(values.size),
+        "mean": float(values.mean()),
+        "p50": float(p50),
+        "p90": float(p90),
+        "p99": float(p99),
+        "max": float(values.max()),
+        "total": float(values.sum()),
+    }
+
+def gesture_load(stop_event, busy_ms, period_ms=100):
+    """
+    Stands in for the gesture thread: holds the GIL for busy_ms every period_ms.
+    """
+    while not stop_event.is_set():
+        end = time.perf_counter() + busy_ms / 1000.0
+        while time.perf_counter() < end:
+            pass
+        stop_event.wait(max(period_ms - busy_ms, 0) / 1000.0)
+
+def create_matrix():
+    options = RGBMatrixOptions()
+    options.rows = 64
+    options.cols = 64
+    options.chain_length = 1
+    options.parallel = 1
+    options.brightness = 70
+    return RGBMatrix(options=options)
+
+def instrument(timer):
+    """
+    Times the stages shared by all display loops.
+    """
+    timer.wrap(FrameScheduler, "next_frame", "schedule_wait")
+    timer.wrap(FrameStore, "load", "frame_load")
+    timer.wrap(TextStrip, "set_text", "text_rasterise")
+    timer.wrap(TextStrip, "draw", "text_draw")
+    timer.wrap(RenderLoop, "push", "publish")
+    timer.wrap(matrix_emulator.FrameCanvas, "SetImage", "set_image")
+    timer.wrap(matrix_emulator.RGBMatrix, "SwapOnVSync", "swap_on_vsync")
+
+def run_loop(target, args, stop_event, timeout):
+    thread = threading.Thread(target=target, args=args)
+    thread.start()
+    thread.join(timeout)
+    stop_event.set()
+    thread.join()
+
+# ---------------------- Scenes ----------------------
+
+def bench_main(frames, timeout, gestures=False):
+    import main_scene
+
+    matrix = create_matrix()
+    frame_store = main_scene.preprocess_gif(GIF_PATH, matrix.width, matrix.height)
+    clock_text = TextStrip(FONT_PATH, (255, 255, 255))
+    stop_event = threading.Event()
+    recorder = FrameRecorder(frames, stop_event)
+    matrix.swap_listeners.append(recorder.on_frame)
+    brightness_lock, brightness, active_flag = threading.Lock(), [70], threading.Event()
+
+    # With gestures, the scene's gesture thread acts on the camera service (or replay_path)
+    gesture_thread = None
+    if gestures:
+        gesture_thread = threading.Thread(target=main_scene.main_scene_gesture_recognition_thread, args=(
+            matrix, brightness_lock, brightness, active_flag, stop_event))
+        gesture_thread.start()
+
+    timer = StageTimer()
+    instrument(timer)
+    try:
+        run_loop(main_scene.led_display_thread, (
+            matrix, frame_store, clock_text, brightness_lock, brightness, active_flag, stop_event),
+            stop_event, timeout)
+    finally:
+        timer.restore()
+        if gesture_thread is not None:
+            gesture_thread.join()
+
+    result = recorder.summary()
+    result["stages_us"] = timer.summary()
+    result["frame_store"] = frame_store.report(matrix.CreateFrameCanvas())
+    return result
+
+def bench_music(frames, timeout, gestures=False):
+    import music_scene
+    from PIL import Image
+
+    matrix = create_matrix()
+    # Any album-art-like picture will do; use the first frame of a bundled GIF
+    buffer = BytesIO()
+    with Image.open(GIF_PATH) as gif:
+        gif.convert("RGB").save(buffer, format="PNG")
+    background_image = music_scene.preprocess_image(buffer.getvalue(), matrix.width, matrix.height)
+    song_text = TextStrip(FONT_PATH, (4, 4, 3))
+    song_text.set_text("Benchmark Song - Benchmark Artist")
+    active_flag = threading.Event()
+    active_flag.set()
+    stop_event = threading.Event()
+    recorder = FrameRecorder(frames, stop_event)
+    matrix.swap_listeners.append(recorder.on_frame)
+
+    timer = StageTimer()
+    instrument(timer)
+    try:
+        run_loop(music_scene.led_display_thread, (
+            matrix, background_image, song_text, active_flag, stop_event),
+            stop_event, timeout)
+    finally:
+        timer.restore()
+
+    result = recorder.summary()
+    result["stages_us"] = timer.summary()
+    return result
+
+def bench_chat(frames, timeout, gestures=False):
+    import chat_scene
+
+    matrix = create_matrix()
+    stop_event = threading.Event()
+    recorder = FrameRecorder(frames, stop_event)
+    matrix.swap_listeners.append(recorder.on_frame)
+
+    timer = StageTimer()
+    instrument(timer)
+    timer.wrap(chat_scene, "display_text_with_fade_and_move", "text_effect_total")
+    chat_scene.matrix = matrix
+    chat_scene.init_matrix()
+    try:
+        run_loop(chat_scene.display_gif, (CHAT_GIF_PATH, stop_event), stop_event, timeout)
+        gif_result = recorder.summary()
+
+        recorder.timestamps = []
+        recorder.max_frames = float("inf")
+        chat_scene.display_text_with_fade_and_move("Benchmark answer text scrolling by", fade_out=True)
+        text_result = recorder.summary()
+    finally:
+        chat_scene.renderer.stop()
+        timer.restore()
+        chat_scene.matrix = chat_scene.renderer = None
+
+    return {"gif": gif_result, "text": text_result, "stages_us": timer.summary()}
+
+SCENES = {
+    "main": bench_main,
+    "music": bench_music,
+    "chat": bench_chat,
+}
+
+# ---------------------- Entry Point ----------------------
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"],
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the LED display loops on the emulator.")
+    parser.add_argument("--frames", type=int, default=300, help="frames to render per scene")
+    parser.add_argument("--scenes", nargs="+", default=list(SCENES), choices=list(SCENES))
+    parser.add_argument("--gesture-load-ms", type=float, default=0,
+                        help="simulate a gesture thread holding the GIL this long every 100 ms")
+    parser.add_argument("--gesture-mode", choices=["thread", "process"], default="thread",
+                        help="with --camera, run capture and hand inference in a thread or a worker process")
+    parser.add_argument("--camera", action="store_true",
+                        help="keep the camera service subscribed while the scenes render, and run the "
+                             "main scene's gesture thread for gesture-to-pixel latency")
+    parser.add_argument("--timeout", type=float, default=120, help="max seconds per scene")
+    parser.add_argument("--output", default="render_bench.json")
+    args = parser.parse_args()
+
+    results = {
+        "revision": git_revision(),
+        "timestamp": time.time(),
+        "python": sys.version.split()[0],
+        "frames_requested": args.frames,
+        "gesture_load_ms": args.gesture_load_ms,
+        "gesture_mode": args.gesture_mode,
+        "camera": args.camera,
+        "scenes": {},
+    }
+
+    load_stop = threading.Event()
+    if args.gesture_load_ms > 0:
+        threading.Thread(target=gesture_load, args=(load_stop, args.gesture_load_ms), daemon=True).start()
+    service = subscription = None
+    if args.camera:
+        import camera_service
+        # The scenes' gesture threads use the process-wide service; configure it
+        # before the first subscription starts it
+        service = camera_service.get_service()
+        if not isinstance(service, camera_service.ReplayService):
+            service.use_process = args.gesture_mode == "process"
+        subscription = service.subscribe()
+
+    try:
+        for name in args.scenes:
+            print(f"Benchmarking {name} scene...")
+            try:
+                results["scenes"][name] = SCENES[name](args.frames, args.timeout, gestures=args.camera)
+            except Exception as e:
+                print(f"Benchmark of {name} scene failed: {e}")
+                results["scenes"][name] = {"error": str(e)}
+                continue
+            result = results["scenes"][name]
+            summary = result.get("gif", result)
+            if "fps" in summary:
+                print(f"  {summary['fps']:.1f} fps, interval p50 {summary['interval_ms']['p50']:.1f} ms, "
+                      f"p99 {summary['interval_ms']['p99']:.1f} ms")
+    finally:
+        load_stop.set()
+        if service is not None:
+            subscription.close()
+            results["camera_service"] = service.stats()
+            service.close()
+    results["swap_telemetry"] = swap_telemetry.all_stats()
+    results["gesture_latency"] = gesture_latency.stats()
+    if args.camera:
+        print(gesture_latency.tracker.summary_line())
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
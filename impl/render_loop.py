@@ -0,0 +1,221 @@
+# render_loop.py
+
+import threading
+import time
+
+import numpy as np
+
+import settings
+from frame_scheduler import FrameScheduler
+import gesture_latency
+from panel_layout import PanelLayout
+from swap_telemetry import get_telemetry
+
+# ---------------------- Frame Ring ----------------------
+
+class FrameRing:
+    """
+    Bounded single-producer / single-consumer queue of preallocated frames.
+
+    Slots are (height, width, 3) uint8 arrays allocated once. The producer only
+    ever advances `head` and the consumer only `tail`; each is a single int
+    store, so neither side takes a lock. The events only wake a waiting side up.
+    Each slot also records the producer's running total of skipped frames when
+    it was published, so the consumer can tell how many were dropped before it.
+    """
+
+    def __init__(self, width, height, capacity=3):
+        self.capacity = capacity
+        self.slots = np.zeros((capacity, height, width, 3), dtype=np.uint8)
+        self.slot_skipped = np.zeros(capacity, dtype=np.int64)
+        self.skipped_total = 0  # frames the producer reported skipping
+        self.head = 0  # frames published
+        self.tail = 0  # frames consumed
+        self.space_available = threading.Event()
+        self.frame_available = threading.Event()
+        self.space_available.set()
+
+        # Counters
+        self.published = 0
+        self.superseded = 0
+        self.producer_waits = 0
+        self.max_depth = 0
+
+    def __len__(self):
+        return self.head - self.tail
+
+    def push(self, image, stop_event=None, skipped=0):
+        """
+        Copies an RGB image (or array) into the next free slot and publishes it,
+        waiting while the ring is full. Returns False if stopped while waiting.
+        skipped is the number of frames the producer dropped before this one.
+        """
+        waited = False
+        while self.head - self.tail >= self.capacity:
+            if stop_event is not None and stop_event.is_set():
+                return False
+            waited = True
+            self.space_available.clear()
+            # Re-check after clearing so a release in between is not missed
+            if self.head - self.tail >= self.capacity:
+                self.space_available.wait(0.05)
+        if waited:
+            self.producer_waits += 1
+
+        slot = self.head % self.capacity
+        self.slots[slot] = np.asarray(image)
+        self.skipped_total += skipped
+        self.slot_skipped[slot] = self.skipped_total
+        self.head += 1
+        self.published += 1
+        self.max_depth = max(self.max_depth, self.head - self.tail)
+        self.frame_available.set()
+        return True
+
+    def peek(self):
+        """
+        Returns the oldest published slot without consuming it, or None if empty.
+        """
+        if self.head == self.tail:
+            return None
+        return self.slots[self.tail % self.capacity]
+
+    def peek_skipped(self):
+        """
+        The producer's skipped total when the slot returned by peek() was published.
+        """
+        return int(self.slot_skipped[self.tail % self.capacity])
+
+    def skip_to_latest(self):
+        """
+        Frees every queued frame but the newest, so peek() returns the newest.
+        Returns the number of frames skipped.
+        """
+        head = self.head
+        skipped = max(head - self.tail - 1, 0)
+        if skipped:
+            self.tail = head - 1
+            self.superseded += skipped
+            self.space_available.set()
+        return skipped
+
+    def release(self):
+        """
+        Frees the slot returned by peek().
+        """
+        self.tail += 1
+        self.space_available.set()
+
+# ---------------------- Render Loop ----------------------
+
+class RenderLoop:
+    """
+    Owns the matrix and its double-buffered FrameCanvas on a dedicated thread.
+
+    Scenes publish finished logical-size frames with push(); the loop ticks at a
+    steady refresh_fps, shows the newest queued frame (older ones are superseded)
+    and swaps it on vsync. When no new frame is ready the last one is shown again,
+    so slow content work holds a frame instead of stalling the panel.
+    Swap timing is recorded in the swap telemetry under `name`, with the ticks
+    the loop fell behind and the frames the scene's scheduler skipped (passed
+    to push()) counted as dropped.
+    """
+
+    def __init__(self, matrix, layout=None, refresh_fps=None, capacity=None, name="render_loop"):
+        self.matrix = matrix
+        self.name = name
+        self.layout = layout if layout is not None else PanelLayout.for_matrix(matrix)
+        self.refresh_fps = refresh_fps or settings.get("render_fps")
+        self.ring = FrameRing(self.layout.width, self.layout.height,
+                              capacity or settings.get("render_queue_frames"))
+        self.telemetry = get_telemetry(name, 1.0 / self.refresh_fps)
+        self.stop_event = threading.Event()
+        self.thread = None
+
+        # Counters
+        self.ticks = 0
+        self.new_frames = 0
+        self.repeated_frames = 0
+        self.depth_total = 0
+
+    def start(self):
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._run, name="render-loop", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def push(self, image, stop_event=None, skipped=0):
+        """
+        Publishes a frame; blocks while the queue is full (see FrameRing.push).
+        skipped is the number of frames the scene dropped before this one.
+        """
+        return self.ring.push(image, stop_event, skipped)
+
+    def queue_depth(self):
+        return len(self.ring)
+
+    def _run(self):
+        frame_canvas = self.matrix.CreateFrameCanvas()
+        scheduler = FrameScheduler(fallback_fps=self.refresh_fps)
+        last_image = None
+        shown_skipped = 0  # producer's skipped total at the last frame shown
+
+        while not self.stop_event.is_set():
+            scheduler.next_frame(self.stop_event)
+            if self.stop_event.is_set():
+                break
+            self.telemetry.loop_start()
+
+            depth = len(self.ring)
+            self.depth_total += depth
+            self.ticks += 1
+            self.ring.skip_to_latest()
+            pixels = self.ring.peek()
+            skipped = scheduler.last_skipped
+            if pixels is not None:
+                producer_skipped = self.ring.peek_skipped()
+                skipped += producer_skipped - shown_skipped
+                shown_skipped = producer_skipped
+                last_image = self.layout.set_array(frame_canvas, pixels)
+                self.ring.release()
+                self.new_frames += 1
+            elif last_image is not None:
+                # Nothing new: the back buffer holds an older frame, so show the last one again
+                self.repeated_frames += 1
+                frame_canvas.SetImage(last_image)
+            else:
+                # Nothing published yet
+                self.telemetry.idle()
+                self.ring.frame_available.wait(1.0 / self.refresh_fps)
+                self.ring.frame_available.clear()
+                continue
+            swap_start = time.perf_counter()
+            frame_canvas = self.matrix.SwapOnVSync(frame_canvas)
+            self.telemetry.swapped(swap_start, skipped)
+            # Brightness set by a gesture shows from this swap on
+            gesture_latency.frame_swapped()
+
+    def stats(self):
+        return {
+            "ticks": self.ticks,
+            "new_frames": self.new_frames,
+            "repeated_frames": self.repeated_frames,
+            "queue_depth": len(self.ring),
+            "mean_queue_depth": self.depth_total / self.ticks if self.ticks else 0.0,
+            "max_queue_depth": self.ring.max_depth,
+            "superseded_frames": self.ring.superseded,
+            "producer_waits": self.ring.producer_waits,
+        }
+
+    def print_stats(self, name="Render Loop"):
+        stats = self.stats()
+        print(f"{name}: {stats['ticks']} ticks, {stats['new_frames']} new frames, "
+              f"{stats['repeated_frames']} repeated, queue depth mean {stats['mean_queue_depth']:.2f} "
+              f"max {stats['max_queue_depth']}, {stats['superseded_frames']} superseded, "
+              f"producer waited {stats['producer_waits']} times.")
@@ -11,65 +11,16 @@ import requests
 import pygame
 
 from pycloudmusic import Music163Api
-from rgbmatrix import RGBMatrix, RGBMatrixOptions, graphics
+from matrix_backend import RGBMatrix, RGBMatrixOptions, graphics
 
+from gesture_engine import recognize_gesture
+from gesture_state import GestureStateMachine
 from search_module import search_music_by_voice
 from PIL import Image
 
 # Initialize MediaPipe Hands
 mp_hands = mp.solutions.hands
 
-# ---------------------- Hand Gesture Recognition ----------------------
-
-def recognize_gesture(hand_landmarks):
-    """
-    Recognize hand gestures based on finger positions:
-    - "Start": All four fingers (index, middle, ring, pinky) extended (tips above PIP joints)
-    - "Up": Thumb tip is significantly above the wrist
-    - "Down": Thumb tip is significantly below the wrist
-    - "Neutral": Any other hand position
-    """
-    # Retrieve landmarks
-    wrist = hand_landmarks.landmark[mp_hands.HandLandmark.WRIST]
-    thumb_tip = hand_landmarks.landmark[mp_hands.HandLandmark.THUMB_TIP]
-    index_tip = hand_landmarks.landmark[mp_hands.HandLandmark.INDEX_FINGER_TIP]
-    index_pip = hand_landmarks.landmark[mp_hands.HandLandmark.INDEX_FINGER_PIP]
-    middle_tip = hand_landmarks.landmark[mp_hands.HandLandmark.MIDDLE_FINGER_TIP]
-    middle_pip = hand_landmarks.landmark[mp_hands.HandLandmark.MIDDLE_FINGER_PIP]
-    ring_tip = hand_landmarks.landmark[mp_hands.HandLandmark.RING_FINGER_TIP]
-    ring_pip = hand_landmarks.landmark[mp_hands.HandLandmark.RING_FINGER_PIP]
-    pinky_tip = hand_landmarks.landmark[mp_hands.HandLandmark.PINKY_TIP]
-    pinky_pip = hand_landmarks.landmark[mp_hands.HandLandmark.PINKY_PIP]
-
-    # Debugging: Print key landmarks
-    print(f"Landmarks Debug - Wrist: {wrist.y:.2f}, Thumb: {thumb_tip.y:.2f}, "
-          f"Index: {index_tip.y:.2f}, Middle: {middle_tip.y:.2f}, Ring: {ring_tip.y:.2f}, Pinky: {pinky_tip.y:.2f}")
-
-    # Define a threshold to account for minor movements/noise
-    threshold = 0.05  # Adjust this value as needed
-
-    # Check for "Start" Gesture: All four fingers extended
-    if (index_tip.y < index_pip.y and
-        middle_tip.y < middle_pip.y and
-        ring_tip.y < ring_pip.y and
-        pinky_tip.y < pinky_pip.y):
-        print("Detected Gesture: Start (Open Hand)")
-        return "Start"
-
-    # Check for "Up" and "Down" Gestures based on thumb position
-    thumb_to_wrist_y = thumb_tip.y - wrist.y
-    if thumb_to_wrist_y < -threshold:
-        print("Detected Gesture: Up (Thumb Above Wrist)")
-        return "Up"
-    elif thumb_to_wrist_y > threshold:
-        print("Detected Gesture: Down (Thumb Below Wrist)")
-        return "Down"
-
-    # Default gesture
-    print("Detected Gesture: Neutral")
-    return "Neutral"
-
-
 # ---------------------- Gesture Recognition Thread ----------------------
 def gesture_recognition_thread(volume, volume_lock, paused, paused_lock, stop_event):
     cap = cv2.VideoCapture(0)
@@ -80,8 +31,9 @@ def gesture_recognition_thread(volume, volume_lock, paused, paused_lock, stop_ev
         min_tracking_confidence=0.6
     ) as hands:
         print("Gesture Recognition Thread Started.")
-        last_pause_time = time.time()
-        debounce_time = 0.2  # For pause gesture
+        volume_step = 0.05
+        # Held "Up"/"Down" step the volume every 0.25 s; "Start" toggles at most once per 3 s
+        state = GestureStateMachine(repeat={"Up": 0.25, "Down": 0.25}, cooldown={"Start": 3.0})
 
         while not stop_event.is_set():
             ret, frame = cap.read()
@@ -95,41 +47,38 @@ def gesture_recognition_thread(volume, volume_lock, paused, paused_lock, stop_ev
             # Process the frame to detect hands
             results = hands.process(rgb_frame)
 
-            # Check for hand landmarks
+            # Recognize the gesture of the first detected hand (None without a hand)
+            gesture = None
             if results.multi_hand_landmarks:
-                # Process the first detected hand
-                hand_landmarks = results.multi_hand_landmarks[0]
-
-                # Recognize gesture
-                gesture = recognize_gesture(hand_landmarks)
+                gesture = recognize_gesture(results.multi_hand_landmarks[0])
 
+            # Smoothed gesture, None unless it should act now
+            gesture = state.update(gesture)
+            if gesture is not None:
                 # Debugging: Display recognized gesture
                 print(f"Recognized Gesture: {gesture}")
 
-                # Continuous volume adjustment for "Up" and "Down"
+                # Stepped volume adjustment while "Up" or "Down" is held
                 if gesture == "Up":
                     with volume_lock:
-                        volume[0] = min(volume[0] + 0.01, 1.0)  # Gradual increase
+                        volume[0] = min(volume[0] + volume_step, 1.0)
                         pygame.mixer.music.set_volume(volume[0])
                         print(f"Volume increased to {volume[0] * 100:.0f}%")
                 elif gesture == "Down":
                     with volume_lock:
-                        volume[0] = max(volume[0] - 0.01, 0.0)  # Gradual decrease
+                        volume[0] = max(volume[0] - volume_step, 0.0)
                         pygame.mixer.music.set_volume(volume[0])
                         print(f"Volume decreased to {volume[0] * 100:.0f}%")
-                elif gesture == "Start" and time.time() - last_pause_time > debounce_time:
+                elif gesture == "Start":
                     # Toggle pause/resume
                     with paused_lock:
                         if paused[0]:
                             pygame.mixer.music.unpause()
                             print("Music resumed.")
-                            time.sleep(3)
                         else:
                             pygame.mixer.music.pause()
                             print("Music paused.")
-                            time.sleep(3)
                         paused[0] = not paused[0]
-                    last_pause_time = time.time()
 
             # Control the frame rate (faster for responsiveness)
             time.sleep(0.05)  # ~20 FPS
@@ -0,0 +1,110 @@
+# settings.py
+
+import json
+import os
+
+# ---------------------- Settings ----------------------
+
+# Defaults, overridden by the JSON config file and then by SMART_LIGHT_<KEY> env vars
+DEFAULTS = {
+    # "hardware" drives the panel through rgbmatrix, "emulator" uses matrix_emulator
+    "matrix_backend": "hardware",
+    # Emulator only: simulated panel refresh rate and whether SwapOnVSync really sleeps
+    "emulator_refresh_hz": 120,
+    "emulator_realtime": True,
+    # Panel geometry as wired to the controller: chain_length panels per chain, `parallel` chains
+    "panel_rows": 64,
+    "panel_cols": 64,
+    "chain_length": 1,
+    "parallel": 1,
+    # Arrangement on the wall as "COLSxROWS" (empty: same as the chain layout), and the
+    # physical panel driving each wall tile in row-major order (empty: in chain order)
+    "panel_grid": "",
+    "panel_order": [],
+    # Threads copying tiles into the physical layout (only for remapped walls)
+    "tile_workers": 1,
+    # Render loop: steady panel refresh rate (above the scenes' frame rates) and frames
+    # queued between a scene and the panel
+    "render_fps": 40,
+    "render_queue_frames": 3,
+    # Swap telemetry: dump interval in seconds (0: only on SIGUSR1) and JSON file (empty: stdout)
+    "telemetry_dump_seconds": 60,
+    "telemetry_path": "",
+    # Camera service: capture device, frames per second through hand detection, and
+    # MediaPipe detection / tracking confidence (stats are printed every telemetry_dump_seconds)
+    "camera_device": 0,
+    "gesture_fps": 20,
+    "hand_detection_confidence": 0.5,
+    # Adaptive sampling: rate once no hand was seen for gesture_idle_after_seconds, and the
+    # share of wall-clock time hand inference may use (0: unlimited)
+    "gesture_idle_fps": 2.0,
+    "gesture_idle_after_seconds": 5.0,
+    "gesture_cpu_budget": 0.5,
+    # Inference input: max width after downscaling (0: camera resolution), crop around the
+    # tracked hand with this margin per side, and every Nth cropped frame checked against
+    # full-frame detection (0: never)
+    "inference_width": 256,
+    "roi_tracking": True,
+    "roi_margin": 0.5,
+    "roi_validate_every": 0,
+    # Gesture state machine: a gesture is confirmed once it holds gesture_min_votes of the
+    # last gesture_window frames
+    "gesture_window": 5,
+    "gesture_min_votes": 3,
+    # Motion gate: skip inference while no hand is tracked and less than this fraction of a
+    # small grayscale thumbnail changed since the last inference (0: run on every frame)
+    "motion_threshold": 0.01,
+    # Drain the camera on a grabber thread so inference always gets the newest frame
+    "camera_latest_frame": True,
+    # Run capture and hand inference in a separate process, so they never hold the display's GIL
+    "camera_process": False,
+    # Landmark recording (landmark_recording.py) to replay instead of the camera (empty: camera),
+    # and its speed relative to the recording (0: as fast as possible)
+    "replay_path": "",
+    "replay_speed": 1.0,
+}
+
+CONFIG_PATH = os.environ.get(
+    "SMART_LIGHT_CONFIG",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "smart_light.json"))
+
+_settings = None
+
+def _parse_env(value, default):
+    if isinstance(default, bool):
+        return value.strip().lower() in ("1", "true", "yes", "on")
+    if isinstance(default, (int, float)):
+        return type(default)(value)
+    if isinstance(default, (list, dict)):
+        return json.loads(value)
+    return value
+
+def load_settings():
+    """
+    Returns the merged settings dict. The config file is optional.
+    """
+    global _settings
+    if _settings is not None:
+        return _settings
+
+    settings = dict(DEFAULTS)
+    if os.path.isfile(CONFIG_PATH):
+        try:
+            with open(CONFIG_PATH, "r") as f:
+                settings.update(json.load(f))
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable config file {CONFIG_PATH}: {e}")
+
+    for key, default in DEFAULTS.items():
+        value = os.environ.get("SMART_LIGHT_" + key.upper())
+        if value is not None:
+            try:
+                settings[key] = _parse_env(value, default)
+            except ValueError:
+                print(f"Ignoring invalid value for SMART_LIGHT_{key.upper()}: {value}")
+
+    _settings = settings
+    return settings
+
+def get(key):
+    return load_settings().get(key, DEFAULTS.get(key))
@@ -0,0 +1,197 @@
+# swap_telemetry.py
+
+import json
+import os
+import signal
+import threading
+import time
+
+import numpy as np
+
+import settings
+
+# ---------------------- Histogram ----------------------
+
+class Histogram:
+    """
+    Fixed-memory histogram of durations: bin_ms wide bins up to max_ms plus one overflow bin.
+    """
+
+    def __init__(self, bin_ms=0.5, max_ms=250.0):
+        self.bin_ms = bin_ms
+        self.num_bins = int(max_ms / bin_ms)
+        self.counts = np.zeros(self.num_bins + 1, dtype=np.int64)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds):
+        ms = seconds * 1e3
+        self.counts[min(int(ms / self.bin_ms), self.num_bins)] += 1
+        self.count += 1
+        self.total += ms
+        self.max = max(self.max, ms)
+
+    def percentile(self, q):
+        """
+        Upper edge (ms) of the bin holding the q-th percentile; max for the overflow bin.
+        """
+        if not self.count:
+            return 0.0
+        index = int(np.searchsorted(np.cumsum(self.counts), self.count * q / 100.0))
+        if index >= self.num_bins:
+            return self.max
+        return min((index + 1) * self.bin_ms, self.max)
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "mean_ms": self.total / self.count if self.count else 0.0,
+            "p50_ms": self.percentile(50),
+            "p90_ms": self.percentile(90),
+            "p99_ms": self.percentile(99),
+            "max_ms": self.max,
+        }
+
+# ---------------------- Swap Telemetry ----------------------
+
+class SwapTelemetry:
+    """
+    Frame telemetry of one display loop.
+
+    The loop calls loop_start() when it wakes up for a frame and swapped() right
+    after SwapOnVSync (or whatever presents the frame). That records the
+    swap-to-swap interval, the time spent in the loop body before the swap, and
+    dropped frames: the count the loop passes (frames its FrameSchedulers
+    skipped), or for a loop that passes none, the refreshes missed by intervals
+    longer than 1.5x the expected interval.
+    idle() forgets the last swap so a pause is not counted.
+    """
+
+    def __init__(self, name, expected_interval=None):
+        self.name = name
+        self.expected_interval = expected_interval
+        self.intervals = Histogram()
+        self.loop_body = Histogram()
+        self.swaps = 0
+        self.dropped_frames = 0
+        self.last_swap = None
+        self.body_start = None
+        self.lock = threading.Lock()
+
+    def loop_start(self):
+        self.body_start = time.perf_counter()
+
+    def swapped(self, swap_start=None, skipped=None):
+        """
+        Records a swap that has just returned. swap_start (perf_counter) marks the end
+        of the loop body; by default the body ends now. skipped is the number of
+        frames the loop dropped before this one, if it knows.
+        """
+        now = time.perf_counter()
+        with self.lock:
+            self.swaps += 1
+            if self.body_start is not None:
+                self.loop_body.add((swap_start or now) - self.body_start)
+                self.body_start = None
+            if self.last_swap is not None:
+                interval = now - self.last_swap
+                self.intervals.add(interval)
+                if skipped is None and self.expected_interval and interval > 1.5 * self.expected_interval:
+                    self.dropped_frames += int(round(interval / self.expected_interval)) - 1
+            if skipped:
+                self.dropped_frames += skipped
+            self.last_swap = now
+
+    def idle(self):
+        with self.lock:
+            self.last_swap = None
+            self.body_start = None
+
+    def stats(self):
+        with self.lock:
+            return {
+                "swaps": self.swaps,
+                "dropped_frames": self.dropped_frames,
+                "expected_interval_ms": self.expected_interval * 1e3 if self.expected_interval else None,
+                "interval": self.intervals.summary(),
+                "loop_body": self.loop_body.summary(),
+            }
+
+    def summary_line(self):
+        stats = self.stats()
+        interval, body = stats["interval"], stats["loop_body"]
+        return (f"{self.name}: {stats['swaps']} swaps, {stats['dropped_frames']} dropped, "
+                f"interval p50 {interval['p50_ms']:.1f} ms p99 {interval['p99_ms']:.1f} ms "
+                f"max {interval['max_ms']:.1f} ms, loop body mean {body['mean_ms']:.2f} ms "
+                f"p99 {body['p99_ms']:.1f} ms")
+
+# ---------------------- Registry ----------------------
+
+_registry = {}
+_registry_lock = threading.Lock()
+_dumper = None
+
+def get_telemetry(name, expected_interval=None):
+    """
+    Returns the process-wide telemetry for a display loop, creating it on first use.
+    """
+    with _registry_lock:
+        telemetry = _registry.get(name)
+        if telemetry is None:
+            telemetry = SwapTelemetry(name, expected_interval)
+            _registry[name] = telemetry
+        elif expected_interval is not None:
+            telemetry.expected_interval = expected_interval
+        return telemetry
+
+def all_stats():
+    """
+    Current stats of every display loop, by name.
+    """
+    with _registry_lock:
+        telemetries = list(_registry.values())
+    return {telemetry.name: telemetry.stats() for telemetry in telemetries}
+
+def dump(path=None):
+    """
+    Writes all stats as JSON to path (by default telemetry_path), or prints one
+    summary line per loop when no path is set.
+    """
+    if path is None:
+        path = settings.get("telemetry_path")
+    if path:
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"timestamp": time.time(), "loops": all_stats()}, f, indent=2)
+        os.replace(tmp_path, path)
+        return
+    with _registry_lock:
+        telemetries = list(_registry.values())
+    for telemetry in telemetries:
+        print(telemetry.summary_line())
+
+def _dump_periodically(interval, path, stop_event):
+    while not stop_event.wait(interval):
+        try:
+            dump(path)
+        except OSError as e:
+            print(f"Failed to write telemetry to {path}: {e}")
+
+def start_dumper(interval=None, path=None):
+    """
+    Dumps the stats every telemetry_dump_seconds (to telemetry_path, or stdout) on a
+    daemon thread, and on SIGUSR1 when called from the main thread.
+    Returns the event that stops the dumper.
+    """
+    global _dumper
+    if _dumper is not None:
+        return _dumper
+    interval = interval if interval is not None else settings.get("telemetry_dump_seconds")
+    path = path if path is not None else settings.get("telemetry_path")
+    _dumper = threading.Event()
+    if interval > 0:
+        threading.Thread(target=_dump_periodically, args=(interval, path, _dumper), daemon=True).start()
+    if hasattr(signal, "SIGUSR1") and threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGUSR1, lambda signum, frame: dump(path))
+    return _dumper
@@ -0,0 +1,53 @@
+# text_layer.py
+
+import numpy as np
+from PIL import Image
+
+from bdf_font import BdfFont
+
+# ---------------------- Cached Text Strip ----------------------
+
+class TextStrip:
+    """
+    Scrolling text rasterised once into an off-screen strip.
+    The strip is rebuilt only when the text changes; each frame just pastes the
+    part of it that is visible at the current scroll offset.
+    """
+
+    def __init__(self, font_path, color):
+        self.font = BdfFont()
+        self.font.LoadFont(font_path)
+        self.color = tuple(color)
+        self.text = None
+        self.mask = None
+        self.width = 0
+
+    def set_text(self, text):
+        """
+        Re-rasterises the strip if the text differs from the current one.
+        """
+        if text == self.text:
+            return
+        self.text = text
+        self.width = self.font.text_width(text)
+        mask = self.font.render(text)
+        self.mask = Image.fromarray(mask.astype(np.uint8) * 255, "L")
+
+    def draw(self, image, x, y):
+        """
+        Composites the visible window of the strip onto a PIL RGB image.
+        Like graphics.DrawText, x is the left edge, y the baseline, and the
+        return value is the text length in pixels.
+        """
+        if self.mask is None:
+            return 0
+        top = y - self.font.baseline
+        # Visible part of the strip in strip coordinates
+        left = max(0, -x)
+        upper = max(0, -top)
+        right = min(self.mask.width, image.width - x)
+        lower = min(self.mask.height, image.height - top)
+        if right > left and lower > upper:
+            window = self.mask.crop((left, upper, right, lower))
+            image.paste(self.color, (x + left, top + upper, x + right, top + lower), window)
+        return self.width
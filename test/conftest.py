@@ -0,0 +1,17 @@
+# conftest.py
+
+import os
+import sys
+
+# ---------------------- Test Setup ----------------------
+
+# The automated tests run headless on the matrix emulator with a virtual vsync clock;
+# these must be set before settings.py is first loaded
+os.environ.setdefault("SMART_LIGHT_MATRIX_BACKEND", "emulator")
+os.environ.setdefault("SMART_LIGHT_EMULATOR_REALTIME", "0")
+os.environ["SMART_LIGHT_CONFIG"] = os.devnull
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "impl"))
+
+# Manual scripts that need the panel, camera or network
+collect_ignore = ["LED_test.py", "handGesture_test.py", "hand_controller.py", "test_music_api.py"]
@@ -49,51 +49,16 @@
 import cv2
 import mediapipe as mp
 import time
+import sys
+import os
+
+# The gesture rules live in impl/gesture_engine.py
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "impl"))
+from gesture_engine import recognize_gesture
 
 # Initialize MediaPipe Hands
 mp_hands = mp.solutions.hands
 
-# Interpret gestures based on landmarks
-def recognize_gesture(hand_landmarks):
-    """
-    Recognize hand gestures based on finger positions:
-    - "Start": All four fingers (index, middle, ring, pinky) extended (tips above PIP joints)
-    - "Up": Thumb tip is significantly above the wrist
-    - "Down": Thumb tip is significantly below the wrist
-    - "Neutral": Any other hand position
-    """
-    # Retrieve landmarks
-    wrist = hand_landmarks.landmark[mp_hands.HandLandmark.WRIST]
-    thumb_tip = hand_landmarks.landmark[mp_hands.HandLandmark.THUMB_TIP]
-    index_tip = hand_landmarks.landmark[mp_hands.HandLandmark.INDEX_FINGER_TIP]
-    index_pip = hand_landmarks.landmark[mp_hands.HandLandmark.INDEX_FINGER_PIP]
-    middle_tip = hand_landmarks.landmark[mp_hands.HandLandmark.MIDDLE_FINGER_TIP]
-    middle_pip = hand_landmarks.landmark[mp_hands.HandLandmark.MIDDLE_FINGER_PIP]
-    ring_tip = hand_landmarks.landmark[mp_hands.HandLandmark.RING_FINGER_TIP]
-    ring_pip = hand_landmarks.landmark[mp_hands.HandLandmark.RING_FINGER_PIP]
-    pinky_tip = hand_landmarks.landmark[mp_hands.HandLandmark.PINKY_TIP]
-    pinky_pip = hand_landmarks.landmark[mp_hands.HandLandmark.PINKY_PIP]  # Correct attribute
-
-    # Define a threshold to account for minor movements/noise
-    threshold = 0.05  # Adjust this value as needed
-
-    # Check for "Start" Gesture: All four fingers extended
-    if (index_tip.y < index_pip.y and
-        middle_tip.y < middle_pip.y and
-        ring_tip.y < ring_pip.y and
-        pinky_tip.y < pinky_pip.y):
-        return "Start"
-
-    # Check for "Up" and "Down" Gestures based on thumb position
-    thumb_to_wrist_y = thumb_tip.y - wrist.y
-
-    if thumb_to_wrist_y < -threshold:
-        return "Up"
-    elif thumb_to_wrist_y > threshold:
-        return "Down"
-    else:
-        return "Neutral"
-
 def main():
     # Open the webcam
     cap = cv2.VideoCapture(0)
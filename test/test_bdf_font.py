@@ -0,0 +1,56 @@
+# test_bdf_font.py
+
+import os
+
+import numpy as np
+import pytest
+
+from bdf_font import BdfFont
+
+FONT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "res", "fonts", "7x13.bdf")
+
+@pytest.fixture(scope="module")
+def font():
+    font = BdfFont()
+    font.LoadFont(FONT_PATH)
+    return font
+
+def test_font_metrics(font):
+    # FONTBOUNDINGBOX 7 13 0 -2: 13 rows, 2 of them below the baseline
+    assert font.height == 13
+    assert font.baseline == 11
+    assert font.default_char == 0
+
+def test_glyph_metrics(font):
+    glyph = font.glyph("A")
+    assert glyph.bitmap.shape == (13, 7)
+    assert glyph.bitmap.dtype == bool
+    assert (glyph.x_offset, glyph.y_offset, glyph.advance) == (0, -2, 7)
+    assert font.CharacterWidth(ord("A")) == 7
+    assert font.text_width("Hello") == 35
+
+def test_missing_characters_use_the_default_char(font):
+    assert font.CharacterWidth(0x4E00) == -1
+    assert font.glyph("一") is font.glyphs[0]
+    assert font.text_width("A一") == 7 + font.glyphs[0].advance
+
+def test_render_places_glyphs_on_the_baseline(font):
+    mask = font.render("AA")
+    assert mask.shape == (font.height, 14)
+    rows = np.flatnonzero(mask.any(axis=1))
+    # "A" has no descender: its lowest lit row sits just above the baseline
+    assert rows.max() == font.baseline - 1
+    assert (mask[:, :7] == mask[:, 7:]).all()
+    descender_rows = np.flatnonzero(font.render("g").any(axis=1))
+    assert descender_rows.max() >= font.baseline
+
+def test_render_of_empty_text_is_one_blank_column(font):
+    mask = font.render("")
+    assert mask.shape == (font.height, 1)
+    assert not mask.any()
+
+def test_files_without_glyphs_are_rejected(tmp_path):
+    path = tmp_path / "empty.bdf"
+    path.write_text("STARTFONT 2.1\nFONTBOUNDINGBOX 7 13 0 -2\nENDFONT\n")
+    with pytest.raises(ValueError):
+        BdfFont().LoadFont(str(path))
@@ -0,0 +1,69 @@
+# test_camera_service.py
+
+import threading
+import time
+
+import numpy as np
+import pytest
+
+pytest.importorskip("cv2")
+pytest.importorskip("mediapipe")
+
+from camera_service import FrameGrabber
+
+class FakeCapture:
+    """
+    A 30 fps camera: grab() blocks until the next frame arrives.
+    """
+
+    def __init__(self, fps=30):
+        self.interval = 1.0 / fps
+
+    def grab(self):
+        time.sleep(self.interval)
+        return True
+
+    def retrieve(self):
+        return True, np.zeros((2, 2, 3), dtype=np.uint8)
+
+@pytest.fixture
+def grabber():
+    active = threading.Event()
+    active.set()
+    grabber = FrameGrabber(FakeCapture(), active).start()
+    yield grabber
+    grabber.stop()
+
+def test_active_reads_return_every_newest_frame(grabber):
+    read = grabber.read(0)
+    assert read is not None and read[2]
+    time.sleep(0.2)
+    frame_id = read[0]
+    read = grabber.read(frame_id)
+    # Frames kept coming in between: the read skips straight to the newest
+    assert read[0] > frame_id + 1
+    assert time.monotonic() - read[1] < 0.05
+
+def test_idle_reads_get_a_frame_grabbed_after_the_request(grabber):
+    # Going idle while the grabber is ahead of the last frame read, as after active mode
+    frame_id = grabber.read(0)[0]
+    time.sleep(0.1)
+    grabber.on_demand = True
+    for _ in range(4):
+        time.sleep(0.3)  # Idle sampling interval
+        requested = time.monotonic()
+        frame_id, timestamp, ok, frame = grabber.read(frame_id)
+        assert ok
+        assert timestamp >= requested
+        assert time.monotonic() - timestamp < 0.05
+
+def test_idle_mode_decodes_only_requested_frames(grabber):
+    grabber.on_demand = True
+    frame_id = grabber.read(0)[0]
+    decoded = grabber.frames_decoded
+    grabbed = grabber.frames_grabbed
+    for _ in range(3):
+        time.sleep(0.2)
+        frame_id = grabber.read(frame_id)[0]
+    assert grabber.frames_decoded - decoded == 3
+    assert grabber.frames_grabbed - grabbed > 10
@@ -0,0 +1,36 @@
+# test_font_registry.py
+
+import os
+
+import numpy as np
+import pytest
+
+from font_registry import get_font, get_glyph_cache
+
+FONT_PATH = "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf"
+
+pytestmark = pytest.mark.skipif(not os.path.isfile(FONT_PATH), reason="DejaVu fonts not installed")
+
+def test_fonts_and_glyph_caches_are_shared():
+    assert get_font(FONT_PATH, 8) is get_font(FONT_PATH, 8)
+    assert get_glyph_cache(FONT_PATH, 8) is get_glyph_cache(FONT_PATH, 8)
+    assert get_glyph_cache(FONT_PATH, 8) is not get_glyph_cache(FONT_PATH, 10)
+
+def test_missing_fonts_raise_ioerror():
+    with pytest.raises(IOError):
+        get_glyph_cache("/nonexistent/font.ttf", 8)
+
+def test_layout_follows_the_cached_advances():
+    glyphs = get_glyph_cache(FONT_PATH, 10)
+    positions, width = glyphs.layout("Hi!")
+    assert positions[0] == 0
+    assert positions == sorted(positions)
+    assert width == int(round(sum(glyphs.glyph(char)[3] for char in "Hi!")))
+
+def test_render_matches_the_measured_size():
+    glyphs = get_glyph_cache(FONT_PATH, 10)
+    mask = glyphs.render("Hello")
+    assert mask.mode == "L"
+    assert mask.size == glyphs.measure("Hello")
+    assert np.asarray(mask).any()
+    assert glyphs.measure("") == (0, 0)
@@ -0,0 +1,112 @@
+# test_frame_cache.py
+
+import os
+
+import numpy as np
+import pytest
+
+import frame_cache
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    directory = tmp_path / "cache"
+    monkeypatch.setattr(frame_cache, "CACHE_DIR", str(directory))
+    return directory
+
+def write_source(path, contents):
+    path.write_bytes(contents)
+    return str(path)
+
+def frames(count, value=0, size=4):
+    return np.full((count, size, size, 3), value, dtype=np.uint8)
+
+def test_round_trip(cache_dir, tmp_path):
+    source = write_source(tmp_path / "a.gif", b"first")
+    key = frame_cache.cache_key(source, 4, 4, "fit")
+    assert frame_cache.load_frames(key) is None
+    frame_cache.store_frames(key, frames(3, 9), source, [10, 20, 30])
+    cached, durations = frame_cache.load_frames(key)
+    assert cached.shape == (3, 4, 4, 3)
+    assert (cached == 9).all()
+    assert durations == [10, 20, 30]
+
+def test_changed_source_invalidates_the_entry(cache_dir, tmp_path):
+    source = write_source(tmp_path / "a.gif", b"first")
+    old_key = frame_cache.cache_key(source, 4, 4, "fit")
+    frame_cache.store_frames(old_key, frames(2), source)
+    other_mode = frame_cache.cache_key(source, 4, 4, "stretch")
+    frame_cache.store_frames(other_mode, frames(2), source)
+
+    write_source(tmp_path / "a.gif", b"second")
+    new_key = frame_cache.cache_key(source, 4, 4, "fit")
+    assert new_key != old_key
+    assert frame_cache.load_frames(new_key) is None
+    frame_cache.store_frames(new_key, frames(2), source)
+    # Storing the new contents drops every entry of the old contents
+    assert frame_cache.load_frames(old_key) is None
+    assert frame_cache.load_frames(other_mode) is None
+    assert frame_cache.load_frames(new_key) is not None
+
+def test_broken_entry_is_discarded(cache_dir, tmp_path):
+    source = write_source(tmp_path / "a.gif", b"first")
+    key = frame_cache.cache_key(source, 4, 4, "fit")
+    frame_cache.store_frames(key, frames(2), source)
+    with open(cache_dir / (key + ".rgb"), "ab") as f:
+        f.write(b"trailing")
+    assert frame_cache.load_frames(key) is None
+    assert not os.listdir(cache_dir)
+
+def test_evict_removes_least_recently_used(cache_dir, tmp_path):
+    keys = []
+    for index in range(3):
+        source = write_source(tmp_path / f"{index}.gif", bytes([index]))
+        key = frame_cache.cache_key(source, 4, 4, "fit")
+        frame_cache.store_frames(key, frames(4), source)
+        os.utime(cache_dir / (key + ".json"), (1000 + index, 1000 + index))
+        keys.append(key)
+    # Using the oldest entry makes the second one the least recently used
+    frame_cache.load_frames(keys[0])
+    sizes = {key: size for key, _, size, _ in frame_cache._list_entries()}
+    frame_cache.evict(sizes[keys[0]] + sizes[keys[2]])
+    assert frame_cache.load_frames(keys[1]) is None
+    assert frame_cache.load_frames(keys[0]) is not None
+    assert frame_cache.load_frames(keys[2]) is not None
+
+def test_store_trims_the_cache_to_max_bytes(cache_dir, tmp_path, monkeypatch):
+    first = write_source(tmp_path / "first.gif", b"first")
+    second = write_source(tmp_path / "second.gif", b"second")
+    first_key = frame_cache.cache_key(first, 4, 4, "fit")
+    second_key = frame_cache.cache_key(second, 4, 4, "fit")
+    frame_cache.store_frames(first_key, frames(4), first)
+    os.utime(cache_dir / (first_key + ".json"), (1000, 1000))
+    (_, _, entry_size, _), = frame_cache._list_entries()
+    # Room for one and a half entries: storing the second evicts the first
+    monkeypatch.setattr(frame_cache, "MAX_CACHE_BYTES", entry_size * 3 // 2)
+    frame_cache.store_frames(second_key, frames(4), second)
+    assert frame_cache.load_frames(first_key) is None
+    assert frame_cache.load_frames(second_key) is not None
+
+def test_peek_entry_does_not_mark_the_entry_used(cache_dir, tmp_path):
+    source = write_source(tmp_path / "a.gif", b"first")
+    key = frame_cache.cache_key(source, 4, 4, "fit")
+    assert frame_cache.peek_entry(key) is None
+    frame_cache.store_frames(key, frames(3), source)
+    meta_path = cache_dir / (key + ".json")
+    os.utime(meta_path, (1000, 1000))
+    assert frame_cache.peek_entry(key)["frames"] == 3
+    assert os.path.getmtime(meta_path) == 1000
+    frame_cache.load_frames(key)
+    assert os.path.getmtime(meta_path) > 1000
+
+def test_entry_larger_than_the_cache_is_not_written(cache_dir, tmp_path, monkeypatch, capsys):
+    kept = write_source(tmp_path / "kept.gif", b"kept")
+    kept_key = frame_cache.cache_key(kept, 4, 4, "fit")
+    frame_cache.store_frames(kept_key, frames(1), kept)
+    monkeypatch.setattr(frame_cache, "MAX_CACHE_BYTES", 4 * 4 * 3 * 8)
+    large = write_source(tmp_path / "large.gif", b"large")
+    large_key = frame_cache.cache_key(large, 4, 4, "fit")
+    frame_cache.store_frames(large_key, frames(8), large)
+    assert "Not caching large.gif" in capsys.readouterr().out
+    assert frame_cache.load_frames(large_key) is None
+    # Nothing else was evicted to make room for it
+    assert frame_cache.load_frames(kept_key) is not None
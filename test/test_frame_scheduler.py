@@ -0,0 +1,69 @@
+# test_frame_scheduler.py
+
+import types
+
+import frame_scheduler
+from frame_scheduler import FrameScheduler
+
+class FakeClock:
+    """
+    Stands in for the time module; sleeping advances the clock instantly.
+    """
+
+    def __init__(self):
+        self.now = 100.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+    def advance(self, seconds):
+        self.now += seconds
+
+def make_scheduler(monkeypatch, durations, **kwargs):
+    clock = FakeClock()
+    monkeypatch.setattr(frame_scheduler, "time", types.SimpleNamespace(monotonic=clock.monotonic,
+                                                                        sleep=clock.sleep))
+    return FrameScheduler(durations, **kwargs), clock
+
+def test_on_time_frames_are_neither_late_nor_dropped(monkeypatch):
+    scheduler, clock = make_scheduler(monkeypatch, [100, 50, 100])
+    shown = [scheduler.next_frame() for _ in range(7)]
+    assert shown == [0, 1, 2, 0, 1, 2, 0]
+    # Deadlines follow the frame durations: 100 + 50 + 100 + 100 + 50 + 100 ms
+    assert abs(clock.now - 100.5) < 1e-9
+    assert scheduler.stats() == {"shown_frames": 7, "late_frames": 0, "dropped_frames": 0}
+
+def test_overdue_frames_are_dropped_and_counted_late(monkeypatch):
+    scheduler, clock = make_scheduler(monkeypatch, [100] * 5)
+    assert scheduler.next_frame() == 0
+    clock.advance(0.35)  # Slow content work: frames 1 and 2 are over before they show
+    assert scheduler.next_frame() == 3
+    assert scheduler.last_skipped == 2
+    assert scheduler.stats() == {"shown_frames": 2, "late_frames": 1, "dropped_frames": 2}
+    assert scheduler.next_frame() == 4
+    assert scheduler.last_skipped == 0
+
+def test_long_stall_resynchronises_instead_of_spinning(monkeypatch):
+    scheduler, clock = make_scheduler(monkeypatch, [100] * 3)
+    scheduler.next_frame()
+    clock.advance(10.0)
+    scheduler.next_frame()
+    assert scheduler.last_skipped == 3
+    start = clock.now
+    scheduler.next_frame()
+    assert abs(clock.now - start - 0.1) < 1e-9
+
+def test_missing_durations_use_the_fallback_rate(monkeypatch):
+    scheduler, clock = make_scheduler(monkeypatch, [None, 200], fallback_fps=20)
+    scheduler.next_frame()
+    scheduler.next_frame()
+    assert abs(clock.now - 100.05) < 1e-9
+
+def test_max_interval_repeats_long_frames(monkeypatch):
+    scheduler, clock = make_scheduler(monkeypatch, [100, 100], max_interval=0.025)
+    shown = [scheduler.next_frame() for _ in range(9)]
+    assert shown == [0, 0, 0, 0, 1, 1, 1, 1, 0]
+    assert scheduler.shown_frames == 3
@@ -0,0 +1,54 @@
+# test_frame_store.py
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from frame_store import FrameStore
+from matrix_emulator import FrameCanvas
+
+def numbered_frames(count, width=4, height=3):
+    frames = np.zeros((count, height, width, 3), dtype=np.int64)
+    for index in range(count):
+        frames[index] = index * 10
+    return frames
+
+def test_frames_are_stored_as_uint8():
+    store = FrameStore(numbered_frames(3))
+    assert store.frames.dtype == np.uint8
+    assert store.frames.flags["C_CONTIGUOUS"]
+    assert (len(store), store.width, store.height) == (3, 4, 3)
+    assert store.bytes_per_frame == 36
+    assert store.durations == [None] * 3
+
+def test_frames_must_be_rgb():
+    with pytest.raises(ValueError):
+        FrameStore(np.zeros((2, 3, 4), dtype=np.uint8))
+    with pytest.raises(ValueError):
+        FrameStore.from_images([])
+
+def test_load_copies_into_one_reusable_image():
+    store = FrameStore.from_images([Image.new("RGB", (4, 3), (value,) * 3) for value in (5, 6)], [10, 20])
+    first = store.load(0)
+    assert first.mode == "RGB" and first.size == (4, 3)
+    assert (np.asarray(first) == 5).all()
+    # Drawing on the loaded image leaves the store untouched
+    first.paste((255, 0, 0), (0, 0, 1, 1))
+    assert (store[0] == 5).all()
+    second = store.load(1)
+    assert second is first
+    assert (np.asarray(second) == 6).all()
+    assert store.durations == [10, 20]
+
+def test_load_bounds():
+    store = FrameStore(numbered_frames(3))
+    assert (np.asarray(store.load(-1)) == 20).all()
+    with pytest.raises(IndexError):
+        store.load(3)
+
+def test_view_shares_the_frame_array():
+    store = FrameStore(numbered_frames(2))
+    assert store.view(1) is store.view(1)
+    canvas = FrameCanvas(4, 3)
+    store.blit(canvas, 1)
+    assert (canvas.pixels == 10).all()
@@ -0,0 +1,134 @@
+# test_gesture_engine.py
+
+import types
+
+import numpy as np
+import pytest
+
+from gesture_engine import (
+    Compare, GestureEngine, confusion_matrix, confusion_summary, default_engine, landmarks_to_array,
+    FINGER_PIPS, FINGER_TIPS, NUM_LANDMARKS, THUMB_TIP, WRIST)
+
+def hand(thumb_offset=0.0, fingers_up=False):
+    """
+    A (21, 3) landmark array with the thumb tip thumb_offset below the wrist.
+    """
+    points = np.full((NUM_LANDMARKS, 3), 0.5)
+    points[WRIST, 1] = 0.8
+    points[THUMB_TIP, 1] = 0.8 + thumb_offset
+    points[FINGER_PIPS, 1] = 0.5
+    points[FINGER_TIPS, 1] = 0.3 if fingers_up else 0.6
+    return points
+
+def test_default_rules():
+    assert default_engine.labels == ["Neutral", "Start", "Up", "Down"]
+    assert default_engine.classify(hand(fingers_up=True)) == "Start"
+    assert default_engine.classify(hand(-0.2)) == "Up"
+    assert default_engine.classify(hand(0.2)) == "Down"
+    assert default_engine.classify(hand(0.01)) == "Neutral"
+
+def test_landmarks_to_array_reads_x_y_z():
+    landmarks = types.SimpleNamespace(landmark=[
+        types.SimpleNamespace(x=index, y=index + 0.25, z=-index) for index in range(NUM_LANDMARKS)])
+    points = landmarks_to_array(landmarks)
+    assert points.shape == (NUM_LANDMARKS, 3)
+    assert points[THUMB_TIP].tolist() == [4.0, 4.25, -4.0]
+
+def test_batch_matches_single_frames():
+    batch = np.stack([hand(fingers_up=True), hand(-0.2), hand(0.2), hand(0.01),
+                      np.full((NUM_LANDMARKS, 3), np.nan)])
+    assert default_engine.classify_batch(batch).tolist() == ["Start", "Up", "Down", "Neutral", "Neutral"]
+    assert default_engine.classify_codes(batch).tolist() == [1, 2, 3, 0, 0]
+
+def assert_per_frame_matches_batch(engine, batch, thresholds=(0.0, 0.01, 0.05, 0.2)):
+    """
+    classify() (row predicates) must give what classify_codes() (NumPy) gives,
+    frame by frame and at every threshold.
+    """
+    for threshold in thresholds:
+        tuned = engine.copy(threshold)
+        assert tuned.has_row_rules
+        codes = tuned.classify_codes(batch)
+        assert [tuned.classify(points) for points in batch] == [tuned.labels[code] for code in codes]
+    # The batch at a single threshold matches the same threshold in a sweep
+    sweep = engine.classify_codes(batch, thresholds)
+    for row, threshold in zip(sweep, thresholds):
+        assert np.array_equal(row, engine.copy(threshold).classify_codes(batch))
+
+def noisy_hands(count, seed=0):
+    """
+    Random hands, plus ones with the compared landmarks exactly on or next to a
+    rule boundary (equal y values, thumb exactly one threshold from the wrist).
+    """
+    rng = np.random.default_rng(seed)
+    batch = rng.random((count, NUM_LANDMARKS, 3))
+    batch[1::5, FINGER_TIPS, 1] = batch[1::5, FINGER_PIPS, 1]
+    batch[2::5, FINGER_TIPS, 1] = batch[2::5, FINGER_PIPS, 1] - rng.random((len(batch[2::5]), 1)) * 0.1
+    for threshold in (0.01, 0.05, 0.2):
+        batch[3::5, THUMB_TIP, 1] = batch[3::5, WRIST, 1] + threshold
+        batch[4::5, THUMB_TIP, 1] = batch[4::5, WRIST, 1] - threshold
+    batch[::11] = np.nan
+    return batch
+
+def test_per_frame_rules_match_the_numpy_rules():
+    assert default_engine.has_row_rules
+    assert_per_frame_matches_batch(default_engine, noisy_hands(2000))
+    # Each default rule on its own as well
+    for name, predicate in default_engine.rules:
+        engine = GestureEngine()
+        engine.rules = [(name, predicate)]
+        engine.row_rules = {name: default_engine.row_rules[name]}
+        assert_per_frame_matches_batch(engine, noisy_hands(500, seed=1))
+
+def test_per_frame_rules_match_the_numpy_rules_on_a_recording(tmp_path):
+    pytest.importorskip("cv2")
+    from landmark_recording import LandmarkRecorder, Recording
+
+    # A hand drifting through every gesture, stored (and rounded) like the live recorder does
+    rng = np.random.default_rng(2)
+    poses = [hand(fingers_up=True), hand(-0.2), hand(0.2), hand(0.01), hand(-0.05), hand(0.05)]
+    path = str(tmp_path / "drift.slm")
+    with LandmarkRecorder(path) as recorder:
+        for index in range(600):
+            points = poses[index // 20 % len(poses)] + rng.normal(0, 0.02, (NUM_LANDMARKS, 3))
+            recorder.write(types.SimpleNamespace(timestamp=index / 30, points=points, gesture=None))
+    recording = Recording(path)
+    assert_per_frame_matches_batch(default_engine, recording.points[recording.hands])
+
+def test_recognize_matches_classify_on_the_array():
+    for points in noisy_hands(200, seed=3):
+        landmarks = types.SimpleNamespace(landmark=[
+            types.SimpleNamespace(x=x, y=y, z=z) for x, y, z in points.tolist()])
+        assert default_engine.recognize(landmarks) == default_engine.classify(landmarks_to_array(landmarks))
+
+def test_compare_rule_rejects_unknown_operators():
+    with pytest.raises(ValueError):
+        Compare(THUMB_TIP, "<=", WRIST)
+
+def test_confusion_matrix_counts_pairs():
+    matrix = confusion_matrix([0, 1, 1, 2, 2, 2], [0, 1, 2, 2, 2, 0], 3)
+    assert matrix.tolist() == [[1, 0, 0], [0, 1, 1], [1, 0, 2]]
+
+def test_confusion_summary():
+    summary = confusion_summary([[1, 0, 0], [0, 1, 1], [1, 0, 2]], ["Neutral", "Up", "Down"])
+    assert summary["frames"] == 6
+    assert summary["accuracy"] == 4 / 6
+    assert summary["labels"]["Down"] == {"frames": 3, "precision": 2 / 3, "recall": 2 / 3}
+    assert summary["labels"]["Up"]["precision"] == 1.0
+
+def test_sweep_matches_one_pass_per_threshold():
+    engine = GestureEngine()
+    engine.rule("Up")(lambda points, threshold: points[..., THUMB_TIP, 1] - points[..., WRIST, 1] < -threshold)
+    engine.rule("Down")(lambda points, threshold: points[..., THUMB_TIP, 1] - points[..., WRIST, 1] > threshold)
+    offsets = [-0.3, -0.12, -0.06, -0.02, 0.0, 0.03, 0.08, 0.15, 0.4]
+    batch = np.stack([hand(offset) for offset in offsets])
+    truth = [1, 1, 1, 0, 0, 0, 2, 2, 2]
+    thresholds = [0.01, 0.05, 0.1, 0.2]
+
+    matrices = engine.sweep(batch, thresholds, truth)
+    assert matrices.shape == (4, 3, 3)
+    for threshold, matrix in zip(thresholds, matrices):
+        engine.threshold = threshold
+        predicted = [engine.labels.index(engine.classify(points)) for points in batch]
+        assert np.array_equal(matrix, confusion_matrix(truth, predicted, 3))
+    assert matrices.sum(axis=(1, 2)).tolist() == [9] * 4
@@ -0,0 +1,58 @@
+# test_gesture_state.py
+
+from gesture_state import GestureStateMachine
+
+def feed(machine, labels, start=0.0, step=0.05):
+    """
+    Feeds one label per frame, step seconds apart; returns the events by frame.
+    """
+    return [machine.update(label, start + index * step) for index, label in enumerate(labels)]
+
+def test_gesture_fires_once_confirmed():
+    machine = GestureStateMachine(window=5, min_votes=3)
+    events = feed(machine, ["Up", "Up", "Up", "Up", "Up"])
+    assert events == [None, None, "Up", None, None]
+    assert machine.onset == 0.0
+    assert machine.stats()["events"] == 1
+
+def test_single_noisy_frame_neither_triggers_nor_releases():
+    machine = GestureStateMachine(window=5, min_votes=3)
+    assert feed(machine, [None, "Down", None, None, "Up", None]) == [None] * 6
+    assert machine.current is None
+
+    machine = GestureStateMachine(window=5, min_votes=3)
+    events = feed(machine, ["Up", "Up", "Up", "Down", "Up", "Up"])
+    assert events == [None, None, "Up", None, None, None]
+    assert machine.current == "Up"
+    assert machine.changes == 1
+
+def test_neutral_and_no_hand_never_fire():
+    machine = GestureStateMachine(window=3, min_votes=2)
+    assert feed(machine, ["Neutral"] * 4 + [None] * 4) == [None] * 8
+    assert machine.events == 0
+
+def test_held_gesture_repeats():
+    machine = GestureStateMachine(repeat={"Up": 0.2}, window=3, min_votes=2)
+    events = feed(machine, ["Up"] * 12, step=0.05)
+    # Confirmed on the second frame (t=0.05), then every 0.2 s while held
+    assert [index for index, event in enumerate(events) if event] == [1, 5, 9]
+    assert machine.onset == 9 * 0.05
+
+def test_cooldown_suppresses_quick_retriggers():
+    machine = GestureStateMachine(cooldown={"Start": 1.0}, window=3, min_votes=2)
+    labels = ["Start"] * 3 + [None] * 3 + ["Start"] * 3
+    events = feed(machine, labels, step=0.1)
+    assert events.count("Start") == 1
+    assert machine.suppressed == 1
+
+    # After the cooldown the gesture fires again
+    events = feed(machine, [None] * 3 + ["Start"] * 3, start=2.0, step=0.1)
+    assert events.count("Start") == 1
+    assert machine.events == 2
+
+def test_reset_forgets_the_confirmed_gesture():
+    machine = GestureStateMachine(window=3, min_votes=2)
+    feed(machine, ["Down"] * 3)
+    machine.reset()
+    assert machine.current is None
+    assert feed(machine, ["Down"] * 2, start=1.0) == [None, "Down"]
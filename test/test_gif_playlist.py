@@ -0,0 +1,83 @@
+# test_gif_playlist.py
+
+import os
+import time
+
+import pytest
+
+from gif_playlist import GifPlaylist
+
+class FakeStore:
+    def __init__(self, path):
+        self.path = path
+
+    def preload(self):
+        pass
+
+def load(path):
+    if "broken" in path:
+        raise IOError("cannot decode")
+    return FakeStore(path)
+
+def add_gif(directory, name, mtime):
+    path = directory / name
+    path.write_bytes(b"GIF89a")
+    # The directory's mtime marks the listing change; set it explicitly so tests do
+    # not depend on the file system's timestamp resolution
+    os.utime(directory, ns=(mtime, mtime))
+    return str(path)
+
+def next_store(playlist, timeout=2.0):
+    """
+    Requests a switch and returns the path of the store it switched to.
+    """
+    playlist.request_next()
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        store = playlist.poll()
+        if store is not None:
+            return os.path.basename(store.path)
+        time.sleep(0.01)
+    raise AssertionError("playlist did not switch")
+
+@pytest.fixture
+def gif_dir(tmp_path):
+    for index, name in enumerate(("a.gif", "c.gif")):
+        add_gif(tmp_path, name, index)
+    return tmp_path
+
+def test_rotates_in_order_and_skips_broken_gifs(gif_dir):
+    add_gif(gif_dir, "b_broken.gif", 10)
+    playlist = GifPlaylist(str(gif_dir), load)
+    assert os.path.basename(playlist.start().path) == "a.gif"
+    assert [next_store(playlist) for _ in range(3)] == ["c.gif", "a.gif", "c.gif"]
+
+def test_new_gifs_join_after_the_current_one(gif_dir):
+    playlist = GifPlaylist(str(gif_dir), load)
+    playlist.start()
+    assert next_store(playlist) == "c.gif"
+    add_gif(gif_dir, "b.gif", 10)
+    add_gif(gif_dir, "d.gif", 20)
+    # The prefetch started before the rescan still targets a.gif; the next one sees the new list
+    assert [next_store(playlist) for _ in range(4)] == ["a.gif", "b.gif", "c.gif", "d.gif"]
+
+def test_removed_gif_keeps_the_rotation_going(gif_dir):
+    add_gif(gif_dir, "b.gif", 10)
+    playlist = GifPlaylist(str(gif_dir), load)
+    playlist.start()
+    assert next_store(playlist) == "b.gif"
+    os.remove(gif_dir / "b.gif")
+    os.utime(gif_dir, ns=(20, 20))
+    playlist.rescan()
+    assert len(playlist) == 2
+    assert next_store(playlist) == "c.gif"
+
+def test_single_gif_playlist_picks_up_a_second_one(tmp_path):
+    add_gif(tmp_path, "a.gif", 0)
+    playlist = GifPlaylist(str(tmp_path), load)
+    playlist.start()
+    playlist.request_next()
+    assert playlist.poll() is None
+    add_gif(tmp_path, "b.gif", 10)
+    playlist.last_scan -= 1.0
+    assert next_store(playlist) == "b.gif"
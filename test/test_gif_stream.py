@@ -0,0 +1,83 @@
+# test_gif_stream.py
+
+import threading
+import time
+
+import numpy as np
+from PIL import Image
+
+import gif_stream
+from gif_stream import GifFrameStream, should_stream
+
+def write_gif(path, num_frames, size=(8, 8)):
+    """
+    Writes a GIF whose frame i is solid grey level 5 * i and lasts 10 * (i + 1) ms.
+    """
+    frames = [Image.new("RGB", size, (5 * i,) * 3) for i in range(num_frames)]
+    frames[0].save(path, save_all=True, append_images=frames[1:],
+                   duration=[10 * (i + 1) for i in range(num_frames)], loop=0)
+    return str(path)
+
+def frame_number(image):
+    return int(round(np.asarray(image)[0, 0, 0] / 5))
+
+# ---------------------- Streaming Decoder ----------------------
+
+def test_stream_loops_through_the_ring(tmp_path):
+    stream = GifFrameStream(write_gif(tmp_path / "a.gif", 5), 4, 4, window=2).start()
+    try:
+        shown = [frame_number(stream.next_frame(timeout=2.0)) for _ in range(12)]
+    finally:
+        stream.close()
+    assert shown == [i % 5 for i in range(12)]
+    assert stream.durations == [10, 20, 30, 40, 50]
+
+def test_skip_drops_decoded_frames(tmp_path):
+    stream = GifFrameStream(write_gif(tmp_path / "a.gif", 10), 4, 4, window=4).start()
+    try:
+        assert frame_number(stream.next_frame(timeout=2.0)) == 0
+        # Let the producer fill the three free slots with frames 1-3
+        time.sleep(0.2)
+        assert frame_number(stream.next_frame(skip=2, timeout=2.0)) == 3
+        assert frame_number(stream.next_frame(timeout=2.0)) == 4
+    finally:
+        stream.close()
+
+def test_skip_stops_at_the_newest_decoded_frame(tmp_path):
+    stream = GifFrameStream(write_gif(tmp_path / "a.gif", 10), 4, 4, window=3).start()
+    try:
+        time.sleep(0.2)
+        start = time.monotonic()
+        assert frame_number(stream.next_frame(skip=10, timeout=2.0)) == 2
+        # Every slot is decoded, so there is nothing to wait for
+        assert time.monotonic() - start < 1.0
+    finally:
+        stream.close()
+
+def test_close_while_the_producer_waits_for_a_slot(tmp_path):
+    stream = GifFrameStream(write_gif(tmp_path / "a.gif", 5), 4, 4, window=2).start()
+    # Nothing is consumed, so the producer blocks once both slots are full
+    time.sleep(0.2)
+    closer = threading.Thread(target=stream.close)
+    closer.start()
+    closer.join(2.0)
+    assert not closer.is_alive()
+    assert not stream.thread.is_alive()
+
+# ---------------------- Stream Decision ----------------------
+
+def test_short_gifs_are_not_streamed(tmp_path, monkeypatch):
+    monkeypatch.setattr(gif_stream, "DECODE_PIXELS_PER_SECOND", 1.0)
+    assert not should_stream(write_gif(tmp_path / "a.gif", gif_stream.STREAM_MIN_FRAMES))
+
+def test_long_gifs_stream_only_when_slow_to_decode(tmp_path, monkeypatch):
+    path = write_gif(tmp_path / "a.gif", gif_stream.STREAM_MIN_FRAMES + 1)
+    assert not should_stream(path)
+    # 49 frames of 8x8 pixels take just over a second at 3000 pixels per second
+    monkeypatch.setattr(gif_stream, "DECODE_PIXELS_PER_SECOND", 3000.0)
+    assert should_stream(path)
+
+def test_unreadable_files_are_not_streamed(tmp_path):
+    path = tmp_path / "broken.gif"
+    path.write_bytes(b"not a gif")
+    assert not should_stream(str(path))
@@ -0,0 +1,81 @@
+# test_matrix_emulator.py
+
+import os
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from matrix_emulator import RGBMatrix, RGBMatrixOptions, graphics
+
+FONT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "res", "fonts", "7x13.bdf")
+
+def make_matrix(rows=8, cols=16, chain_length=1, parallel=1):
+    options = RGBMatrixOptions()
+    options.rows = rows
+    options.cols = cols
+    options.chain_length = chain_length
+    options.parallel = parallel
+    return RGBMatrix(options=options)
+
+def pattern(width, height):
+    pixels = np.arange(width * height * 3, dtype=np.uint8).reshape(height, width, 3)
+    return Image.fromarray(pixels)
+
+def test_geometry_follows_the_chain():
+    matrix = make_matrix(chain_length=2, parallel=3)
+    assert (matrix.width, matrix.height) == (32, 24)
+    canvas = matrix.CreateFrameCanvas()
+    assert (canvas.width, canvas.height) == (32, 24)
+
+def test_swap_shows_the_canvas_and_returns_the_front_buffer():
+    matrix = make_matrix()
+    canvas = matrix.CreateFrameCanvas()
+    image = pattern(16, 8)
+    canvas.SetImage(image)
+    back = matrix.SwapOnVSync(canvas)
+    assert (np.asarray(matrix.snapshot()) == np.asarray(image)).all()
+    # The returned canvas holds the previous (blank) front buffer
+    assert back is canvas
+    assert not back.pixels.any()
+    assert matrix.swap_count == 1
+
+def test_swaps_advance_the_virtual_vsync_clock():
+    matrix = make_matrix()
+    canvas = matrix.CreateFrameCanvas()
+    for count in range(1, 4):
+        canvas = matrix.SwapOnVSync(canvas)
+        assert matrix.vsync_count == count
+    assert matrix.now() == pytest.approx(matrix.start_time + 3.0 / matrix.refresh_hz)
+    matrix.SwapOnVSync(canvas, framerate_fraction=2)
+    assert matrix.vsync_count == 5
+
+def test_set_image_clips_to_the_canvas():
+    matrix = make_matrix()
+    canvas = matrix.CreateFrameCanvas()
+    image = pattern(16, 8)
+    canvas.SetImage(image, 4, -2)
+    expected = np.zeros((8, 16, 3), dtype=np.uint8)
+    expected[:6, 4:] = np.asarray(image)[2:, :12]
+    assert (canvas.pixels == expected).all()
+    with pytest.raises(Exception):
+        canvas.SetImage(image.convert("L"))
+
+def test_snapshot_applies_brightness():
+    matrix = make_matrix()
+    matrix.Fill(200, 100, 0)
+    matrix.brightness = 50
+    assert np.asarray(matrix.snapshot())[0, 0].tolist() == [200, 100, 0]
+    assert np.asarray(matrix.snapshot(apply_brightness=True))[0, 0].tolist() == [100, 50, 0]
+
+def test_draw_text_puts_the_glyphs_on_the_baseline():
+    matrix = make_matrix(rows=16, cols=16)
+    font = graphics.Font()
+    font.LoadFont(FONT_PATH)
+    advance = graphics.DrawText(matrix, font, 1, 12, graphics.Color(0, 255, 0), "AB")
+    assert advance == 14
+    lit = matrix.pixels[:, :, 1] == 255
+    expected = np.zeros((16, 16), dtype=bool)
+    expected[12 - font.baseline:12 - font.baseline + font.height, 1:15] = font.render("AB")
+    assert (lit == expected).all()
+    assert not matrix.pixels[:, :, [0, 2]].any()
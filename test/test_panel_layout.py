@@ -0,0 +1,77 @@
+# test_panel_layout.py
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from matrix_emulator import RGBMatrix, RGBMatrixOptions
+from panel_layout import PanelLayout, parse_grid
+
+def tile_pattern(layout):
+    """
+    A logical image whose every wall tile is filled with its row-major tile number.
+    """
+    pixels = np.zeros((layout.height, layout.width, 3), dtype=np.uint8)
+    for tile in range(layout.grid_cols * layout.grid_rows):
+        x, y = tile % layout.grid_cols, tile // layout.grid_cols
+        pixels[y * layout.panel_rows:(y + 1) * layout.panel_rows,
+               x * layout.panel_cols:(x + 1) * layout.panel_cols] = tile
+    return pixels
+
+def physical_tiles(layout, physical):
+    """
+    The value shown on each chained panel, in chain order.
+    """
+    return [int(physical[(slot // layout.chain_length) * layout.panel_rows,
+                         (slot % layout.chain_length) * layout.panel_cols, 0])
+            for slot in range(layout.chain_length * layout.parallel)]
+
+def test_parse_grid():
+    assert parse_grid("2X3") == (2, 3)
+    assert parse_grid([4, 1]) == (4, 1)
+    assert parse_grid("") is None
+
+def test_chain_layout_is_identity():
+    layout = PanelLayout(4, 4, chain_length=2, parallel=2)
+    assert layout.identity
+    assert layout.size == (8, 8)
+    pixels = tile_pattern(layout)
+    assert np.array_equal(layout.remap(pixels), pixels)
+
+def test_square_wall_on_one_chain():
+    layout = PanelLayout(4, 4, chain_length=4, parallel=1, grid="2x2")
+    assert not layout.identity
+    assert layout.size == (8, 8)
+    physical = layout.remap(tile_pattern(layout))
+    assert physical.shape == (4, 16, 3)
+    assert physical_tiles(layout, physical) == [0, 1, 2, 3]
+
+def test_panel_order_routes_tiles():
+    layout = PanelLayout(4, 4, chain_length=4, parallel=1, grid="2x2", panel_order=[3, 2, 1, 0])
+    physical = layout.remap(tile_pattern(layout))
+    assert physical_tiles(layout, physical) == [3, 2, 1, 0]
+
+def test_threaded_remap_matches_serial():
+    serial = PanelLayout(4, 4, chain_length=4, parallel=1, grid="2x2", panel_order=[1, 3, 0, 2])
+    threaded = PanelLayout(4, 4, chain_length=4, parallel=1, grid="2x2", panel_order=[1, 3, 0, 2],
+                           tile_workers=2)
+    pixels = np.random.default_rng(0).integers(0, 256, (8, 8, 3), dtype=np.uint8)
+    try:
+        assert np.array_equal(threaded.remap(pixels), serial.remap(pixels))
+    finally:
+        threaded.close()
+
+def test_set_image_draws_the_physical_layout_on_the_emulator():
+    layout = PanelLayout(4, 4, chain_length=4, parallel=1, grid="2x2")
+    matrix = RGBMatrix(options=layout.apply_options(RGBMatrixOptions()))
+    assert (matrix.width, matrix.height) == (16, 4)
+    layout.set_image(matrix, Image.fromarray(tile_pattern(layout)))
+    assert physical_tiles(layout, matrix.pixels) == [0, 1, 2, 3]
+
+@pytest.mark.parametrize("kwargs", [
+    {"chain_length": 3, "grid": "2x2"},
+    {"chain_length": 2, "panel_order": [0, 0]},
+])
+def test_invalid_layouts_are_rejected(kwargs):
+    with pytest.raises(ValueError):
+        PanelLayout(4, 4, **kwargs)
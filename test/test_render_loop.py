@@ -0,0 +1,123 @@
+# test_render_loop.py
+
+import threading
+import time
+
+import numpy as np
+
+from matrix_emulator import RGBMatrix, RGBMatrixOptions
+from render_loop import FrameRing, RenderLoop
+
+def solid(value, width=4, height=2):
+    return np.full((height, width, 3), value, dtype=np.uint8)
+
+# ---------------------- Frame Ring ----------------------
+
+def test_ring_wraps_around_its_slots():
+    ring = FrameRing(4, 2, capacity=3)
+    for value in range(10):
+        assert ring.push(solid(value))
+        assert len(ring) == 1
+        assert ring.peek()[0, 0, 0] == value
+        ring.release()
+    assert ring.peek() is None
+    assert ring.published == 10
+    assert ring.max_depth == 1
+
+def test_ring_keeps_order_across_the_wrap():
+    ring = FrameRing(4, 2, capacity=3)
+    ring.push(solid(0))
+    ring.release()
+    for value in (1, 2, 3):
+        ring.push(solid(value))
+    consumed = []
+    while ring.peek() is not None:
+        consumed.append(int(ring.peek()[0, 0, 0]))
+        ring.release()
+    assert consumed == [1, 2, 3]
+
+def test_full_ring_blocks_until_stopped():
+    ring = FrameRing(4, 2, capacity=2)
+    ring.push(solid(1))
+    ring.push(solid(2))
+    stop_event = threading.Event()
+    stop_event.set()
+    assert not ring.push(solid(3), stop_event)
+    assert len(ring) == 2
+
+def test_full_ring_resumes_when_a_slot_is_released():
+    ring = FrameRing(4, 2, capacity=1)
+    ring.push(solid(1))
+    releaser = threading.Timer(0.05, ring.release)
+    releaser.start()
+    assert ring.push(solid(2))
+    releaser.join()
+    assert ring.producer_waits == 1
+    assert ring.peek()[0, 0, 0] == 2
+
+def test_skip_to_latest_supersedes_older_frames():
+    ring = FrameRing(4, 2, capacity=3)
+    for value in (1, 2, 3):
+        ring.push(solid(value))
+    assert ring.skip_to_latest() == 2
+    assert ring.peek()[0, 0, 0] == 3
+    assert ring.superseded == 2
+    ring.release()
+    assert ring.skip_to_latest() == 0
+    assert ring.peek() is None
+
+def test_ring_keeps_the_producer_skipped_total_per_slot():
+    ring = FrameRing(4, 2, capacity=3)
+    for skipped in (0, 2, 1):
+        ring.push(solid(skipped), skipped=skipped)
+    assert ring.peek_skipped() == 0
+    ring.skip_to_latest()
+    assert ring.peek_skipped() == 3
+
+# ---------------------- Render Loop ----------------------
+
+def make_matrix():
+    options = RGBMatrixOptions()
+    options.rows = 8
+    options.cols = 16
+    return RGBMatrix(options=options)
+
+def test_render_loop_repeats_the_last_frame_when_nothing_is_new():
+    matrix = make_matrix()
+    renderer = RenderLoop(matrix, refresh_fps=200, capacity=2).start()
+    try:
+        renderer.push(solid(7, 16, 8))
+        deadline = time.monotonic() + 5.0
+        while renderer.repeated_frames < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        renderer.stop()
+    stats = renderer.stats()
+    assert stats["new_frames"] == 1
+    assert stats["repeated_frames"] >= 3
+    assert stats["queue_depth"] == 0
+    assert matrix.swap_count == stats["new_frames"] + stats["repeated_frames"]
+    assert (np.asarray(matrix.snapshot()) == 7).all()
+
+def test_render_loop_idles_until_the_first_frame():
+    matrix = make_matrix()
+    renderer = RenderLoop(matrix, refresh_fps=200).start()
+    time.sleep(0.05)
+    renderer.stop()
+    assert matrix.swap_count == 0
+    assert renderer.new_frames == 0 and renderer.repeated_frames == 0
+
+def test_render_loop_counts_frames_the_scene_skipped():
+    matrix = make_matrix()
+    renderer = RenderLoop(matrix, refresh_fps=200, name="skipped_test").start()
+    try:
+        renderer.push(solid(1, 16, 8), skipped=2)
+        renderer.push(solid(2, 16, 8), skipped=3)
+        deadline = time.monotonic() + 5.0
+        while renderer.telemetry.swaps < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        renderer.stop()
+    # Counted once, however many swaps show the frame
+    assert renderer.telemetry.dropped_frames >= 5
+    assert renderer.telemetry.dropped_frames < 5 + renderer.ticks
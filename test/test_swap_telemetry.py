@@ -0,0 +1,78 @@
+# test_swap_telemetry.py
+
+import json
+
+import settings
+import swap_telemetry
+from swap_telemetry import Histogram, SwapTelemetry
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def perf_counter(self):
+        return self.now
+
+def make_telemetry(monkeypatch, expected_interval=0.01):
+    clock = FakeClock()
+    monkeypatch.setattr(swap_telemetry.time, "perf_counter", clock.perf_counter)
+    return SwapTelemetry("test", expected_interval), clock
+
+# ---------------------- Histogram ----------------------
+
+def test_histogram_percentiles():
+    histogram = Histogram(bin_ms=1.0, max_ms=10.0)
+    for ms in range(10):
+        histogram.add(ms / 1e3)
+    assert histogram.percentile(50) == 5.0
+    assert histogram.percentile(100) == histogram.max == 9.0
+    histogram.add(0.5)
+    assert histogram.percentile(100) == 500.0
+
+# ---------------------- Swap Telemetry ----------------------
+
+def test_long_intervals_count_as_dropped_without_a_count(monkeypatch):
+    telemetry, clock = make_telemetry(monkeypatch)
+    telemetry.swapped()
+    clock.now += 0.03
+    telemetry.swapped()
+    assert telemetry.dropped_frames == 2
+
+def test_passed_count_replaces_the_heuristic(monkeypatch):
+    telemetry, clock = make_telemetry(monkeypatch)
+    telemetry.swapped()
+    clock.now += 0.03
+    telemetry.swapped(skipped=1)
+    clock.now += 0.01
+    telemetry.swapped(skipped=0)
+    assert telemetry.dropped_frames == 1
+    assert telemetry.stats()["swaps"] == 3
+
+def test_idle_forgets_the_last_swap(monkeypatch):
+    telemetry, clock = make_telemetry(monkeypatch)
+    telemetry.loop_start()
+    telemetry.swapped()
+    telemetry.idle()
+    clock.now += 5.0
+    telemetry.swapped()
+    stats = telemetry.stats()
+    assert stats["interval"]["count"] == 0
+    assert stats["loop_body"]["count"] == 1
+    assert stats["dropped_frames"] == 0
+
+# ---------------------- Dump ----------------------
+
+def test_dump_defaults_to_the_telemetry_path(monkeypatch, tmp_path, capsys):
+    path = tmp_path / "telemetry.json"
+    monkeypatch.setitem(settings.load_settings(), "telemetry_path", str(path))
+    swap_telemetry.get_telemetry("dump_test").swapped(skipped=2)
+    swap_telemetry.dump()
+    assert capsys.readouterr().out == ""
+    loops = json.loads(path.read_text())["loops"]
+    assert loops["dump_test"]["dropped_frames"] == 2
+
+def test_dump_prints_without_a_path(monkeypatch, capsys):
+    monkeypatch.setitem(settings.load_settings(), "telemetry_path", "")
+    swap_telemetry.get_telemetry("print_test")
+    swap_telemetry.dump()
+    assert "print_test: " in capsys.readouterr().out
@@ -0,0 +1,40 @@
+# test_text_layer.py
+
+import os
+
+import numpy as np
+from PIL import Image
+
+from matrix_emulator import FrameCanvas, Color, Font, DrawText
+from text_layer import TextStrip
+
+FONT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "res", "fonts", "7x13.bdf")
+COLOR = (255, 200, 0)
+
+def test_strip_is_rasterised_only_when_the_text_changes():
+    strip = TextStrip(FONT_PATH, COLOR)
+    strip.set_text("12:00:00")
+    mask = strip.mask
+    strip.set_text("12:00:00")
+    assert strip.mask is mask
+    strip.set_text("12:00:01")
+    assert strip.mask is not mask
+    assert strip.width == 8 * 7
+
+def test_draw_without_text_draws_nothing():
+    strip = TextStrip(FONT_PATH, COLOR)
+    image = Image.new("RGB", (16, 16))
+    assert strip.draw(image, 0, 11) == 0
+    assert not np.asarray(image).any()
+
+def test_draw_matches_draw_text_at_any_offset():
+    strip = TextStrip(FONT_PATH, COLOR)
+    strip.set_text("Scroll")
+    font = Font()
+    font.LoadFont(FONT_PATH)
+    # Partly off the left, top and right edges, inside, and fully outside
+    for x, y in ((-10, 5), (3, 20), (20, 11), (-60, 11), (40, 11)):
+        image = Image.new("RGB", (32, 24))
+        canvas = FrameCanvas(32, 24)
+        assert strip.draw(image, x, y) == DrawText(canvas, font, x, y, Color(*COLOR), "Scroll")
+        assert (np.asarray(image) == canvas.pixels).all(), (x, y)